@@ -2,15 +2,16 @@
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 # Updated on 2026-01-30: Added database support with dependency injection
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from typing import AsyncIterator, Optional
 import uuid
 from datetime import date
 
 from ...models.leave_request import LeaveRequest, LeaveRequestCreate, LeaveStatus
-from ...db.database import get_db
-from ...storage.storage_factory import get_storage
+from ...storage.storage_factory import get_async_storage
+from ...storage.async_storage import AsyncStorage
+from ...storage.pagination import InvalidCursorError, split_page
+from ..streaming import accepts_ndjson, stream_ndjson
 
 router = APIRouter(prefix="/api/leave-requests", tags=["leave-requests"])
 
@@ -18,15 +19,13 @@ router = APIRouter(prefix="/api/leave-requests", tags=["leave-requests"])
 @router.post("/", response_model=LeaveRequest, status_code=status.HTTP_201_CREATED)
 async def create_leave_request(
     request: LeaveRequestCreate,
-    db: Session = Depends(get_db)
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Create a new FMLA leave request.
 
     Accepts JSON with employee, leave, and medical provider information.
     """
-    storage = get_storage(db)
-
     # Generate ID
     request_id = f"req-{uuid.uuid4().hex[:8]}"
 
@@ -54,16 +53,21 @@ async def create_leave_request(
     request_dict['created_at'] = date.today()
 
     # Store in database or JSON file (based on settings)
-    storage.create_leave_request(request_dict)
+    await storage.create_leave_request(request_dict)
 
     return full_request
 
 
 @router.get("/", response_model=list[LeaveRequest])
 async def get_all_leave_requests(
+    request: Request,
+    response: Response,
     status_filter: Optional[LeaveStatus] = None,
     at_risk_only: bool = False,
-    db: Session = Depends(get_db)
+    deadline_before: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Get all leave requests with optional filtering.
@@ -71,34 +75,61 @@ async def get_all_leave_requests(
     Query parameters:
     - status_filter: Filter by status (pending, approved, denied, awaiting_docs)
     - at_risk_only: Only return requests with approaching/overdue deadlines
+    - deadline_before: Only return requests whose certification deadline is before this date
+    - limit: Page size; pages are ordered newest first
+    - cursor: Value of the X-Next-Cursor header from the previous page
+
+    When more results exist, the X-Next-Cursor response header is set.
+
+    With ``Accept: application/x-ndjson`` the requests are written one JSON
+    object per line. Unpaginated listings are then streamed from storage
+    as they are read instead of being built into one list first.
     """
-    storage = get_storage(db)
-    requests_data = storage.get_all_leave_requests()
-    requests = [LeaveRequest(**data) for data in requests_data]
+    paginated = limit is not None or cursor is not None
+
+    # Status, at-risk and deadline filters run in storage (indexed SQL on
+    # the database backend), so every page is full
+    filters = dict(
+        status=status_filter,
+        at_risk_as_of=date.today() if at_risk_only else None,
+        deadline_before=deadline_before
+    )
+
+    if accepts_ndjson(request) and not paginated:
+        rows = await storage.stream_leave_requests(**filters)
 
-    # Apply status filter
-    if status_filter:
-        requests = [r for r in requests if r.status == status_filter]
+        async def models() -> AsyncIterator[LeaveRequest]:
+            async for data in rows:
+                yield LeaveRequest(**data)
 
-    # Apply at-risk filter
-    if at_risk_only:
-        from ...services.compliance_checker import ComplianceChecker
-        checker = ComplianceChecker()
-        requests = [
-            r for r in requests
-            if checker.check_compliance(r).at_risk
-        ]
+        return stream_ndjson(models())
 
+    try:
+        requests_data = await storage.query_leave_requests(
+            **filters,
+            order_by="-created_at" if paginated else None,
+            limit=limit + 1 if limit is not None else None,
+            cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    requests_data, next_cursor = split_page(requests_data, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    requests = [LeaveRequest(**data) for data in requests_data]
+
+    if accepts_ndjson(request):
+        return stream_ndjson(requests, headers=dict(response.headers))
     return requests
 
 
 @router.get("/{request_id}", response_model=LeaveRequest)
-async def get_leave_request(request_id: str, db: Session = Depends(get_db)):
+async def get_leave_request(request_id: str, storage: AsyncStorage = Depends(get_async_storage)):
     """
     Get a specific leave request by ID.
     """
-    storage = get_storage(db)
-    request_data = storage.get_leave_request_by_id(request_id)
+    request_data = await storage.get_leave_request_by_id(request_id)
 
     if not request_data:
         raise HTTPException(
@@ -113,36 +144,30 @@ async def get_leave_request(request_id: str, db: Session = Depends(get_db)):
 async def update_leave_request(
     request_id: str,
     updates: dict,
-    db: Session = Depends(get_db)
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Update a leave request.
 
     Can update status, compliance flags, or other fields.
     """
-    storage = get_storage(db)
-
-    # Verify request exists
-    existing = storage.get_leave_request_by_id(request_id)
-    if not existing:
+    # Update the request (storage returns None if it doesn't exist)
+    updated = await storage.update_leave_request(request_id, updates)
+    if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Leave request {request_id} not found"
         )
 
-    # Update the request
-    updated = storage.update_leave_request(request_id, updates)
-
     return LeaveRequest(**updated)
 
 
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_leave_request(request_id: str, db: Session = Depends(get_db)):
+async def delete_leave_request(request_id: str, storage: AsyncStorage = Depends(get_async_storage)):
     """
     Delete a leave request.
     """
-    storage = get_storage(db)
-    success = storage.delete_leave_request(request_id)
+    success = await storage.delete_leave_request(request_id)
 
     if not success:
         raise HTTPException(
@@ -2,16 +2,26 @@
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 # Updated on 2026-01-30: Added database support with dependency injection
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, Body
+from typing import AsyncIterator, Optional
+from datetime import date
 import uuid
 
-from ...models.notification import Notification, NotificationType
+from ...models.notification import (
+    Notification, NotificationType, NotificationSelection, BulkOperationResult,
+    NotificationSummary, NotificationSweepResult
+)
 from ...models.leave_request import LeaveRequest
-from ...db.database import get_db
-from ...storage.storage_factory import get_storage
+from ...storage.storage_factory import get_async_storage
+from ...storage.async_storage import AsyncStorage
+from ...storage.pagination import InvalidCursorError, split_page
 from ...services.notification_service import NotificationService
+from ...services import (
+    notification_delivery, notification_scheduler, notification_templates, snapshot_refresher
+)
+from ...services.notification_templates import render_notification
+from ...config import settings
+from ..streaming import accepts_ndjson, stream_ndjson
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 notification_service = NotificationService()
@@ -21,19 +31,24 @@ notification_service = NotificationService()
 async def create_notification(
     request_id: str,
     notification_type: NotificationType,
+    response: Response,
     custom_subject: Optional[str] = None,
     custom_body: Optional[str] = None,
-    db: Session = Depends(get_db)
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Create a new notification for a leave request.
 
     Can auto-generate notification content based on type, or use custom content.
-    """
-    storage = get_storage(db)
 
+    Certification, cure window and recertification notifications are
+    idempotent: if one already exists for the same deadline it is returned
+    (200) instead of creating another. Notifications with a custom subject
+    or body are always created, since returning the existing one would drop
+    the custom content.
+    """
     # Get the leave request
-    request_data = storage.get_leave_request_by_id(request_id)
+    request_data = await storage.get_leave_request_by_id(request_id)
     if not request_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,111 +56,149 @@ async def create_notification(
         )
 
     leave_request = LeaveRequest(**request_data)
+    params = notification_service.default_params(leave_request, notification_type)
+
+    custom = bool(custom_subject or custom_body)
+    dedup_key = None if custom else notification_templates.dedup_key_for(
+        request_id, notification_type, params
+    )
+    if dedup_key is not None:
+        existing = await storage.get_notification_by_dedup_key(dedup_key)
+        if existing is not None:
+            response.status_code = status.HTTP_200_OK
+            return render_notification(existing)
+
+    # A custom body can't be re-rendered from the template, so store it in full
+    [notification] = notification_templates.render_batch(
+        [leave_request.model_dump(mode='json')],
+        notification_type,
+        params,
+        compact=settings.NOTIFICATION_COMPACT_STORAGE and not custom_body
+    )
+    if custom_subject:
+        notification["subject"] = custom_subject
+    if custom_body:
+        notification["body"] = custom_body
+    if custom:
+        notification["dedup_key"] = None
 
-    # Generate notification based on type
-    if notification_type == NotificationType.CERTIFICATION_DUE:
-        from ...services.deadline_calculator import DeadlineCalculator
-        calc = DeadlineCalculator()
-        cert_deadline = calc.calculate_certification_deadline(
-            leave_request.leave.start_date,
-            leave_request.notice_date
-        )
-        notification = notification_service.generate_certification_due_notification(
-            leave_request,
-            str(cert_deadline)
-        )
+    # Store notification (returns the stored one if a concurrent request won)
+    return render_notification(await storage.create_notification(notification))
 
-    elif notification_type == NotificationType.CURE_WINDOW:
-        from ...services.deadline_calculator import DeadlineCalculator
-        calc = DeadlineCalculator()
-        cert_deadline = calc.calculate_certification_deadline(
-            leave_request.leave.start_date,
-            leave_request.notice_date
-        )
-        _, cure_end = calc.calculate_cure_window(cert_deadline)
-        notification = notification_service.generate_cure_window_notification(
-            leave_request,
-            str(cure_end),
-            leave_request.compliance_flags
-        )
 
-    elif notification_type == NotificationType.RECERTIFICATION_DUE:
-        from ...services.deadline_calculator import DeadlineCalculator
-        calc = DeadlineCalculator()
-        recert_date = calc.calculate_recertification_date(
-            leave_request.leave.start_date,
-            leave_request.leave.condition_type.value
-        )
-        notification = notification_service.generate_recertification_notification(
-            leave_request,
-            str(recert_date)
+async def _query_page(storage, response: Response, limit: Optional[int], **filters) -> list[dict]:
+    """
+    Run a newest-first notification query, one keyset page at a time.
+
+    Sets the X-Next-Cursor header when more results exist.
+    """
+    try:
+        rows = await storage.query_notifications(
+            order_by="-created_at",
+            limit=limit + 1 if limit is not None else None,
+            **filters
         )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
-    elif notification_type == NotificationType.APPROVAL_NOTICE:
-        notification = notification_service.generate_approval_notification(leave_request)
+    rows, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
-    elif notification_type == NotificationType.DENIAL_NOTICE:
-        reason = "Incomplete or missing medical certification"
-        notification = notification_service.generate_denial_notification(
-            leave_request,
-            reason
-        )
 
-    elif notification_type == NotificationType.MISSING_DOCS:
-        notification = notification_service.generate_missing_docs_notification(
-            leave_request,
-            leave_request.compliance_flags
-        )
+def _view(data: dict, summary: bool) -> Notification | NotificationSummary:
+    """Full notification (body rendered as needed) or summary (no rendering)."""
+    if summary:
+        return NotificationSummary(**data)
+    return Notification(**render_notification(data))
 
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unknown notification type: {notification_type}"
-        )
 
-    # Override with custom content if provided
-    if custom_subject:
-        notification.subject = custom_subject
-    if custom_body:
-        notification.body = custom_body
+def _list_view(rows: list[dict], summary: bool) -> list[Notification] | list[NotificationSummary]:
+    """_view for every row."""
+    return [_view(data, summary) for data in rows]
 
-    # Store notification
-    notification_dict = notification.model_dump(mode='json')
-    storage.create_notification(notification_dict)
 
-    return notification
+@router.post("/sweep", response_model=NotificationSweepResult, status_code=status.HTTP_201_CREATED)
+async def run_notification_sweep(
+    as_of: Optional[date] = Query(None, description="Day to run the sweep for (defaults to today)"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+    storage: AsyncStorage = Depends(get_async_storage)
+):
+    """
+    Create the reminder notifications due on ``as_of``.
+
+    Certification reminders go out 3 days before the deadline, cure window
+    notices on the day the window opens, recertification reminders 7 days
+    ahead. The background scheduler runs the same sweep once a day; this
+    endpoint runs it on demand (e.g. to backfill a missed day). It also
+    refreshes the compliance snapshots for the day.
+    """
+    result = await notification_scheduler.run_notification_sweep(storage, as_of, batch_size)
+    result.snapshots_refreshed = await storage.refresh_compliance_snapshots(result.as_of)
+    return result
 
 
-@router.get("/{request_id}", response_model=list[Notification])
-async def get_notifications_for_request(request_id: str, db: Session = Depends(get_db)):
+@router.get("/sweep/metrics")
+async def get_notification_sweep_metrics():
+    """Background scheduler state and timings of its recent runs."""
+    return {
+        **notification_scheduler.scheduler.metrics(),
+        "snapshot_refresh": snapshot_refresher.refresher.metrics(),
+    }
+
+
+@router.get("/outbox/metrics")
+async def get_notification_delivery_metrics():
     """
-    Get all notifications for a specific leave request.
+    Email delivery state: outbox depth by status, batches waiting for a
+    worker, delivery counts and enqueue-to-sent latency (p50/p95/max).
     """
-    storage = get_storage(db)
+    return await notification_delivery.pool.metrics()
 
+
+@router.get("/{request_id}", response_model=list[Notification] | list[NotificationSummary])
+async def get_notifications_for_request(
+    request_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    storage: AsyncStorage = Depends(get_async_storage)
+):
+    """
+    Get all notifications for a specific leave request.
+
+    Query parameters:
+    - limit: Page size (newest first)
+    - cursor: Value of the X-Next-Cursor header from the previous page
+    - summary: Leave out bodies (compact notifications aren't rendered)
+    """
     # Verify request exists
-    request_data = storage.get_leave_request_by_id(request_id)
+    request_data = await storage.get_leave_request_by_id(request_id)
     if not request_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Leave request {request_id} not found"
         )
 
-    # Get notifications
-    notifications_data = storage.get_notifications_by_request_id(request_id)
-    notifications = [Notification(**data) for data in notifications_data]
-
-    # Sort by created_at (newest first)
-    notifications.sort(key=lambda n: n.created_at, reverse=True)
+    # Get notifications (newest first)
+    notifications_data = await _query_page(
+        storage, response, limit, request_id=request_id, cursor=cursor
+    )
+    return _list_view(notifications_data, summary)
 
-    return notifications
 
-
-@router.get("/", response_model=list[Notification])
+@router.get("/", response_model=list[Notification] | list[NotificationSummary])
 async def get_all_notifications(
+    request: Request,
+    response: Response,
     notification_type: Optional[NotificationType] = None,
     unread_only: bool = False,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Get all notifications with optional filtering.
@@ -153,39 +206,102 @@ async def get_all_notifications(
     Query parameters:
     - notification_type: Filter by type
     - unread_only: Only return unread notifications
+    - limit: Page size (newest first)
+    - cursor: Value of the X-Next-Cursor header from the previous page
+    - summary: Leave out bodies (compact notifications aren't rendered)
+
+    With ``Accept: application/x-ndjson`` notifications are written one JSON
+    object per line. Without limit/cursor they are then streamed from
+    storage, newest first, and serialized as they are read.
     """
-    storage = get_storage(db)
-    notifications_data = storage.get_all_notifications()
-    notifications = [Notification(**data) for data in notifications_data]
+    if accepts_ndjson(request) and limit is None and cursor is None:
+        rows = await storage.stream_notifications(
+            notification_type=notification_type, unread_only=unread_only, order_by="-created_at"
+        )
 
-    # Apply filters
-    if notification_type:
-        notifications = [n for n in notifications if n.type == notification_type]
+        async def models() -> AsyncIterator[Notification | NotificationSummary]:
+            async for data in rows:
+                yield _view(data, summary)
 
-    if unread_only:
-        notifications = [n for n in notifications if not n.read_status]
+        return stream_ndjson(models())
 
-    # Sort by created_at (newest first)
-    notifications.sort(key=lambda n: n.created_at, reverse=True)
+    # Filters and ordering run in storage (indexed SQL on the database backend)
+    notifications_data = await _query_page(
+        storage,
+        response,
+        limit,
+        notification_type=notification_type,
+        unread_only=unread_only,
+        cursor=cursor
+    )
+    if accepts_ndjson(request):
+        return stream_ndjson(_list_view(notifications_data, summary), headers=dict(response.headers))
+    return _list_view(notifications_data, summary)
 
-    return notifications
+
+@router.patch("/bulk", response_model=BulkOperationResult)
+async def update_notifications_bulk(
+    read_status: bool,
+    selection: NotificationSelection = Body(default_factory=NotificationSelection),
+    storage: AsyncStorage = Depends(get_async_storage)
+):
+    """
+    Update read status on many notifications in a single write.
+
+    The JSON body selects notifications by ids, request_id and/or
+    notification_type; an empty body selects all of them ("mark all as
+    read"). Only notifications whose status actually changes are counted.
+    """
+    count = await storage.set_notifications_read_status(
+        read_status,
+        notification_ids=selection.ids,
+        request_id=selection.request_id,
+        notification_type=selection.notification_type
+    )
+    return BulkOperationResult(count=count)
+
+
+@router.post("/bulk-delete", response_model=BulkOperationResult)
+async def delete_notifications_bulk(
+    selection: NotificationSelection,
+    read_only: bool = False,
+    storage: AsyncStorage = Depends(get_async_storage)
+):
+    """
+    Delete many notifications in a single write.
+
+    The JSON body selects notifications like PATCH /bulk, but must set at
+    least one criterion. With read_only=true only read notifications are
+    deleted.
+    """
+    if selection.is_empty():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk delete requires ids, request_id or notification_type"
+        )
+
+    count = await storage.delete_notifications(
+        notification_ids=selection.ids,
+        request_id=selection.request_id,
+        notification_type=selection.notification_type,
+        read_only=read_only
+    )
+    return BulkOperationResult(count=count)
 
 
 @router.patch("/{notification_id}", response_model=Notification)
 async def update_notification(
     notification_id: str,
     read_status: bool,
-    db: Session = Depends(get_db)
+    storage: AsyncStorage = Depends(get_async_storage)
 ):
     """
     Update notification read status.
     """
-    storage = get_storage(db)
-
     if read_status:
-        updated = storage.mark_notification_as_read(notification_id)
+        updated = await storage.mark_notification_as_read(notification_id)
     else:
-        updated = storage.mark_notification_as_unread(notification_id)
+        updated = await storage.mark_notification_as_unread(notification_id)
 
     if not updated:
         raise HTTPException(
@@ -193,16 +309,15 @@ async def update_notification(
             detail=f"Notification {notification_id} not found"
         )
 
-    return Notification(**updated)
+    return Notification(**render_notification(updated))
 
 
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_notification(notification_id: str, db: Session = Depends(get_db)):
+async def delete_notification(notification_id: str, storage: AsyncStorage = Depends(get_async_storage)):
     """
     Delete a notification.
     """
-    storage = get_storage(db)
-    success = storage.delete_notification(notification_id)
+    success = await storage.delete_notification(notification_id)
 
     if not success:
         raise HTTPException(
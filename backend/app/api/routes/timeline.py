@@ -2,52 +2,89 @@
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 # Updated on 2026-01-30: Added database support with dependency injection
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 
 from ...models.timeline_event import TimelineEvent
 from ...models.compliance import ComplianceStatus
 from ...models.leave_request import LeaveRequest
-from ...db.database import get_db
-from ...storage.storage_factory import get_storage
+from ..streaming import stream_json_array
+from ...storage.storage_factory import get_async_storage
+from ...storage.async_storage import AsyncStorage
+from ...storage import hooks
 from ...services.timeline_generator import TimelineGenerator
 from ...services.compliance_checker import ComplianceChecker
+from ...services.result_cache import VersionedLRUCache, request_version
+from ...config import settings
 
 router = APIRouter(prefix="/api/timeline", tags=["timeline"])
 timeline_gen = TimelineGenerator()
 compliance_checker = ComplianceChecker()
 
+# Results are pure functions of (request, as_of); cache them per version
+timeline_cache = VersionedLRUCache(settings.RESULT_CACHE_SIZE)
+compliance_cache = VersionedLRUCache(settings.RESULT_CACHE_SIZE)
+
+
+@hooks.add_leave_request_listener
+def _invalidate_cached_results(event: str, request_id: str, record: dict | None, store: str | None):
+    """Drop cached results for a leave request when it changes."""
+    if event != hooks.CREATED:
+        timeline_cache.invalidate(request_id)
+        compliance_cache.invalidate(request_id)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit, miss and eviction counters for the timeline and compliance caches.
+    """
+    return {
+        "timeline": timeline_cache.stats(),
+        "compliance": compliance_cache.stats(),
+    }
+
 
 @router.get("/{request_id}", response_model=list[TimelineEvent])
-async def get_timeline(request_id: str, db: Session = Depends(get_db)):
+async def get_timeline(
+    request_id: str,
+    as_of: Optional[date] = Query(None, description="Evaluate event statuses on this date (defaults to today)"),
+    storage: AsyncStorage = Depends(get_async_storage)
+):
     """
     Get complete timeline for a leave request.
 
     Returns all timeline events (leave start/end, deadlines, cure window, etc.)
-    sorted by date with status indicators.
+    sorted by date with status indicators as of ``as_of``.
     """
-    storage = get_storage(db)
-
     # Get the leave request
-    request_data = storage.get_leave_request_by_id(request_id)
+    request_data = await storage.get_leave_request_by_id(request_id)
     if not request_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Leave request {request_id} not found"
         )
 
-    leave_request = LeaveRequest(**request_data)
-
-    # Generate timeline
-    timeline = timeline_gen.generate_timeline(leave_request)
-
-    return timeline
+    # Generate timeline (cached per request version and day)
+    as_of = as_of or date.today()
+    return timeline_cache.get_or_compute(
+        request_id,
+        request_version(request_data),
+        as_of,
+        lambda: timeline_gen.generate_timeline(LeaveRequest(**request_data), as_of)
+    )
 
 
 @router.get("/{request_id}/compliance", response_model=ComplianceStatus)
-async def get_compliance_status(request_id: str, db: Session = Depends(get_db)):
+async def get_compliance_status(
+    request_id: str,
+    as_of: Optional[date] = Query(None, description="Evaluate compliance on this date (defaults to today)"),
+    storage: AsyncStorage = Depends(get_async_storage)
+):
     """
-    Get compliance status for a leave request.
+    Get compliance status for a leave request as of ``as_of``.
 
     Returns detailed compliance information including:
     - Whether certification is complete
@@ -55,51 +92,41 @@ async def get_compliance_status(request_id: str, db: Session = Depends(get_db)):
     - Whether in cure window
     - Risk level
     """
-    storage = get_storage(db)
-
     # Get the leave request
-    request_data = storage.get_leave_request_by_id(request_id)
+    request_data = await storage.get_leave_request_by_id(request_id)
     if not request_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Leave request {request_id} not found"
         )
 
-    leave_request = LeaveRequest(**request_data)
-
-    # Check compliance
-    compliance = compliance_checker.check_compliance(leave_request)
-
-    return compliance
+    # Check compliance (cached per request version and day)
+    as_of = as_of or date.today()
+    return compliance_cache.get_or_compute(
+        request_id,
+        request_version(request_data),
+        as_of,
+        lambda: compliance_checker.check_compliance(LeaveRequest(**request_data), as_of)
+    )
 
 
 @router.get("/alerts/all", response_model=list[dict])
-async def get_all_alerts(db: Session = Depends(get_db)):
+async def get_all_alerts(
+    as_of: Optional[date] = Query(None, description="Evaluate alerts on this date (defaults to today)"),
+    storage: AsyncStorage = Depends(get_async_storage)
+):
     """
     Get all at-risk alerts across all leave requests.
 
-    Returns list of requests with approaching or overdue deadlines,
-    sorted by risk level and urgency.
-    """
-    storage = get_storage(db)
-
-    # Get all leave requests
-    requests_data = storage.get_all_leave_requests()
-    requests = [LeaveRequest(**data) for data in requests_data]
-
-    # Get at-risk requests
-    at_risk = compliance_checker.get_all_at_risk_requests(requests)
-
-    # Format response
-    alerts = []
-    for request, compliance in at_risk:
-        # Get at-risk events from timeline
-        at_risk_events = timeline_gen.get_at_risk_events(request)
+    Returns list of requests with approaching or overdue deadlines on
+    ``as_of``, sorted by risk level and urgency.
 
-        alerts.append({
-            "request": request.model_dump(mode='json'),
-            "compliance": compliance.model_dump(mode='json'),
-            "at_risk_events": [e.model_dump(mode='json') for e in at_risk_events]
-        })
-
-    return alerts
+    On the database backend, alerts for today are read from the compliance
+    snapshot table, which is refreshed daily; only requests whose risk can
+    have changed since the last refresh are re-checked. Other days use
+    AlertsEngine. The sorted
+    result is streamed as a JSON array rather than validated and encoded
+    as one response body.
+    """
+    alerts = await storage.get_compliance_alerts(as_of)
+    return stream_json_array(alerts)
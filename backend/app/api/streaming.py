@@ -0,0 +1,89 @@
+"""
+Streaming response helpers.
+"""
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def json_array_chunks(items: Iterable, batch_size: int = 100) -> Iterator[str]:
+    """
+    Serialize items as a JSON array, a batch of elements per chunk.
+
+    Args:
+        items: JSON-serializable items
+        batch_size: Elements per yielded chunk
+
+    Yields:
+        Pieces of the array text; joined, they form valid JSON
+    """
+    yield "["
+    batch = []
+    first = True
+    for item in items:
+        batch.append(json.dumps(item, default=str))
+        if len(batch) >= batch_size:
+            yield ("" if first else ",") + ",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ("" if first else ",") + ",".join(batch)
+    yield "]"
+
+
+def stream_json_array(items: Iterable) -> StreamingResponse:
+    """StreamingResponse that writes items as a JSON array."""
+    return StreamingResponse(json_array_chunks(items), media_type="application/json")
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """Whether the client asked for newline-delimited JSON (``Accept: application/x-ndjson``)."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_chunks(
+    items: AsyncIterable[BaseModel] | Iterable[BaseModel],
+    batch_size: int = 100
+) -> AsyncIterator[str]:
+    """
+    Serialize models as newline-delimited JSON, a batch of lines per chunk.
+
+    Each model is serialized as soon as it is pulled from ``items``, so
+    only one batch of lines is held at a time.
+
+    Args:
+        items: Pydantic models, from an async or a plain iterable
+        batch_size: Lines per yielded chunk
+
+    Yields:
+        Lines of JSON, each ending in a newline
+    """
+    if not hasattr(items, "__aiter__"):
+        items = _as_async(items)
+    batch = []
+    async for item in items:
+        batch.append(item.model_dump_json())
+        if len(batch) >= batch_size:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+async def _as_async(items: Iterable) -> AsyncIterator:
+    for item in items:
+        yield item
+
+
+def stream_ndjson(
+    items: AsyncIterable[BaseModel] | Iterable[BaseModel],
+    headers: dict[str, str] | None = None
+) -> StreamingResponse:
+    """StreamingResponse that writes models as newline-delimited JSON."""
+    return StreamingResponse(ndjson_chunks(items), media_type=NDJSON_MEDIA_TYPE, headers=headers)
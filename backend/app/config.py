@@ -19,6 +19,18 @@ class Settings(BaseSettings):
     # Database configuration
     DATABASE_URL: str = "sqlite:///./data/fmla_tracker.db"
 
+    # Connection pool (file-based SQLite and PostgreSQL)
+    DB_POOL_SIZE: int = 10  # Connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed beyond DB_POOL_SIZE
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+
+    # SQLite tuning (applied to every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers run while a writer commits
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; fsyncs at checkpoints only
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait this long for locks instead of failing
+    SQLITE_CACHE_SIZE_KB: int = 65536  # Page cache per connection
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of the database file to memory-map
+
     # Environment
     ENVIRONMENT: str = "development"  # development, staging, production
     DEBUG: bool = True
@@ -45,6 +57,51 @@ class Settings(BaseSettings):
 
     # Feature flags
     USE_DATABASE: bool = True  # Toggle between database and JSON file storage
+    ASYNC_DATABASE: bool = False  # Use the async engine (aiosqlite/asyncpg) for API requests
+
+    # JSON storage tuning (only used when USE_DATABASE=False)
+    JSON_STORAGE_FORMAT: str = "json"  # json (single array) or ndjson (one record per line + offset index)
+    JSON_STORAGE_JOURNAL: bool = False  # Append mutations to a journal instead of rewriting files
+    JSON_JOURNAL_COMPACT_BYTES: int = 1_048_576  # Fold the journal into a snapshot past this size
+
+    # Business-day calendar (precomputed; dates outside the range extend it on demand)
+    BUSINESS_CALENDAR_START_YEAR: int = 2000
+    BUSINESS_CALENDAR_END_YEAR: int = 2050
+
+    # LRU caches for timeline and compliance results (entries per cache)
+    RESULT_CACHE_SIZE: int = 1024
+
+    # Compliance alert sweeps (AlertsEngine)
+    COMPLIANCE_SWEEP_WORKERS: int = 1  # Worker processes for large sweeps; 1 = in process, 0 = one per CPU
+    COMPLIANCE_SWEEP_CHUNK_SIZE: int = 10000  # Requests per worker task
+    COMPLIANCE_SWEEP_PARALLEL_MIN_REQUESTS: int = 50000  # Smaller sweeps always run in process
+    COMPLIANCE_SNAPSHOT_REFRESH_INTERVAL_SECONDS: int = 3600  # How often to check whether a new day needs refreshing
+
+    # Background reminder notifications (daily sweep started with the app)
+    NOTIFICATION_SCHEDULER_ENABLED: bool = False  # Off unless configured, so tests and scripts never start it
+    NOTIFICATION_SWEEP_INTERVAL_SECONDS: int = 3600  # How often to check whether a new day needs sweeping
+    NOTIFICATION_SWEEP_BATCH_SIZE: int = 500  # Leave requests per bulk insert
+
+    # Notification storage
+    NOTIFICATION_COMPACT_STORAGE: bool = False  # Store template id + params instead of rendered bodies
+    NOTIFICATION_RENDER_CACHE_SIZE: int = 4096  # Rendered bodies of compact notifications kept (LRU)
+
+    # Email delivery (outbox drained by background workers)
+    NOTIFICATION_DELIVERY_ENABLED: bool = False  # Queue new notifications and email them
+    NOTIFICATION_DELIVERY_WORKERS: int = 4  # Concurrent SMTP connections
+    NOTIFICATION_DELIVERY_BATCH_SIZE: int = 50  # Messages sent per connection per batch
+    NOTIFICATION_DELIVERY_MAX_ATTEMPTS: int = 6  # Give up (status "failed") after this many
+    NOTIFICATION_DELIVERY_BACKOFF_SECONDS: float = 30  # First retry delay; doubles per attempt
+    NOTIFICATION_DELIVERY_MAX_BACKOFF_SECONDS: float = 3600
+    NOTIFICATION_DELIVERY_POLL_SECONDS: float = 5  # Idle wait between outbox claims
+    NOTIFICATION_DELIVERY_LEASE_SECONDS: float = 300  # Claimed entries are retried after this
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = False
+    SMTP_TIMEOUT: float = 30
+    SMTP_FROM: str = "fmla-compliance@example.com"
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -6,39 +6,114 @@ This module provides:
 - Session factory for database operations
 - Base declarative class for ORM models
 - Dependency injection for FastAPI routes
+- Async engine and sessions (aiosqlite/asyncpg) for ASYNC_DATABASE=true
 
 Written by Claude Code on 2026-01-30
 User prompt: Database Integration - Add SQLAlchemy with PostgreSQL/MySQL
 """
-from sqlalchemy import create_engine
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 from ..config import settings
 
 
-# Create database engine based on DATABASE_URL
-if settings.DATABASE_URL.startswith('sqlite'):
-    # SQLite configuration (development)
-    # Use StaticPool for single connection and disable same thread check
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},  # Allow multi-threaded access
-        poolclass=StaticPool,  # Single connection for SQLite
-        echo=settings.DEBUG,  # Log SQL statements in debug mode
-    )
-else:
+def is_sqlite_memory(database_url: str) -> bool:
+    """Whether a URL points at an in-memory SQLite database."""
+    path = database_url.split("://", 1)[-1]
+    return path in ("", "/", "/:memory:") or "mode=memory" in path
+
+
+def sqlite_pragmas() -> list[str]:
+    """
+    PRAGMA statements applied to every new SQLite connection.
+
+    - journal_mode=WAL: readers no longer block behind a writer
+    - synchronous=NORMAL: durable with WAL, without an fsync per commit
+    - busy_timeout: writers wait for the lock instead of failing immediately
+    - cache_size / mmap_size: keep hot pages in memory
+    - foreign_keys: enforce ON DELETE CASCADE at the database level
+    """
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        "PRAGMA foreign_keys=ON",
+    ]
+
+
+def apply_sqlite_pragmas(engine: Engine, database_url: str):
+    """Run sqlite_pragmas() on each connection the engine opens."""
+    pragmas = sqlite_pragmas()
+    if is_sqlite_memory(database_url):
+        # WAL and mmap don't apply to in-memory databases
+        pragmas = [p for p in pragmas if "journal_mode" not in p and "mmap_size" not in p]
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """
+    Create the sync engine for a DATABASE_URL.
+
+    File-based SQLite gets a real connection pool (each thread checks out
+    its own connection) plus the tuned PRAGMAs. In-memory SQLite keeps
+    StaticPool, since every connection would otherwise see a separate
+    empty database. Pool sizes come from Settings.
+    """
+    if database_url.startswith('sqlite'):
+        if is_sqlite_memory(database_url):
+            engine = create_engine(
+                database_url,
+                connect_args={"check_same_thread": False},  # Allow multi-threaded access
+                poolclass=StaticPool,  # Single shared in-memory database
+                echo=settings.DEBUG,  # Log SQL statements in debug mode
+            )
+        else:
+            engine = create_engine(
+                database_url,
+                connect_args={
+                    "check_same_thread": False,  # Connections move between threads via the pool
+                    "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                },
+                poolclass=QueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                echo=settings.DEBUG,  # Log SQL statements in debug mode
+            )
+        apply_sqlite_pragmas(engine, database_url)
+        return engine
+
     # PostgreSQL configuration (production)
     # Use connection pooling for better performance and concurrency
-    engine = create_engine(
-        settings.DATABASE_URL,
+    return create_engine(
+        database_url,
         pool_pre_ping=True,  # Verify connections before using them
-        pool_size=10,  # Number of connections in the pool
-        max_overflow=20,  # Additional connections beyond pool_size
+        pool_size=settings.DB_POOL_SIZE,  # Number of connections in the pool
+        max_overflow=settings.DB_MAX_OVERFLOW,  # Additional connections beyond pool_size
+        pool_timeout=settings.DB_POOL_TIMEOUT,
         echo=settings.DEBUG,  # Log SQL statements in debug mode
     )
 
 
+# Create database engine based on DATABASE_URL
+engine = create_db_engine(settings.DATABASE_URL)
+
+
 # Session factory
 # Configured with autocommit=False to require explicit commits
 # autoflush=False prevents automatic SQL execution before queries
@@ -77,6 +152,87 @@ def get_db():
         db.close()
 
 
+def get_async_database_url(database_url: str) -> str:
+    """
+    Map a sync DATABASE_URL to its async driver equivalent.
+
+    sqlite:// uses aiosqlite and postgresql:// uses asyncpg. URLs that
+    already name a driver are returned unchanged.
+    """
+    if database_url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + database_url[len("sqlite://"):]
+    if database_url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + database_url[len("postgresql://"):]
+    if database_url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + database_url[len("postgresql+psycopg2://"):]
+    return database_url
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the async engine, created on first use.
+
+    Created lazily so the async drivers are only needed when
+    ASYNC_DATABASE=true.
+    """
+    async_url = get_async_database_url(settings.DATABASE_URL)
+    if settings.DATABASE_URL.startswith('sqlite'):
+        if is_sqlite_memory(settings.DATABASE_URL):
+            async_engine = create_async_engine(
+                async_url,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool,
+                echo=settings.DEBUG,
+            )
+        else:
+            async_engine = create_async_engine(
+                async_url,
+                connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                echo=settings.DEBUG,
+            )
+        apply_sqlite_pragmas(async_engine.sync_engine, settings.DATABASE_URL)
+        return async_engine
+
+    return create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        echo=settings.DEBUG,
+    )
+
+
+@lru_cache()
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Get the AsyncSession factory bound to the async engine.
+
+    expire_on_commit=False keeps loaded attributes usable after commit,
+    since async sessions cannot lazily reload them.
+    """
+    return async_sessionmaker(
+        get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    """
+    Dependency injection for async database sessions.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async with get_async_session_factory()() as session:
+        yield session
+
+
 def init_db():
     """
     Initialize database by creating all tables.
@@ -89,7 +245,15 @@ def init_db():
     calling this function directly.
     """
     # Import all ORM models to ensure they are registered with Base
-    from .models import LeaveRequestDB, NotificationDB  # noqa: F401
+    from .models import LeaveRequestDB, NotificationDB, ComplianceSnapshotDB, NotificationOutboxDB  # noqa: F401
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
+
+
+async def init_async_db():
+    """Create all tables through the async engine (ASYNC_DATABASE=true)."""
+    from .models import LeaveRequestDB, NotificationDB, ComplianceSnapshotDB, NotificationOutboxDB  # noqa: F401
+
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -9,8 +9,8 @@ Written by Claude Code on 2026-01-30
 User prompt: Database Integration - Add SQLAlchemy with PostgreSQL/MySQL
 """
 from sqlalchemy import (
-    Column, String, Boolean, Date, DateTime, Text,
-    ForeignKey, Enum as SQLEnum, JSON
+    Column, String, Boolean, Date, DateTime, Integer, Text,
+    ForeignKey, Index, Enum as SQLEnum, JSON, event
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -19,6 +19,7 @@ from datetime import datetime, date as date_type
 from .database import Base
 from ..models.leave_request import LeaveStatus
 from ..models.notification import NotificationType
+from ..utils.deadline_fields import deadline_fields
 from ..config import settings
 
 
@@ -40,6 +41,18 @@ class LeaveRequestDB(Base):
     leave details, and medical provider information.
     """
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at, id with (created_at, id) > cursor
+        Index("ix_leave_requests_created_at_id", "created_at", "id"),
+    )
+
+    # Columns kept in sync by sync_deadline_columns()
+    DEADLINE_COLUMNS = (
+        "leave_start_date", "leave_end_date", "certification_deadline",
+        "cure_window_end", "recertification_date", "certification_complete",
+    )
+    # Fields the deadline columns are computed from
+    DEADLINE_INPUTS = frozenset({"leave", "notice_date", "medical_provider", "compliance_flags"})
 
     # Primary key
     id = Column(String(50), primary_key=True, index=True)
@@ -62,6 +75,16 @@ class LeaveRequestDB(Base):
     notice_date = Column(Date, nullable=True)
     created_at = Column(Date, nullable=False, default=date_type.today, index=True)
 
+    # Denormalized deadline columns (computed from leave/notice_date/medical_provider/
+    # compliance_flags) so deadline and at-risk filters are indexed range scans.
+    # certification_deadline is NULL when notice_date is missing.
+    leave_start_date = Column(Date, nullable=True, index=True)
+    leave_end_date = Column(Date, nullable=True, index=True)
+    certification_deadline = Column(Date, nullable=True, index=True)
+    cure_window_end = Column(Date, nullable=True, index=True)
+    recertification_date = Column(Date, nullable=True, index=True)
+    certification_complete = Column(Boolean, nullable=False, default=False)
+
     # Audit timestamp (automatically updated on changes)
     updated_at = Column(
         DateTime,
@@ -98,11 +121,30 @@ class LeaveRequestDB(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
+    def sync_deadline_columns(self):
+        """Recompute the denormalized deadline columns from the source fields."""
+        fields = deadline_fields({
+            "leave": self.leave,
+            "notice_date": self.notice_date,
+            "medical_provider": self.medical_provider,
+            "compliance_flags": self.compliance_flags,
+        })
+        for key, value in fields.items():
+            setattr(self, key, value)
+
     def __repr__(self) -> str:
         """String representation for debugging."""
         return f"<LeaveRequestDB(id={self.id}, status={self.status}, created_at={self.created_at})>"
 
 
+# ORM inserts/updates keep the deadline columns in sync. Bulk UPDATE statements
+# bypass these hooks; DBStorage.update_leave_request syncs those itself.
+@event.listens_for(LeaveRequestDB, "before_insert")
+@event.listens_for(LeaveRequestDB, "before_update")
+def _sync_leave_request_deadlines(mapper, connection, target):
+    target.sync_deadline_columns()
+
+
 class NotificationDB(Base):
     """
     SQLAlchemy ORM model for notifications table.
@@ -111,6 +153,14 @@ class NotificationDB(Base):
     relationship to leave requests.
     """
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination over all notifications and per leave request
+        Index("ix_notifications_created_at_id", "created_at", "id"),
+        Index("ix_notifications_request_id_created_at_id", "request_id", "created_at", "id"),
+        # Unique index (not an inline constraint) so migrations can add it to
+        # existing tables (scripts/migrate_notification_columns.py)
+        Index("ux_notifications_dedup_key", "dedup_key", unique=True),
+    )
 
     # Primary key
     id = Column(String(50), primary_key=True, index=True)
@@ -132,7 +182,12 @@ class NotificationDB(Base):
     )
     recipient = Column(String(255), nullable=False)
     subject = Column(Text, nullable=False)
-    body = Column(Text, nullable=False)
+    # NULL for compact notifications, whose body is rendered on read from
+    # template_id/template_version/params (NOTIFICATION_COMPACT_STORAGE)
+    body = Column(Text, nullable=True)
+    template_id = Column(String(50), nullable=True)
+    template_version = Column(Integer, nullable=True)
+    params = Column(JSONType, nullable=True)
     created_at = Column(
         DateTime,
         nullable=False,
@@ -141,6 +196,11 @@ class NotificationDB(Base):
     )
     read_status = Column(Boolean, default=False, nullable=False, index=True)
 
+    # (request, type, deadline) of deadline reminders; the unique index keeps
+    # retried or repeated sweeps from storing the same reminder twice.
+    # NULL for notifications that aren't deduplicated.
+    dedup_key = Column(String(200), nullable=True)
+
     # Audit timestamp
     updated_at = Column(
         DateTime,
@@ -168,8 +228,100 @@ class NotificationDB(Base):
             "body": self.body,
             "created_at": self.created_at.isoformat(),
             "read_status": self.read_status,
+            "dedup_key": self.dedup_key,
+            "template_id": self.template_id,
+            "template_version": self.template_version,
+            "params": self.params,
         }
 
     def __repr__(self) -> str:
         """String representation for debugging."""
         return f"<NotificationDB(id={self.id}, type={self.type}, read={self.read_status})>"
+
+
+class ComplianceSnapshotDB(Base):
+    """
+    SQLAlchemy ORM model for compliance_snapshot table.
+
+    Caches the compliance status and at-risk timeline events of each leave
+    request, as computed on ``as_of``. Rows are rewritten whenever their
+    leave request is written, and lazily once ``next_change`` is reached
+    (see services.compliance_snapshot).
+    """
+    __tablename__ = "compliance_snapshot"
+    __table_args__ = (
+        # Alerts query: WHERE at_risk ORDER BY risk_rank, certification_deadline
+        Index(
+            "ix_compliance_snapshot_at_risk_rank_deadline",
+            "at_risk", "risk_rank", "certification_deadline"
+        ),
+    )
+
+    # One snapshot per leave request, removed with it
+    request_id = Column(
+        String(50),
+        ForeignKey("leave_requests.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    as_of = Column(Date, nullable=False)
+    # First day the cached values may be wrong; NULL if they never change
+    next_change = Column(Date, nullable=True, index=True)
+
+    at_risk = Column(Boolean, nullable=False, default=False)
+    risk_rank = Column(Integer, nullable=False)  # services.compliance_snapshot.RISK_ORDER
+    certification_deadline = Column(Date, nullable=False)
+
+    compliance = Column(JSONType, nullable=False)  # ComplianceStatus as JSON
+    at_risk_events = Column(JSONType, nullable=False, default=list)  # TimelineEvents as JSON
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<ComplianceSnapshotDB(request_id={self.request_id}, as_of={self.as_of}, at_risk={self.at_risk})>"
+
+
+class NotificationOutboxDB(Base):
+    """
+    SQLAlchemy ORM model for notification_outbox table.
+
+    One row per notification waiting to be emailed (only written when
+    NOTIFICATION_DELIVERY_ENABLED). Rows are inserted in the same
+    transaction as their notification and deleted once it is delivered;
+    undeliverable ones stay behind with status "failed".
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Claim query: WHERE status IN (pending, sending) AND available_at <= now
+        Index("ix_notification_outbox_status_available_at", "status", "available_at"),
+    )
+
+    notification_id = Column(
+        String(50),
+        ForeignKey("notifications.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # pending -> sending (claimed by a worker until available_at) -> deleted,
+    # or back to pending (retry at available_at), or failed
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    claim_token = Column(String(36), nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+
+    def to_dict(self) -> dict:
+        """Convert ORM model to an outbox entry dictionary."""
+        return {
+            "id": self.notification_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "available_at": self.available_at.isoformat(),
+            "created_at": self.created_at.isoformat(),
+            "claim_token": self.claim_token,
+            "last_error": self.last_error,
+        }
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<NotificationOutboxDB(notification_id={self.notification_id}, status={self.status})>"
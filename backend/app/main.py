@@ -7,7 +7,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .api.routes import leave_requests, timeline, notifications
 from .config import settings
-from .db.database import init_db
+from .db.database import init_db, init_async_db, get_async_engine
+from .services.alerts_engine import start_sweep_pool, stop_sweep_pool
+from .services.notification_delivery import pool as delivery_pool
+from .services.notification_scheduler import scheduler
+from .services.snapshot_refresher import refresher
 
 # Create FastAPI application
 app = FastAPI(
@@ -23,6 +27,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor for list endpoints
 )
 
 
@@ -35,12 +40,37 @@ async def startup_event():
     Creates all tables if they don't exist.
     Only runs if USE_DATABASE=true in configuration.
     """
-    if settings.USE_DATABASE:
+    if settings.USE_DATABASE and settings.ASYNC_DATABASE:
+        await init_async_db()
+        print(f"Database initialized (async engine): {settings.DATABASE_URL}")
+    elif settings.USE_DATABASE:
         init_db()
         print(f"Database initialized: {settings.DATABASE_URL}")
     else:
         print("Using JSON file storage (USE_DATABASE=false)")
 
+    # Worker processes for large alert sweeps (none unless COMPLIANCE_SWEEP_WORKERS > 1)
+    start_sweep_pool()
+    # Compliance snapshots only exist in the database; refreshed at startup, then daily
+    if settings.USE_DATABASE:
+        refresher.start()
+    if settings.NOTIFICATION_SCHEDULER_ENABLED:
+        scheduler.start()
+    if settings.NOTIFICATION_DELIVERY_ENABLED:
+        delivery_pool.start()
+
+
+# Shutdown event: stop background work, release pooled async connections
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work and worker processes; dispose of the async engine's pool."""
+    await scheduler.stop()
+    await refresher.stop()
+    stop_sweep_pool()
+    await delivery_pool.stop()
+    if settings.USE_DATABASE and settings.ASYNC_DATABASE:
+        await get_async_engine().dispose()
+
 # Include routers
 app.include_router(leave_requests.router)
 app.include_router(timeline.router)
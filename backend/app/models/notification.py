@@ -2,7 +2,8 @@
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 from enum import Enum
 
 
@@ -35,6 +36,11 @@ class Notification(BaseModel):
         description="When notification was created"
     )
     read_status: bool = Field(default=False, description="Whether notification has been read")
+    dedup_key: Optional[str] = Field(
+        None,
+        description="Identifies the logical notification (request, type, deadline); "
+                    "at most one notification is stored per key"
+    )
 
     class Config:
         json_schema_extra = {
@@ -46,6 +52,70 @@ class Notification(BaseModel):
                 "subject": "FMLA Certification Due in 3 Days",
                 "body": "Your medical certification is due by February 16, 2025...",
                 "created_at": "2025-02-13T10:00:00",
-                "read_status": False
+                "read_status": False,
+                "dedup_key": "req-456:certification_due:2025-02-16"
             }
         }
+
+
+class NotificationSummary(BaseModel):
+    """
+    Notification without its body, for list views.
+
+    Built straight from stored records: compact notifications are listed
+    without rendering their bodies.
+    """
+
+    id: str = Field(..., description="Unique notification identifier")
+    request_id: str = Field(..., description="Associated leave request ID")
+    type: NotificationType = Field(..., description="Type of notification")
+    subject: str = Field(..., description="Email subject line")
+    created_at: datetime = Field(..., description="When notification was created")
+    read_status: bool = Field(default=False, description="Whether notification has been read")
+
+
+class NotificationSelection(BaseModel):
+    """
+    Selects notifications for a bulk operation.
+
+    All given criteria must match. Omitted criteria match everything.
+    """
+
+    ids: Optional[list[str]] = Field(
+        None, max_length=1000, description="Only these notification IDs"
+    )
+    request_id: Optional[str] = Field(None, description="Only notifications for this leave request")
+    notification_type: Optional[NotificationType] = Field(
+        None, description="Only notifications of this type"
+    )
+
+    def is_empty(self) -> bool:
+        """Whether no criteria are set (i.e. every notification is selected)."""
+        return self.ids is None and self.request_id is None and self.notification_type is None
+
+
+class BulkOperationResult(BaseModel):
+    """Result of a bulk notification operation."""
+
+    count: int = Field(..., description="Number of notifications changed or deleted")
+
+
+class NotificationSweepResult(BaseModel):
+    """Outcome and timings of one reminder notification sweep."""
+
+    as_of: date = Field(..., description="Day the sweep ran for")
+    started_at: datetime = Field(..., description="When the sweep started")
+    due_events: int = Field(..., description="Indexed events found in the reminder windows")
+    duplicates_skipped: int = Field(
+        0, description="Due reminders skipped because they were already stored"
+    )
+    requests_loaded: int = Field(..., description="Leave requests loaded to render reminders")
+    notifications_created: int = Field(..., description="Notifications written")
+    batches: int = Field(..., description="Bulk inserts issued")
+    find_ms: float = Field(..., description="Time spent finding due events")
+    generate_ms: float = Field(..., description="Time spent loading requests and rendering")
+    write_ms: float = Field(..., description="Time spent in bulk inserts")
+    duration_ms: float = Field(..., description="Total sweep time")
+    snapshots_refreshed: int = Field(
+        0, description="Compliance snapshots recomputed by the sweep endpoint (database storage)"
+    )
@@ -0,0 +1,365 @@
+"""
+Single-pass compliance alerts.
+
+compute_alerts (in compliance_snapshot) validates every request into a
+Pydantic model, runs ComplianceChecker.check_compliance and then
+TimelineGenerator.get_at_risk_events, which rebuilds the full timeline and
+recomputes the certification deadline and cure window again before both
+results are re-serialized with model_dump.
+
+AlertsEngine works on storage dictionaries instead. For each request it
+computes the deadline set (certification deadline, cure window,
+recertification date) once and derives the compliance status and the
+at-risk events from it as JSON-ready dicts. Only requests that turn out to
+be at risk are validated into a LeaveRequest, for the "request" part of the
+alert. The output is identical to compute_alerts.
+
+Evaluation itself runs on a compact tuple of the fields it reads
+(compact_request), so large sweeps can be split into chunks and evaluated
+in worker processes (compute_alerts with ``workers`` > 1): only the compact
+tuples are pickled to the workers, each returns its at-risk results sorted
+by (risk level, days until deadline, input position), and the chunks are
+combined with a k-way merge. Each chunk first computes its certification
+deadlines with BatchDeadlineCalculator and only evaluates the requests
+within AT_RISK_WINDOW_DAYS of theirs.
+
+The worker processes belong to one long-lived pool (start_sweep_pool at
+application startup, stop_sweep_pool at shutdown). Workers are started with
+forkserver (spawn where that is unavailable), never forked from the
+multithreaded server process. Async callers use compute_alerts_async, which
+awaits the chunks instead of blocking the event loop on them.
+"""
+import asyncio
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+from ..config import settings
+from ..models.leave_request import LeaveRequest
+from ..models.timeline_event import EventStatus, EventType
+from ..utils.deadline_fields import as_date
+from .batch_deadline_calculator import BatchDeadlineCalculator
+from .compliance_checker import AT_RISK_WINDOW_DAYS
+from .compliance_snapshot import EVENT_WARNING_DAYS, MEDIUM_RISK_DAYS, RISK_ORDER
+from .deadline_calculator import DeadlineCalculator
+from .timeline_generator import CRITICAL_EVENT_TEXT
+
+
+# Process pool shared by every parallel sweep in this process
+_sweep_pool: ProcessPoolExecutor | None = None
+
+
+def start_sweep_pool(workers: int | None = None) -> ProcessPoolExecutor | None:
+    """
+    Create the worker pool for parallel sweeps (no-op if it exists).
+
+    Args:
+        workers: Pool size (defaults to COMPLIANCE_SWEEP_WORKERS, 0 = one per CPU)
+
+    Returns:
+        The pool, or None when sweeps are configured to run in process
+    """
+    global _sweep_pool
+    if _sweep_pool is None:
+        workers = settings.COMPLIANCE_SWEEP_WORKERS if workers is None else workers
+        workers = workers or os.cpu_count() or 1
+        if workers > 1:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _sweep_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method)
+            )
+    return _sweep_pool
+
+
+def stop_sweep_pool():
+    """Shut the worker pool down, waiting for running chunks."""
+    global _sweep_pool
+    if _sweep_pool is not None:
+        _sweep_pool.shutdown()
+        _sweep_pool = None
+
+
+def _value(field):
+    """Enum value or plain value (storage dicts may hold either)."""
+    return getattr(field, "value", field)
+
+
+def compact_request(request_data: dict) -> tuple:
+    """
+    The fields of a leave request storage dictionary that evaluation reads.
+
+    Dates are passed through as stored (ISO strings or date objects) and
+    parsed by the evaluator, so that work happens in the worker process too.
+
+    Returns:
+        (id, start_date, condition_type, notice_date, signature_present,
+        date_signed is set, compliance_flags, status)
+    """
+    leave = request_data["leave"]
+    provider = request_data["medical_provider"]
+    return (
+        request_data["id"],
+        leave["start_date"],
+        _value(leave.get("condition_type")) or "serious",
+        request_data.get("notice_date"),
+        bool(provider.get("signature_present")),
+        provider.get("date_signed") is not None,
+        tuple(request_data.get("compliance_flags") or ()),
+        _value(request_data.get("status")),
+    )
+
+
+def _evaluate_chunk(
+    compact: list[tuple],
+    offset: int,
+    as_of: date,
+    warning_days: int
+) -> list[tuple]:
+    """
+    Worker-process entry point: evaluate one chunk of compact requests.
+
+    Returns:
+        (risk order, days until deadline, input position, compliance,
+        at-risk events) for the at-risk requests, sorted
+    """
+    if not compact:
+        return []
+    engine = AlertsEngine(warning_days, workers=1)
+
+    # One vectorized pass over the certification deadlines; requests due
+    # beyond the at-risk window can't be at risk and are never evaluated
+    starts = [request[1] for request in compact]
+    notices = [request[3] for request in compact]
+    deadlines = BatchDeadlineCalculator.calculate_certification_deadlines(starts, notices, as_of=as_of)
+    days_until = BatchDeadlineCalculator.calculate_days_until(deadlines, as_of=as_of)
+    candidates = np.flatnonzero(days_until <= AT_RISK_WINDOW_DAYS).tolist()
+
+    keyed = []
+    for index in candidates:
+        position = offset + index
+        compliance, at_risk_events = engine.evaluate_compact(compact[index], as_of)
+        if compliance["at_risk"]:
+            keyed.append((
+                RISK_ORDER[compliance["risk_level"]],
+                compliance["days_until_certification_deadline"],
+                position,
+                compliance,
+                at_risk_events,
+            ))
+    keyed.sort(key=lambda item: item[:3])
+    return keyed
+
+
+def _event_status(event_date: date, completed: bool, as_of: date) -> str:
+    """Same rule as TimelineGenerator._calculate_event_status."""
+    if completed:
+        return EventStatus.COMPLETED.value
+    if event_date < as_of:
+        return EventStatus.OVERDUE.value
+    if event_date == as_of:
+        return EventStatus.TODAY.value
+    return EventStatus.UPCOMING.value
+
+
+class AlertsEngine:
+    """
+    Compute compliance alerts for many leave requests in one pass.
+    """
+
+    def __init__(
+        self,
+        warning_days: int = EVENT_WARNING_DAYS,
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        parallel_min_requests: int | None = None
+    ):
+        """
+        Args:
+            warning_days: Days before a critical event that it counts as at risk
+            workers: Worker processes for large sweeps; 1 evaluates in this
+                process, 0 uses one per CPU (defaults to COMPLIANCE_SWEEP_WORKERS)
+            chunk_size: Requests per worker task (defaults to COMPLIANCE_SWEEP_CHUNK_SIZE)
+            parallel_min_requests: Smaller sweeps always run in this process
+                (defaults to COMPLIANCE_SWEEP_PARALLEL_MIN_REQUESTS)
+        """
+        self.warning_days = warning_days
+        workers = settings.COMPLIANCE_SWEEP_WORKERS if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.COMPLIANCE_SWEEP_CHUNK_SIZE
+        self.parallel_min_requests = (
+            settings.COMPLIANCE_SWEEP_PARALLEL_MIN_REQUESTS
+            if parallel_min_requests is None else parallel_min_requests
+        )
+
+    def evaluate(self, request_data: dict, as_of: date) -> tuple[dict, list[dict]]:
+        """
+        Compliance status and at-risk events for one request.
+
+        Args:
+            request_data: Leave request storage dictionary
+            as_of: Evaluation date
+
+        Returns:
+            Tuple of (compliance, at_risk_events), shaped like
+            ``ComplianceStatus.model_dump(mode='json')`` and a list of
+            ``TimelineEvent.model_dump(mode='json')``
+        """
+        return self.evaluate_compact(compact_request(request_data), as_of)
+
+    def evaluate_compact(self, request: tuple, as_of: date) -> tuple[dict, list[dict]]:
+        """Same as evaluate, on the tuple compact_request returns."""
+        (request_id, start_date, condition_type, notice_date,
+         cert_received, date_signed_set, flags, status) = request
+        start_date = as_date(start_date)
+
+        # Deadline set, computed once
+        cert_deadline = DeadlineCalculator.calculate_certification_deadline(
+            start_date, as_date(notice_date) or as_of
+        )
+        cure_start, cure_end = DeadlineCalculator.calculate_cure_window(cert_deadline)
+        recert_date = DeadlineCalculator.calculate_recertification_date(start_date, condition_type)
+
+        # Compliance status (ComplianceChecker.check_compliance)
+        cert_complete = cert_received and not flags
+        days_until = (cert_deadline - as_of).days
+        in_cure_window = not cert_complete and cure_start <= as_of <= cure_end
+
+        if days_until < 0 or in_cure_window:
+            risk_level = "high"
+        elif days_until <= MEDIUM_RISK_DAYS and not cert_complete:
+            risk_level = "medium"
+        elif days_until <= AT_RISK_WINDOW_DAYS and not cert_complete:
+            risk_level = "low"
+        else:
+            risk_level = "none"
+
+        compliance = {
+            "request_id": request_id,
+            "is_compliant": cert_complete and days_until >= 0,
+            "certification_received": cert_received,
+            "certification_complete": cert_complete,
+            "certification_deadline": cert_deadline.isoformat(),
+            "days_until_certification_deadline": days_until,
+            "in_cure_window": in_cure_window,
+            "cure_window_end": cure_end.isoformat() if in_cure_window else None,
+            "compliance_issues": list(flags),
+            "at_risk": risk_level != "none",
+            "risk_level": risk_level,
+        }
+        if risk_level == "none":
+            return compliance, []
+
+        # At-risk events (TimelineGenerator.get_at_risk_events)
+        cert_signed = cert_received and date_signed_set
+        events = [(EventType.CERTIFICATION_DEADLINE, cert_deadline, cert_signed)]
+        needs_cure_window = (
+            not cert_received or flags or status == "awaiting_docs"
+        )
+        if needs_cure_window:
+            events += [
+                (EventType.CURE_WINDOW_START, cure_start, False),
+                (EventType.CURE_WINDOW_END, cure_end, False),
+            ]
+        events.append((EventType.RECERTIFICATION_DUE, recert_date, False))
+        events.sort(key=lambda event: event[1])
+
+        condition_label = "6 months" if condition_type == "chronic" else "30 days"
+        at_risk_events = []
+        for event_type, event_date, completed in events:
+            status = _event_status(event_date, completed, as_of)
+            if status == EventStatus.COMPLETED.value:
+                continue
+            if status != EventStatus.OVERDUE.value and (event_date - as_of).days > self.warning_days:
+                continue
+            title, description = CRITICAL_EVENT_TEXT[event_type]
+            at_risk_events.append({
+                "event_type": event_type.value,
+                "event_date": event_date.isoformat(),
+                "status": status,
+                "title": title,
+                "description": description.format(condition_label=condition_label),
+                "is_critical": True,
+            })
+
+        return compliance, at_risk_events
+
+    def compute_alerts(self, requests: Iterable[dict], as_of: date | None = None) -> list[dict]:
+        """
+        Alerts for every at-risk request, most urgent first.
+
+        Sweeps of at least ``parallel_min_requests`` requests are evaluated
+        in the worker pool when more than one worker is configured; this
+        blocks the calling thread until they finish, so async code should
+        use compute_alerts_async.
+
+        Args:
+            requests: Leave request storage dictionaries
+            as_of: Evaluation date (defaults to today, fixed for the whole sweep)
+
+        Returns:
+            List of alert dicts, same order and shape as compute_alerts
+        """
+        as_of = as_of or date.today()
+        requests = list(requests)
+        if self._parallel(requests):
+            pool = start_sweep_pool(self.workers)
+            futures = [pool.submit(_evaluate_chunk, *args) for args in self._chunks(requests, as_of)]
+            keyed = heapq.merge(*(future.result() for future in futures), key=lambda item: item[:3])
+        else:
+            keyed = _evaluate_chunk(
+                [compact_request(r) for r in requests], 0, as_of, self.warning_days
+            )
+        return self._alerts(requests, keyed)
+
+    async def compute_alerts_async(self, requests: Iterable[dict], as_of: date | None = None) -> list[dict]:
+        """
+        Same as compute_alerts without blocking the event loop.
+
+        In-process sweeps run in the loop's default thread pool; parallel
+        sweeps await their chunks from the worker pool.
+        """
+        as_of = as_of or date.today()
+        requests = list(requests)
+        loop = asyncio.get_running_loop()
+        if not self._parallel(requests):
+            return await loop.run_in_executor(None, self.compute_alerts, requests, as_of)
+
+        pool = start_sweep_pool(self.workers)
+        chunks = await loop.run_in_executor(None, lambda: list(self._chunks(requests, as_of)))
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, _evaluate_chunk, *args) for args in chunks
+        ))
+        keyed = heapq.merge(*results, key=lambda item: item[:3])
+        return await loop.run_in_executor(None, self._alerts, requests, keyed)
+
+    def _parallel(self, requests: list[dict]) -> bool:
+        """Whether a sweep is large enough to split across worker processes."""
+        return self.workers > 1 and len(requests) >= max(self.parallel_min_requests, 2)
+
+    def _chunks(self, requests: list[dict], as_of: date) -> Iterable[tuple]:
+        """_evaluate_chunk arguments for each chunk of a parallel sweep."""
+        chunk_size = min(self.chunk_size, -(-len(requests) // self.workers))
+        for offset in range(0, len(requests), chunk_size):
+            yield (
+                [compact_request(r) for r in requests[offset:offset + chunk_size]],
+                offset,
+                as_of,
+                self.warning_days,
+            )
+
+    def _alerts(self, requests: list[dict], keyed: Iterable[tuple]) -> list[dict]:
+        """Alert dicts for the sorted evaluation results."""
+        # Ties keep input order (the position in the key) like get_all_at_risk_requests
+        return [
+            {
+                "request": LeaveRequest(**requests[position]).model_dump(mode='json'),
+                "compliance": compliance,
+                "at_risk_events": at_risk_events,
+            }
+            for _, _, position, compliance, at_risk_events in keyed
+        ]
@@ -0,0 +1,175 @@
+"""
+Vectorized FMLA deadline calculations over arrays of requests.
+
+BatchDeadlineCalculator applies the same rules as DeadlineCalculator to
+whole columns of dates at once using NumPy ``datetime64[D]`` arithmetic,
+for sweeps over many requests (nightly compliance runs, backfills). Results
+match the scalar methods element for element.
+
+Dates may be given as ``datetime.date`` objects, ISO strings or
+``datetime64`` values; missing notice dates may be None (treated like the
+scalar default of "today", or the ``as_of`` day given).
+"""
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+
+# Same rules as DeadlineCalculator
+NOTICE_TO_CERTIFICATION_DAYS = 15
+CURE_WINDOW_DAYS = 7
+SERIOUS_RECERTIFICATION_DAYS = 30
+CHRONIC_RECERTIFICATION_MONTHS = 6
+
+
+def to_datetime64(dates: Iterable) -> np.ndarray:
+    """
+    Convert dates to a ``datetime64[D]`` array (None becomes NaT).
+
+    Args:
+        dates: Iterable of date, ISO date string, datetime64 or None
+
+    Returns:
+        1-D ``datetime64[D]`` array
+    """
+    if isinstance(dates, np.ndarray) and dates.dtype == "datetime64[D]":
+        return dates
+    # One np.array call parses the whole list in C
+    return np.array(["NaT" if d is None else d for d in dates], dtype="datetime64[D]")
+
+
+def add_months(dates: np.ndarray, months: int) -> np.ndarray:
+    """
+    Vectorized ``utils.date_utils.add_months``.
+
+    Keeps the day of month, clamped to the length of the target month
+    (Jan 31 + 1 month = Feb 28/29), like ``relativedelta(months=...)``.
+    """
+    month_start = dates.astype("datetime64[M]")
+    day_offset = dates - month_start.astype("datetime64[D]")
+    target_month = month_start + np.timedelta64(months, "M")
+    target_start = target_month.astype("datetime64[D]")
+    month_length = (target_month + np.timedelta64(1, "M")).astype("datetime64[D]") - target_start
+    return target_start + np.minimum(day_offset, month_length - np.timedelta64(1, "D"))
+
+
+class BatchDeadlineCalculator:
+    """
+    Array counterpart of DeadlineCalculator.
+
+    Every method takes and returns NumPy arrays of equal length; element i
+    of each output belongs to element i of the inputs.
+    """
+
+    @staticmethod
+    def calculate_certification_deadlines(
+        leave_start_dates: Iterable,
+        notice_dates: Iterable,
+        as_of: date | None = None
+    ) -> np.ndarray:
+        """
+        Certification deadlines: the earlier of notice + 15 days and leave start.
+
+        Args:
+            leave_start_dates: Dates leave begins
+            notice_dates: Dates notice was given (None means ``as_of``)
+            as_of: Stand-in for missing notice dates (defaults to date.today())
+
+        Returns:
+            ``datetime64[D]`` array of deadlines
+        """
+        starts = to_datetime64(leave_start_dates)
+        notices = to_datetime64(notice_dates)
+        notices = np.where(np.isnat(notices), np.datetime64(as_of or date.today(), "D"), notices)
+        return np.minimum(notices + np.timedelta64(NOTICE_TO_CERTIFICATION_DAYS, "D"), starts)
+
+    @staticmethod
+    def calculate_cure_windows(certification_deadlines: Iterable) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Cure windows: the day after each deadline through deadline + 7 days.
+
+        Args:
+            certification_deadlines: Certification deadlines
+
+        Returns:
+            Tuple of (cure_start_dates, cure_end_dates) arrays
+        """
+        deadlines = to_datetime64(certification_deadlines)
+        return (
+            deadlines + np.timedelta64(1, "D"),
+            deadlines + np.timedelta64(CURE_WINDOW_DAYS, "D"),
+        )
+
+    @staticmethod
+    def calculate_recertification_dates(
+        leave_start_dates: Iterable,
+        condition_types: Iterable[str]
+    ) -> np.ndarray:
+        """
+        Recertification dates: 6 months after start for chronic conditions,
+        30 days after start otherwise.
+
+        Args:
+            leave_start_dates: Dates leave begins
+            condition_types: "serious" or "chronic" per request
+
+        Returns:
+            ``datetime64[D]`` array of recertification dates
+        """
+        starts = to_datetime64(leave_start_dates)
+        chronic = np.asarray([getattr(c, "value", c) for c in condition_types]) == "chronic"
+        return np.where(
+            chronic,
+            add_months(starts, CHRONIC_RECERTIFICATION_MONTHS),
+            starts + np.timedelta64(SERIOUS_RECERTIFICATION_DAYS, "D")
+        )
+
+    @staticmethod
+    def calculate_days_until(target_dates: Iterable, as_of: date | None = None) -> np.ndarray:
+        """
+        Days from ``as_of`` to each target date (negative if in the past).
+
+        Args:
+            target_dates: Target dates (must not be missing)
+            as_of: Reference day (defaults to date.today())
+
+        Returns:
+            ``int64`` array of day counts
+        """
+        targets = to_datetime64(target_dates)
+        return (targets - np.datetime64(as_of or date.today(), "D")).astype(np.int64)
+
+    @classmethod
+    def calculate_all(
+        cls,
+        leave_start_dates: Iterable,
+        notice_dates: Iterable,
+        condition_types: Iterable[str],
+        as_of: date | None = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Compute every deadline for a batch of requests in one pass.
+
+        Args:
+            leave_start_dates: Dates leave begins
+            notice_dates: Dates notice was given (None means ``as_of``)
+            condition_types: "serious" or "chronic" per request
+            as_of: Reference day (defaults to date.today())
+
+        Returns:
+            Dict of arrays: certification_deadline, cure_window_start,
+            cure_window_end, recertification_date and
+            days_until_certification_deadline
+        """
+        as_of = as_of or date.today()
+        starts = to_datetime64(leave_start_dates)
+        deadlines = cls.calculate_certification_deadlines(starts, notice_dates, as_of)
+        cure_starts, cure_ends = cls.calculate_cure_windows(deadlines)
+        return {
+            "certification_deadline": deadlines,
+            "cure_window_start": cure_starts,
+            "cure_window_end": cure_ends,
+            "recertification_date": cls.calculate_recertification_dates(starts, condition_types),
+            "days_until_certification_deadline": cls.calculate_days_until(deadlines, as_of),
+        }
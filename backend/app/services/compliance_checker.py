@@ -1,31 +1,58 @@
 # Written by Claude Code on 2026-01-29
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
-from datetime import date
+from datetime import date, timedelta
 from ..models.compliance import ComplianceStatus
 from ..models.leave_request import LeaveRequest
 from .deadline_calculator import DeadlineCalculator
 
 
+# Incomplete certifications due within this many days are at risk
+AT_RISK_WINDOW_DAYS = 7
+
+
 class ComplianceChecker:
     """
     Check FMLA compliance status for leave requests.
     """
 
+    @staticmethod
+    def is_at_risk(certification_deadline: date, certification_complete: bool, as_of: date) -> bool:
+        """
+        At-risk test on precomputed deadline fields.
+
+        Equivalent to ``check_compliance(...).at_risk``: overdue requests
+        (including those in the cure window) are always at risk, incomplete
+        ones are at risk from AT_RISK_WINDOW_DAYS before the deadline.
+        DBStorage.query_leave_requests runs the same test in SQL.
+        """
+        if certification_deadline < as_of:
+            return True
+        horizon = as_of + timedelta(days=AT_RISK_WINDOW_DAYS)
+        return certification_deadline <= horizon and not certification_complete
+
     def __init__(self):
         self.calculator = DeadlineCalculator()
 
-    def check_compliance(self, leave_request: LeaveRequest) -> ComplianceStatus:
+    def check_compliance(
+        self,
+        leave_request: LeaveRequest,
+        as_of: date | None = None
+    ) -> ComplianceStatus:
         """
         Check compliance status for a leave request.
 
+        The result is a pure function of (leave_request, as_of).
+
         Args:
             leave_request: The leave request to check
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             ComplianceStatus with detailed compliance information
         """
-        notice_date = leave_request.notice_date or date.today()
+        today = as_of or date.today()
+        notice_date = leave_request.notice_date or today
         cert_deadline = self.calculator.calculate_certification_deadline(
             leave_request.leave.start_date,
             notice_date
@@ -39,10 +66,9 @@ class ComplianceChecker:
         )
 
         # Calculate days until deadline
-        days_until_deadline = self.calculator.calculate_days_until(cert_deadline)
+        days_until_deadline = self.calculator.calculate_days_until(cert_deadline, today)
 
         # Check if in cure window
-        today = date.today()
         in_cure_window = False
         cure_window_end = None
 
@@ -101,7 +127,7 @@ class ComplianceChecker:
             return (True, "medium")
 
         # Low risk: deadline within 7 days and incomplete
-        if days_until_deadline <= 7 and not cert_complete:
+        if days_until_deadline <= AT_RISK_WINDOW_DAYS and not cert_complete:
             return (True, "low")
 
         # No risk: either complete or deadline is far away
@@ -109,21 +135,24 @@ class ComplianceChecker:
 
     def get_all_at_risk_requests(
         self,
-        leave_requests: list[LeaveRequest]
+        leave_requests: list[LeaveRequest],
+        as_of: date | None = None
     ) -> list[tuple[LeaveRequest, ComplianceStatus]]:
         """
         Get all leave requests that are at risk.
 
         Args:
             leave_requests: List of leave requests to check
+            as_of: Evaluation date (defaults to today, fixed for the whole sweep)
 
         Returns:
             List of tuples (leave_request, compliance_status) for at-risk requests
         """
         at_risk = []
+        as_of = as_of or date.today()
 
         for request in leave_requests:
-            compliance = self.check_compliance(request)
+            compliance = self.check_compliance(request, as_of)
             if compliance.at_risk:
                 at_risk.append((request, compliance))
 
@@ -0,0 +1,164 @@
+"""
+Compliance alerts and the snapshots that cache them.
+
+An alert is the compliance status of an at-risk leave request plus its
+at-risk timeline events. Computing it needs a Pydantic model, the compliance
+checker and the timeline generator, so the database backend caches the
+result per request in the compliance_snapshot table.
+
+A snapshot computed on day ``as_of`` stays valid until ``next_change``: the
+first day on which a risk band, the cure-window flag or an event status can
+flip. Until then only ``days_until_certification_deadline`` moves, and that
+is recomputed on read.
+"""
+import heapq
+from datetime import date, timedelta
+
+from ..models.leave_request import LeaveRequest
+from .compliance_checker import AT_RISK_WINDOW_DAYS, ComplianceChecker
+from .deadline_calculator import DeadlineCalculator
+from .timeline_generator import TimelineGenerator
+
+
+# Sort order of risk levels in alert lists (most urgent first)
+RISK_ORDER = {"high": 0, "medium": 1, "low": 2, "none": 3}
+
+# Days before a critical event that TimelineGenerator.get_at_risk_events flags it
+EVENT_WARNING_DAYS = 3
+
+# Days before the certification deadline that risk turns medium
+MEDIUM_RISK_DAYS = 3
+
+_checker = ComplianceChecker()
+_timeline_gen = TimelineGenerator()
+
+
+def compute_alerts(leave_requests: list[LeaveRequest], as_of: date | None = None) -> list[dict]:
+    """
+    Build alerts for every at-risk request, most urgent first.
+
+    Args:
+        leave_requests: Leave requests to check
+        as_of: Day the alerts are evaluated for (defaults to today)
+
+    Returns:
+        List of alert dicts sorted by risk level, then days until deadline
+    """
+    as_of = as_of or date.today()
+    alerts = []
+    for request, compliance in _checker.get_all_at_risk_requests(leave_requests, as_of):
+        alerts.append({
+            "request": request.model_dump(mode='json'),
+            "compliance": compliance.model_dump(mode='json'),
+            "at_risk_events": [
+                e.model_dump(mode='json') for e in _timeline_gen.get_at_risk_events(request, as_of=as_of)
+            ],
+        })
+    return alerts
+
+
+def next_change_date(leave_request: LeaveRequest, as_of: date) -> date | None:
+    """
+    First day after ``as_of`` on which the request's alert can change.
+
+    Collects every threshold used by ComplianceChecker (risk bands, cure
+    window) and TimelineGenerator (event approaching/today/overdue) and
+    returns the earliest one after ``as_of``.
+
+    Returns:
+        The date, or None if nothing will ever change
+    """
+    if leave_request.notice_date is None:
+        # The deadline is computed from as_of, so it moves every day
+        return as_of + timedelta(days=1)
+
+    calc = DeadlineCalculator
+    cert_deadline = calc.calculate_certification_deadline(
+        leave_request.leave.start_date, leave_request.notice_date
+    )
+    cure_start, cure_end = calc.calculate_cure_window(cert_deadline)
+    recert_date = calc.calculate_recertification_date(
+        leave_request.leave.start_date, leave_request.leave.condition_type.value
+    )
+
+    candidates = [
+        # Risk bands: low, medium, high (overdue) and end of cure window
+        cert_deadline - timedelta(days=AT_RISK_WINDOW_DAYS),
+        cert_deadline - timedelta(days=MEDIUM_RISK_DAYS),
+        cure_start,
+        cure_end + timedelta(days=1),
+    ]
+    for event_date in (cert_deadline, cure_start, cure_end, recert_date):
+        candidates += [
+            event_date - timedelta(days=EVENT_WARNING_DAYS),
+            event_date,
+            event_date + timedelta(days=1),
+        ]
+
+    upcoming = [d for d in candidates if d > as_of]
+    return min(upcoming) if upcoming else None
+
+
+def build_snapshot(leave_request: LeaveRequest, as_of: date) -> dict:
+    """
+    Compute the snapshot row for a leave request.
+
+    Args:
+        leave_request: The leave request
+        as_of: Day the snapshot is computed for
+
+    Returns:
+        Dict of compliance_snapshot column values
+    """
+    compliance = _checker.check_compliance(leave_request, as_of)
+    at_risk_events = []
+    if compliance.at_risk:
+        at_risk_events = [
+            e.model_dump(mode='json') for e in _timeline_gen.get_at_risk_events(leave_request, as_of=as_of)
+        ]
+    return {
+        "request_id": leave_request.id,
+        "as_of": as_of,
+        "next_change": next_change_date(leave_request, as_of),
+        "at_risk": compliance.at_risk,
+        "risk_rank": RISK_ORDER[compliance.risk_level],
+        "certification_deadline": compliance.certification_deadline,
+        "compliance": compliance.model_dump(mode='json'),
+        "at_risk_events": at_risk_events,
+    }
+
+
+def alert_from_snapshot(request_data: dict, snapshot: dict, today: date) -> dict:
+    """
+    Turn a still-valid snapshot back into an alert for ``today``.
+
+    Args:
+        request_data: Leave request storage dictionary
+        snapshot: compliance and certification_deadline from the snapshot row
+        today: Day the alert is served for
+
+    Returns:
+        Alert dict in the same shape as compute_alerts produces
+    """
+    compliance = dict(snapshot["compliance"])
+    compliance["days_until_certification_deadline"] = (
+        snapshot["certification_deadline"] - today
+    ).days
+    return {
+        "request": LeaveRequest(**request_data).model_dump(mode='json'),
+        "compliance": compliance,
+        "at_risk_events": snapshot["at_risk_events"],
+    }
+
+
+def merge_alerts(*alert_lists: list[dict]) -> list[dict]:
+    """
+    Merge alert lists that are each sorted most urgent first.
+
+    Ties are broken by request id, which is how snapshot rows are ordered.
+    """
+    return list(heapq.merge(*alert_lists, key=lambda alert: (
+        RISK_ORDER[alert["compliance"]["risk_level"]],
+        alert["compliance"]["days_until_certification_deadline"],
+        alert["request"]["id"],
+    )))
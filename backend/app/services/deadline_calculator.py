@@ -1,8 +1,8 @@
 # Written by Claude Code on 2026-01-29
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
-from datetime import date, timedelta
-from ..utils.date_utils import add_months, is_business_day
+from datetime import date
+from ..utils import deadline_fields as rules
 
 
 class DeadlineCalculator:
@@ -16,7 +16,8 @@ class DeadlineCalculator:
     @staticmethod
     def calculate_certification_deadline(
         leave_start_date: date,
-        notice_date: date | None = None
+        notice_date: date | None = None,
+        as_of: date | None = None
     ) -> date:
         """
         Calculate the deadline for employee to provide medical certification.
@@ -26,7 +27,8 @@ class DeadlineCalculator:
 
         Args:
             leave_start_date: Date when leave begins
-            notice_date: Date when employee gave notice (defaults to today)
+            notice_date: Date when employee gave notice (defaults to as_of)
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             Certification deadline date (earlier of 15 days after notice OR leave start)
@@ -36,14 +38,9 @@ class DeadlineCalculator:
             Leave starts Feb 1, notice given Jan 25 → Deadline = Feb 1 (leave start)
         """
         if notice_date is None:
-            notice_date = date.today()
+            notice_date = as_of or date.today()
 
-        # 15 calendar days from notice
-        fifteen_day_deadline = notice_date + timedelta(days=15)
-
-        # Certification must be received by leave start date
-        # Return the earlier of the two dates
-        return min(fifteen_day_deadline, leave_start_date)
+        return rules.certification_deadline(leave_start_date, notice_date)
 
     @staticmethod
     def calculate_cure_window(certification_deadline: date) -> tuple[date, date]:
@@ -62,13 +59,7 @@ class DeadlineCalculator:
         Example:
             Certification deadline Feb 16 → Cure window = Feb 17 to Feb 23
         """
-        # Cure window starts the day after certification deadline
-        cure_start = certification_deadline + timedelta(days=1)
-
-        # Cure window is 7 calendar days
-        cure_end = certification_deadline + timedelta(days=7)
-
-        return (cure_start, cure_end)
+        return rules.cure_window(certification_deadline)
 
     @staticmethod
     def calculate_recertification_date(
@@ -94,51 +85,52 @@ class DeadlineCalculator:
             Leave starts Feb 1, serious condition → Recert = Mar 3 (30 days)
             Leave starts Feb 1, chronic condition → Recert = Aug 1 (6 months)
         """
-        if condition_type == "chronic":
-            # 6 months for chronic conditions
-            return add_months(leave_start_date, 6)
-        else:
-            # 30 calendar days minimum for serious health conditions
-            return leave_start_date + timedelta(days=30)
+        return rules.recertification_date(leave_start_date, condition_type)
 
     @staticmethod
-    def is_approaching_deadline(deadline_date: date, warning_days: int = 3) -> bool:
+    def is_approaching_deadline(
+        deadline_date: date,
+        warning_days: int = 3,
+        as_of: date | None = None
+    ) -> bool:
         """
         Check if a deadline is approaching (within specified warning days).
 
         Args:
             deadline_date: The deadline to check
             warning_days: Number of days before deadline to trigger warning (default 3)
+            as_of: Evaluation date (defaults to today)
 
         Returns:
-            True if deadline is within warning_days of today
+            True if deadline is within warning_days of as_of
         """
-        today = date.today()
-        days_until = (deadline_date - today).days
+        days_until = (deadline_date - (as_of or date.today())).days
         return 0 <= days_until <= warning_days
 
     @staticmethod
-    def is_overdue(deadline_date: date) -> bool:
+    def is_overdue(deadline_date: date, as_of: date | None = None) -> bool:
         """
         Check if a deadline has passed.
 
         Args:
             deadline_date: The deadline to check
+            as_of: Evaluation date (defaults to today)
 
         Returns:
-            True if deadline is in the past
+            True if deadline is before as_of
         """
-        return deadline_date < date.today()
+        return deadline_date < (as_of or date.today())
 
     @staticmethod
-    def calculate_days_until(target_date: date) -> int:
+    def calculate_days_until(target_date: date, as_of: date | None = None) -> int:
         """
         Calculate number of days until a target date.
 
         Args:
             target_date: The target date
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             Number of days (negative if in the past)
         """
-        return (target_date - date.today()).days
+        return (target_date - (as_of or date.today())).days
@@ -0,0 +1,208 @@
+"""
+In-process calendar index of leave request deadlines.
+
+DeadlineIndex buckets every request's critical dates (certification
+deadline, cure window start and end, recertification, leave end) by day,
+with a sorted list of the days that have any. "What is due between start
+and end" is then two binary searches plus a walk over the matching buckets,
+so it costs time proportional to the result, not to the number of requests.
+
+Requests without a notice date have no fixed certification deadline (it is
+computed from the evaluation day), so only their recertification and leave
+end dates are indexed; their ids are kept in ``floating_ids``.
+
+File storage keeps one index per data file (see get_deadline_index), built
+on first use and kept current by the storage change hooks. The database
+backend answers the same queries from its indexed deadline columns.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Callable, Iterable, NamedTuple
+
+from ..models.timeline_event import EventType
+from ..storage import hooks
+from ..utils.deadline_fields import deadline_fields
+
+
+class DueEvent(NamedTuple):
+    """One indexed date: which request has which event on which day."""
+    event_date: date
+    request_id: str
+    event_type: str
+
+
+# Events tracked by the index
+INDEXED_EVENTS = (
+    EventType.CERTIFICATION_DEADLINE.value,
+    EventType.CURE_WINDOW_START.value,
+    EventType.CURE_WINDOW_END.value,
+    EventType.RECERTIFICATION_DUE.value,
+    EventType.LEAVE_END.value,
+)
+
+
+def deadline_events(request_data: dict) -> list[tuple[date, str]]:
+    """
+    The (date, event_type) pairs a leave request contributes to the index.
+
+    Args:
+        request_data: Leave request storage dictionary
+
+    Returns:
+        List of (event_date, event_type); certification and cure window
+        events are missing when the request has no notice date
+    """
+    fields = deadline_fields(request_data)
+    events = []
+    deadline = fields["certification_deadline"]
+    if deadline is not None:
+        events += [
+            (deadline, EventType.CERTIFICATION_DEADLINE.value),
+            (deadline + timedelta(days=1), EventType.CURE_WINDOW_START.value),
+            (fields["cure_window_end"], EventType.CURE_WINDOW_END.value),
+        ]
+    if fields["recertification_date"] is not None:
+        events.append((fields["recertification_date"], EventType.RECERTIFICATION_DUE.value))
+    if fields["leave_end_date"] is not None:
+        events.append((fields["leave_end_date"], EventType.LEAVE_END.value))
+    return events
+
+
+class DeadlineIndex:
+    """
+    Leave request deadlines bucketed by day.
+
+    Thread-safe. Dates are stored as ordinals; ``_days`` is the sorted list
+    of ordinals whose bucket is non-empty.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """
+        Args:
+            records: Leave request storage dictionaries to index
+        """
+        self._lock = threading.RLock()
+        self._buckets: dict[int, set[tuple[str, str]]] = {}
+        self._days: list[int] = []
+        self._by_request: dict[str, list[tuple[int, str]]] = {}
+        self._floating: set[str] = set()
+        for record in records:
+            self.upsert(record)
+
+    def __len__(self) -> int:
+        """Number of indexed requests."""
+        return len(self._by_request)
+
+    @property
+    def floating_ids(self) -> set[str]:
+        """Requests whose certification deadline isn't fixed (no notice date)."""
+        with self._lock:
+            return set(self._floating)
+
+    def upsert(self, request_data: dict):
+        """Index a new request or re-index a changed one."""
+        request_id = request_data["id"]
+        events = [(d.toordinal(), event_type) for d, event_type in deadline_events(request_data)]
+        with self._lock:
+            self.remove(request_id)
+            for ordinal, event_type in events:
+                bucket = self._buckets.get(ordinal)
+                if bucket is None:
+                    bucket = self._buckets[ordinal] = set()
+                    insort(self._days, ordinal)
+                bucket.add((request_id, event_type))
+            self._by_request[request_id] = events
+            if request_data.get("notice_date") is None:
+                self._floating.add(request_id)
+
+    def remove(self, request_id: str):
+        """Drop a request from the index (no-op if it isn't indexed)."""
+        with self._lock:
+            self._floating.discard(request_id)
+            for ordinal, event_type in self._by_request.pop(request_id, ()):
+                bucket = self._buckets[ordinal]
+                bucket.discard((request_id, event_type))
+                if not bucket:
+                    del self._buckets[ordinal]
+                    del self._days[bisect_left(self._days, ordinal)]
+
+    def due_between(
+        self,
+        start: date | None,
+        end: date,
+        event_types: Iterable[str] | None = None
+    ) -> list[DueEvent]:
+        """
+        Indexed events from ``start`` through ``end`` (inclusive).
+
+        Args:
+            start: First day (None means from the earliest indexed day)
+            end: Last day
+            event_types: Only these event types (None means all)
+
+        Returns:
+            DueEvents sorted by date, then request id and event type
+        """
+        types = None if event_types is None else {getattr(t, "value", t) for t in event_types}
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._days, start.toordinal())
+            hi = bisect_right(self._days, end.toordinal())
+            result = []
+            for ordinal in self._days[lo:hi]:
+                day = date.fromordinal(ordinal)
+                result.extend(
+                    DueEvent(day, request_id, event_type)
+                    for request_id, event_type in sorted(self._buckets[ordinal])
+                    if types is None or event_type in types
+                )
+            return result
+
+    def crossing_today(self, as_of: date | None = None) -> list[DueEvent]:
+        """Events that fall on ``as_of`` (defaults to today)."""
+        as_of = as_of or date.today()
+        return self.due_between(as_of, as_of)
+
+
+# One index per file store, with the storage state it was built from
+_indexes: dict[str, tuple[object, DeadlineIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_deadline_index(
+    store: str,
+    generation: object,
+    load: Callable[[], Iterable[dict]]
+) -> DeadlineIndex:
+    """
+    Get the index for a store, building it on first use.
+
+    Args:
+        store: Store identifier (as passed to the change hooks)
+        generation: Token for the loaded data; a different token (e.g. after
+            another process rewrote the file) rebuilds the index
+        load: Returns every leave request in the store
+
+    Returns:
+        DeadlineIndex kept current by the change hooks
+    """
+    with _indexes_lock:
+        cached = _indexes.get(store)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        index = DeadlineIndex(load())
+        _indexes[store] = (generation, index)
+        return index
+
+
+@hooks.add_leave_request_listener
+def _apply_change(event: str, request_id: str, record: dict | None, store: str | None):
+    """Keep a store's index in step with its writes."""
+    with _indexes_lock:
+        cached = _indexes.get(store)
+    if cached is None:
+        return
+    if event == hooks.DELETED:
+        cached[1].remove(request_id)
+    else:
+        cached[1].upsert(record)
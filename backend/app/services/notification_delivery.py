@@ -0,0 +1,424 @@
+"""
+Email delivery of stored notifications.
+
+With NOTIFICATION_DELIVERY_ENABLED every stored notification gets an
+outbox entry (storage.outbox). DeliveryWorkerPool drains the outbox in the
+background:
+
+- a dispatcher claims due entries from storage (a lease, so entries held by
+  a crashed process become claimable again) and splits them into batches
+  of NOTIFICATION_DELIVERY_BATCH_SIZE
+- NOTIFICATION_DELIVERY_WORKERS workers each keep one SMTP connection open
+  and send a whole batch over it
+- delivered entries are removed; failed ones are retried with exponential
+  backoff and marked "failed" after NOTIFICATION_DELIVERY_MAX_ATTEMPTS
+- a notification that can't be turned into a message (e.g. unknown template
+  version, no recipient) is marked "failed" at once without holding up
+  the rest of its batch
+- a batch stops starting new sends once the lease would expire before a
+  send could time out, so entries are never sent while claimable again;
+  the unsent rest is retried
+
+SMTPTransport uses the standard library smtplib, run in a thread per call,
+so any SMTP server (or a local aiosmtpd stand-in) works.
+"""
+import asyncio
+import smtplib
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formatdate
+
+from ..config import settings
+from ..storage.storage_factory import open_storage
+from .notification_templates import render_notification
+
+
+def build_message(notification: dict, sender: str | None = None) -> EmailMessage:
+    """
+    Email for a stored notification.
+
+    The Message-ID is derived from the notification ID, so a message that
+    is sent again after a lost acknowledgement can be recognised as a
+    duplicate by the receiving side.
+
+    Args:
+        notification: Notification storage dictionary (compact ones are rendered)
+        sender: From address (defaults to SMTP_FROM)
+
+    Returns:
+        EmailMessage ready to send
+    """
+    sender = sender or settings.SMTP_FROM
+    notification = render_notification(notification)
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = notification["recipient"]
+    message["Subject"] = notification["subject"]
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = f"<{notification['id']}@{sender.rpartition('@')[2] or 'localhost'}>"
+    message.set_content(notification["body"])
+    return message
+
+
+class SMTPTransport:
+    """
+    One reusable SMTP connection.
+
+    The connection is opened on first use and kept open between batches;
+    if the server dropped it, it is reopened once and the message resent.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool | None = None,
+        timeout: float | None = None
+    ):
+        """
+        Args:
+            host: SMTP server (defaults to SMTP_HOST)
+            port: SMTP port (defaults to SMTP_PORT)
+            username: Login user; no login if empty (defaults to SMTP_USERNAME)
+            password: Login password (defaults to SMTP_PASSWORD)
+            starttls: Upgrade the connection with STARTTLS (defaults to SMTP_STARTTLS)
+            timeout: Socket timeout in seconds (defaults to SMTP_TIMEOUT)
+        """
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = settings.SMTP_USERNAME if username is None else username
+        self.password = settings.SMTP_PASSWORD if password is None else password
+        self.starttls = settings.SMTP_STARTTLS if starttls is None else starttls
+        self.timeout = timeout or settings.SMTP_TIMEOUT
+        self.connections_opened = 0
+        self._smtp: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections_opened += 1
+        return smtp
+
+    def _close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def _send(self, message: EmailMessage):
+        reused = self._smtp is not None
+        if not reused:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self._smtp.close()
+            self._smtp = None
+            if not reused:
+                raise
+            # The server closed the idle connection; reconnect and resend once
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+
+    def _send_batch(self, messages: list[EmailMessage], deadline: float | None) -> list[str | None]:
+        errors = []
+        for message in messages:
+            # Connect, send and a reconnect-and-resend can each take a full timeout
+            if deadline is not None and time.monotonic() + 3 * self.timeout > deadline:
+                errors.append("not sent: claim lease expiring")
+                continue
+            try:
+                self._send(message)
+                errors.append(None)
+            except smtplib.SMTPResponseException as exc:
+                # Rejected by the server; the connection is still usable
+                errors.append(f"{exc.smtp_code} {exc.smtp_error!r}")
+            except (smtplib.SMTPException, OSError) as exc:
+                self._close()
+                errors.append(repr(exc))
+        return errors
+
+    async def send_batch(
+        self,
+        messages: list[EmailMessage],
+        deadline: float | None = None
+    ) -> list[str | None]:
+        """
+        Send messages over the shared connection.
+
+        Args:
+            messages: Messages to send, in order
+            deadline: time.monotonic() value after which no send may still
+                be running; messages that can't finish by then aren't sent
+
+        Returns:
+            One entry per message: None if it was accepted, else the error
+        """
+        return await asyncio.to_thread(self._send_batch, messages, deadline)
+
+    async def close(self):
+        """Close the connection (reopened on the next send)."""
+        await asyncio.to_thread(self._close)
+
+
+class DeliveryWorkerPool:
+    """
+    Async workers draining the notification outbox over SMTP.
+
+    Settings default from NOTIFICATION_DELIVERY_*; ``transport_factory``
+    makes one transport per worker (SMTPTransport by default).
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        max_attempts: int | None = None,
+        backoff_seconds: float | None = None,
+        max_backoff_seconds: float | None = None,
+        poll_seconds: float | None = None,
+        lease_seconds: float | None = None,
+        transport_factory=SMTPTransport,
+        history: int = 1000
+    ):
+        """
+        Args:
+            workers: Number of workers (and SMTP connections)
+            batch_size: Messages per batch sent over one connection
+            max_attempts: Attempts before an entry is marked failed
+            backoff_seconds: Delay before the first retry; doubles per attempt
+            max_backoff_seconds: Upper bound of the retry delay
+            poll_seconds: Wait between claims while the outbox is empty
+            lease_seconds: How long claimed entries are held
+            transport_factory: Callable returning a transport with async
+                ``send_batch(messages, deadline)`` and ``close()``
+            history: Number of delivery latencies kept for metrics
+        """
+        self.workers = workers or settings.NOTIFICATION_DELIVERY_WORKERS
+        self.batch_size = batch_size or settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.NOTIFICATION_DELIVERY_MAX_ATTEMPTS
+        self.backoff_seconds = (
+            settings.NOTIFICATION_DELIVERY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        )
+        self.max_backoff_seconds = max_backoff_seconds or settings.NOTIFICATION_DELIVERY_MAX_BACKOFF_SECONDS
+        self.poll_seconds = poll_seconds or settings.NOTIFICATION_DELIVERY_POLL_SECONDS
+        self.lease_seconds = lease_seconds or settings.NOTIFICATION_DELIVERY_LEASE_SECONDS
+        self.transport_factory = transport_factory
+        self.latencies_ms: deque[float] = deque(maxlen=history)
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_error: str | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatcher is active."""
+        return bool(self._tasks) and not self._tasks[0].done()
+
+    def start(self):
+        """Start the dispatcher and workers (no-op if already running)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._dispatch_forever(), name="notification-dispatch")]
+        self._tasks += [
+            asyncio.create_task(self._work_forever(self.transport_factory()), name=f"notification-delivery-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """
+        Cancel the dispatcher and workers and wait for them to finish.
+
+        Entries claimed but not yet reported are retried once their lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def backoff(self, attempts: int) -> float | None:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempts: Attempts so far, including the current one
+
+        Returns:
+            Seconds to wait, or None once max_attempts is reached
+        """
+        if attempts >= self.max_attempts:
+            return None
+        return min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+
+    async def _claim(self, limit: int) -> list[list[dict]]:
+        async with open_storage() as storage:
+            entries = await storage.claim_outbox(limit, self.lease_seconds)
+        return [entries[i:i + self.batch_size] for i in range(0, len(entries), self.batch_size)]
+
+    async def deliver(self, transport, entries: list[dict]):
+        """
+        Send one batch of claimed entries over a transport and record the outcome.
+
+        Args:
+            transport: Transport the batch is sent over
+            entries: Claimed outbox entries (with their notification)
+        """
+        # Each message is built on its own: one broken notification fails alone
+        sendable, messages, unsendable = [], [], []
+        for entry in entries:
+            if entry["attempts"] > self.max_attempts:
+                # Claimed again and again without a report (e.g. the worker keeps crashing)
+                unsendable.append((entry, entry["last_error"] or "claim lease expired"))
+                continue
+            try:
+                messages.append(build_message(entry["notification"]))
+                sendable.append(entry)
+            except Exception as exc:
+                unsendable.append((entry, repr(exc)))
+
+        errors = []
+        if messages:
+            # Lease end of the batch, on the monotonic clock the transport checks
+            lease_left = min(
+                datetime.fromisoformat(entry["available_at"]) for entry in sendable
+            ) - datetime.now()
+            deadline = time.monotonic() + lease_left.total_seconds()
+            errors = await transport.send_batch(messages, deadline)
+        sent_at = datetime.now()
+
+        delivered = [entry for entry, error in zip(sendable, errors) if error is None]
+        async with open_storage() as storage:
+            by_claim = {}
+            for entry in delivered:
+                by_claim.setdefault(entry["claim_token"], []).append(entry["id"])
+            for token, ids in by_claim.items():
+                await storage.complete_outbox(ids, claim_token=token)
+            for entry, error in unsendable:
+                await storage.retry_outbox(entry["id"], error, None, claim_token=entry["claim_token"])
+                self.failed += 1
+                self.last_error = error
+            for entry, error in zip(sendable, errors):
+                if error is None:
+                    continue
+                delay = self.backoff(entry["attempts"])
+                await storage.retry_outbox(
+                    entry["id"],
+                    error,
+                    None if delay is None else sent_at + timedelta(seconds=delay),
+                    claim_token=entry["claim_token"]
+                )
+                if delay is None:
+                    self.failed += 1
+                else:
+                    self.retried += 1
+                self.last_error = error
+
+        self.batches += 1
+        self.sent += len(delivered)
+        for entry in delivered:
+            enqueued = datetime.fromisoformat(entry["created_at"])
+            self.latencies_ms.append(round((sent_at - enqueued).total_seconds() * 1000, 3))
+
+    async def run_once(self, transport=None) -> int:
+        """
+        Claim every due entry now and deliver it over one transport.
+
+        Args:
+            transport: Transport to use (defaults to a new one, closed afterwards)
+
+        Returns:
+            Number of entries claimed
+        """
+        own = transport is None
+        transport = transport or self.transport_factory()
+        claimed = 0
+        try:
+            while True:
+                batches = await self._claim(self.batch_size * self.workers)
+                if not batches:
+                    return claimed
+                for batch in batches:
+                    claimed += len(batch)
+                    await self.deliver(transport, batch)
+        finally:
+            if own:
+                await transport.close()
+
+    async def _dispatch_forever(self):
+        limit = self.batch_size * self.workers
+        while True:
+            claimed = 0
+            try:
+                batches = await self._claim(limit)
+                for batch in batches:
+                    claimed += len(batch)
+                    self._queue.put_nowait(batch)
+                # Wait for this round so claims never outrun the workers
+                await self._queue.join()
+            except Exception as exc:
+                # Keep the loop alive; claimed entries come back after their lease
+                self.last_error = repr(exc)
+            if claimed < limit:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _work_forever(self, transport):
+        try:
+            while True:
+                batch = await self._queue.get()
+                try:
+                    await self.deliver(transport, batch)
+                except Exception as exc:
+                    self.last_error = repr(exc)
+                finally:
+                    self._queue.task_done()
+        finally:
+            await transport.close()
+
+    def latency_percentiles(self) -> dict:
+        """p50, p95 and max of recent enqueue-to-sent latencies, in ms."""
+        if not self.latencies_ms:
+            return {"p50": None, "p95": None, "max": None}
+        ordered = sorted(self.latencies_ms)
+        return {
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+    async def metrics(self) -> dict:
+        """Outbox depth, in-flight batches, delivery counts and latency."""
+        async with open_storage() as storage:
+            outbox = await storage.outbox_stats()
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "outbox": outbox,
+            "queued_batches": self._queue.qsize() if self._queue is not None else 0,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "latency_ms": self.latency_percentiles(),
+            "last_error": self.last_error,
+        }
+
+
+pool = DeliveryWorkerPool()
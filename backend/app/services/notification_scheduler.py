@@ -0,0 +1,199 @@
+"""
+Background generation of reminder notifications.
+
+NotificationService documents when reminders go out (certification 3 days
+before the deadline, cure window notice when the window opens,
+recertification 7 days before). run_notification_sweep finds the requests
+whose reminder is due and whose deadline hasn't passed through
+storage.due_between, so days the scheduler missed and requests created
+after their reminder day are caught up. It drops reminders already stored
+(by dedup key, so re-sweeping open windows is harmless), renders
+the rest straight from the stored dictionaries with render_batch and
+writes them with one bulk insert per batch of requests.
+
+NotificationScheduler runs the sweep from the FastAPI startup hook: once
+for each new day, checking every NOTIFICATION_SWEEP_INTERVAL_SECONDS.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import date, datetime
+
+from ..config import settings
+from ..models.notification import NotificationSweepResult
+from ..storage.async_storage import AsyncStorage
+from ..storage.storage_factory import open_storage
+from .notification_service import NotificationService
+
+
+_notification_service = NotificationService()
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+async def run_notification_sweep(
+    storage: AsyncStorage,
+    as_of: date | None = None,
+    batch_size: int | None = None
+) -> NotificationSweepResult:
+    """
+    Create the reminder notifications due on ``as_of`` and not yet stored.
+
+    Args:
+        storage: Async storage to read requests from and write notifications to
+        as_of: Day to sweep for (defaults to today)
+        batch_size: Leave requests per batch, i.e. per bulk insert
+            (defaults to NOTIFICATION_SWEEP_BATCH_SIZE)
+
+    Returns:
+        NotificationSweepResult with counts and per-phase timings
+    """
+    as_of = as_of or date.today()
+    batch_size = batch_size or settings.NOTIFICATION_SWEEP_BATCH_SIZE
+    started_at = datetime.now()
+    sweep_start = time.perf_counter()
+
+    due = []
+    for event_type, first, last in _notification_service.reminder_windows(as_of):
+        due += await storage.due_between(first, last, [event_type])
+    keys = {event: _notification_service.due_event_dedup_key(event) for event in due}
+    existing = await storage.get_existing_dedup_keys(sorted(set(keys.values())))
+    find_ms = _elapsed_ms(sweep_start)
+
+    events_by_request = {}
+    for event in due:
+        if keys[event] not in existing:
+            events_by_request.setdefault(event.request_id, []).append(event)
+    request_ids = sorted(events_by_request)
+
+    generate_ms = write_ms = 0.0
+    requests_loaded = created = batches = 0
+    for i in range(0, len(request_ids), batch_size):
+        batch_ids = request_ids[i:i + batch_size]
+
+        phase_start = time.perf_counter()
+        requests = await storage.get_leave_requests_by_ids(batch_ids)
+        requests_loaded += len(requests)
+        notifications = _notification_service.render_due_notifications(
+            requests,
+            [event for request_id in batch_ids for event in events_by_request[request_id]],
+            compact=settings.NOTIFICATION_COMPACT_STORAGE
+        )
+        generate_ms += _elapsed_ms(phase_start)
+
+        if notifications:
+            phase_start = time.perf_counter()
+            created += await storage.create_notifications(notifications)
+            batches += 1
+            write_ms += _elapsed_ms(phase_start)
+
+    return NotificationSweepResult(
+        as_of=as_of,
+        started_at=started_at,
+        due_events=len(due),
+        duplicates_skipped=sum(key in existing for key in keys.values()),
+        requests_loaded=requests_loaded,
+        notifications_created=created,
+        batches=batches,
+        find_ms=find_ms,
+        generate_ms=round(generate_ms, 3),
+        write_ms=round(write_ms, 3),
+        duration_ms=_elapsed_ms(sweep_start),
+    )
+
+
+class NotificationScheduler:
+    """
+    Runs the notification sweep once per day in an asyncio task.
+
+    The sweep for a day runs on the first check after midnight (and at
+    startup). ``as_of`` pins the day the scheduler sweeps for, for testing.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float | None = None,
+        batch_size: int | None = None,
+        as_of: date | None = None,
+        history: int = 50
+    ):
+        """
+        Args:
+            interval_seconds: Seconds between checks (defaults to
+                NOTIFICATION_SWEEP_INTERVAL_SECONDS)
+            batch_size: Leave requests per bulk insert
+            as_of: Fixed day to sweep for instead of today
+            history: Number of past runs kept for metrics
+        """
+        self.interval_seconds = interval_seconds or settings.NOTIFICATION_SWEEP_INTERVAL_SECONDS
+        self.batch_size = batch_size
+        self.as_of = as_of
+        self.runs: deque[NotificationSweepResult] = deque(maxlen=history)
+        self.last_as_of: date | None = None
+        self.last_error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background task (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run_forever(), name="notification-sweep")
+
+    async def stop(self):
+        """Cancel the background task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self, as_of: date | None = None) -> NotificationSweepResult:
+        """
+        Run one sweep now, with its own storage session.
+
+        Args:
+            as_of: Day to sweep for (defaults to the scheduler's as_of, then today)
+
+        Returns:
+            NotificationSweepResult, also appended to ``runs``
+        """
+        as_of = as_of or self.as_of or date.today()
+        async with open_storage() as storage:
+            result = await run_notification_sweep(storage, as_of, self.batch_size)
+        self.runs.append(result)
+        self.last_as_of = as_of
+        self.last_error = None
+        return result
+
+    async def _run_forever(self):
+        while True:
+            as_of = self.as_of or date.today()
+            if as_of != self.last_as_of:
+                try:
+                    await self.run_once(as_of)
+                except Exception as exc:
+                    # Keep the loop alive; the next check retries the day
+                    self.last_error = repr(exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    def metrics(self) -> dict:
+        """Scheduler state and the recorded runs, most recent last."""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "last_as_of": self.last_as_of,
+            "last_error": self.last_error,
+            "runs": list(self.runs),
+        }
+
+
+scheduler = NotificationScheduler()
@@ -1,11 +1,29 @@
 # Written by Claude Code on 2026-01-29
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
-import uuid
-from datetime import datetime
+from datetime import date, timedelta
+from typing import Container
 from ..models.notification import Notification, NotificationType
 from ..models.leave_request import LeaveRequest
+from ..models.timeline_event import EventType
 from .deadline_calculator import DeadlineCalculator
+from .deadline_index import DueEvent
+from . import notification_templates
+
+
+# Reminders sent by the notification sweep: indexed event type ->
+# (days before the event to send, notification type)
+REMINDER_SCHEDULE = {
+    EventType.CERTIFICATION_DEADLINE.value: (3, NotificationType.CERTIFICATION_DUE),
+    EventType.CURE_WINDOW_START.value: (0, NotificationType.CURE_WINDOW),
+    EventType.RECERTIFICATION_DUE.value: (7, NotificationType.RECERTIFICATION_DUE),
+}
+
+# Days after the event a reminder is still worth sending, i.e. until the
+# deadline it is about has passed (the cure window closes 6 days after it opens)
+REMINDER_OPEN_DAYS = {
+    EventType.CURE_WINDOW_START.value: 6,
+}
 
 
 class NotificationService:
@@ -13,12 +31,192 @@ class NotificationService:
     Generate and manage FMLA email notifications.
 
     In this prototype, notifications are stored and displayed in the UI
-    rather than actually sent via email.
+    rather than actually sent via email. Text comes from the precompiled
+    templates in notification_templates.
     """
 
     def __init__(self):
         self.calculator = DeadlineCalculator()
 
+    @staticmethod
+    def reminder_windows(as_of: date) -> list[tuple[str, date, date]]:
+        """
+        Event days the sweep on ``as_of`` sends reminders for.
+
+        A reminder is due from its lead days before the event until the
+        deadline it is about passes, so every open window is swept, not
+        just the day the reminder first falls due. Reminders missed on
+        earlier days (scheduler down, request created late) are caught up.
+
+        Returns:
+            List of (event_type, first_event_date, last_event_date): e.g.
+            certification deadlines from ``as_of`` through 3 days after it
+        """
+        return [
+            (
+                event_type,
+                as_of - timedelta(days=REMINDER_OPEN_DAYS.get(event_type, 0)),
+                as_of + timedelta(days=lead_days),
+            )
+            for event_type, (lead_days, _) in REMINDER_SCHEDULE.items()
+        ]
+
+    @staticmethod
+    def dedup_key(request_id: str, notification_type: NotificationType, deadline: date | str) -> str:
+        """
+        Key identifying one logical notification.
+
+        Args:
+            request_id: Leave request ID
+            notification_type: Type of notification
+            deadline: The deadline the notification is about
+
+        Returns:
+            Key like ``"req-456:certification_due:2025-02-16"``
+        """
+        return notification_templates.dedup_key(request_id, notification_type, deadline)
+
+    def reminder_deadline(self, leave_request: LeaveRequest, notification_type: NotificationType) -> date:
+        """
+        The deadline a certification, cure window or recertification
+        notification is about (for the cure window, the day it closes).
+        """
+        if notification_type == NotificationType.RECERTIFICATION_DUE:
+            return self.calculator.calculate_recertification_date(
+                leave_request.leave.start_date,
+                leave_request.leave.condition_type.value
+            )
+        cert_deadline = self.calculator.calculate_certification_deadline(
+            leave_request.leave.start_date,
+            leave_request.notice_date
+        )
+        if notification_type == NotificationType.CURE_WINDOW:
+            return self.calculator.calculate_cure_window(cert_deadline)[1]
+        return cert_deadline
+
+    def default_params(self, leave_request: LeaveRequest, notification_type: NotificationType) -> dict:
+        """
+        Template parameters for a notification created on demand.
+
+        Args:
+            leave_request: The leave request the notification is about
+            notification_type: Type of notification
+
+        Returns:
+            Type-specific parameters for notification_templates.render_batch
+        """
+        if notification_type == NotificationType.CERTIFICATION_DUE:
+            return {"cert_deadline": str(self.reminder_deadline(leave_request, notification_type))}
+        if notification_type == NotificationType.CURE_WINDOW:
+            return {
+                "cure_end_date": str(self.reminder_deadline(leave_request, notification_type)),
+                "missing_items": leave_request.compliance_flags,
+            }
+        if notification_type == NotificationType.RECERTIFICATION_DUE:
+            return {"recert_date": str(self.reminder_deadline(leave_request, notification_type))}
+        if notification_type == NotificationType.DENIAL_NOTICE:
+            return {"reason": "Incomplete or missing medical certification"}
+        if notification_type == NotificationType.MISSING_DOCS:
+            return {"missing_items": leave_request.compliance_flags}
+        return {}
+
+    def due_event_dedup_key(self, event: DueEvent) -> str | None:
+        """
+        Dedup key of the reminder a swept event produces.
+
+        Returns:
+            The key, or None if the event type has no reminder
+        """
+        schedule = REMINDER_SCHEDULE.get(event.event_type)
+        if schedule is None:
+            return None
+        deadline = event.event_date
+        if event.event_type == EventType.CURE_WINDOW_START.value:
+            _, deadline = self.calculator.calculate_cure_window(deadline - timedelta(days=1))
+        return self.dedup_key(event.request_id, schedule[1], deadline)
+
+    def render_due_notifications(
+        self,
+        requests: list[dict],
+        due_events: list[DueEvent],
+        existing_keys: Container[str] = (),
+        compact: bool = False
+    ) -> list[dict]:
+        """
+        Render the reminder notifications for events found by the sweep.
+
+        Certification and cure window reminders are skipped for requests
+        whose certification is already complete. Reminders that already
+        exist are skipped before their bodies are rendered. Each reminder
+        type is rendered as one batch.
+
+        Args:
+            requests: Leave request storage dictionaries the events belong to
+            due_events: Events from due_between for the reminder_windows
+            existing_keys: Dedup keys of notifications already stored
+            compact: Store template id + params instead of rendered bodies
+
+        Returns:
+            Notification storage dictionaries, grouped by type in
+            REMINDER_SCHEDULE order, in due_events order within a type
+        """
+        by_id = {request["id"]: request for request in requests}
+        batches = {event_type: ([], []) for event_type in REMINDER_SCHEDULE}
+        seen = set()
+        for event in due_events:
+            request_data = by_id.get(event.request_id)
+            if request_data is None or event.event_type not in REMINDER_SCHEDULE:
+                continue
+            key = self.due_event_dedup_key(event)
+            if key in existing_keys or key in seen:
+                continue
+            seen.add(key)
+            cert_complete = (
+                request_data["medical_provider"].get("signature_present")
+                and not request_data.get("compliance_flags")
+            )
+
+            if event.event_type == EventType.CERTIFICATION_DEADLINE.value:
+                if cert_complete:
+                    continue
+                params = {"cert_deadline": str(event.event_date)}
+            elif event.event_type == EventType.CURE_WINDOW_START.value:
+                if cert_complete:
+                    continue
+                _, cure_end = self.calculator.calculate_cure_window(
+                    event.event_date - timedelta(days=1)
+                )
+                params = {
+                    "cure_end_date": str(cure_end),
+                    "missing_items": request_data.get("compliance_flags") or ["Signed medical certification"],
+                }
+            else:
+                params = {"recert_date": str(event.event_date)}
+            batch_requests, batch_params = batches[event.event_type]
+            batch_requests.append(request_data)
+            batch_params.append(params)
+
+        notifications = []
+        for event_type, (batch_requests, batch_params) in batches.items():
+            if batch_requests:
+                notifications += notification_templates.render_batch(
+                    batch_requests, REMINDER_SCHEDULE[event_type][1], batch_params,
+                    compact=compact
+                )
+        return notifications
+
+    def _generate(
+        self,
+        leave_request: LeaveRequest,
+        notification_type: NotificationType,
+        **params
+    ) -> Notification:
+        """Render one notification from its template."""
+        [data] = notification_templates.render_batch(
+            [leave_request.model_dump(mode='json')], notification_type, params
+        )
+        return Notification(**data)
+
     def generate_certification_due_notification(
         self,
         leave_request: LeaveRequest,
@@ -29,30 +227,8 @@ class NotificationService:
 
         Sent 3 days before deadline.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        subject = "FMLA Certification Due in 3 Days"
-        body = f"""Dear {leave_request.employee.name},
-
-This is a reminder that your FMLA medical certification is due by {cert_deadline}.
-
-Please ensure that your healthcare provider completes and submits the medical certification form by this deadline. The certification must include:
-- Your medical condition details
-- Expected duration of leave
-- Healthcare provider's signature and contact information
-
-If you have any questions, please contact HR.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.CERTIFICATION_DUE,
-            recipient=recipient,
-            subject=subject,
-            body=body
+        return self._generate(
+            leave_request, NotificationType.CERTIFICATION_DUE, cert_deadline=cert_deadline
         )
 
     def generate_cure_window_notification(
@@ -66,33 +242,9 @@ FMLA Compliance Team"""
 
         Sent when certification is incomplete/missing.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        missing_items_text = "\n".join([f"- {item}" for item in missing_items])
-
-        subject = "Action Required: 7-Day Cure Window for FMLA Certification"
-        body = f"""Dear {leave_request.employee.name},
-
-Your FMLA medical certification has been reviewed and is incomplete or missing required information.
-
-You have 7 calendar days (until {cure_end_date}) to provide the following:
-
-{missing_items_text}
-
-This is your final opportunity to submit complete documentation. If the required information is not received by {cure_end_date}, your FMLA leave request may be denied.
-
-Please contact HR immediately if you have questions.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.CURE_WINDOW,
-            recipient=recipient,
-            subject=subject,
-            body=body
+        return self._generate(
+            leave_request, NotificationType.CURE_WINDOW,
+            cure_end_date=cure_end_date, missing_items=missing_items
         )
 
     def generate_recertification_notification(
@@ -105,32 +257,8 @@ FMLA Compliance Team"""
 
         Sent 7 days before recertification due date.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        subject = "FMLA Recertification Required"
-        body = f"""Dear {leave_request.employee.name},
-
-Your FMLA leave that began on {leave_request.leave.start_date} requires medical recertification.
-
-A new medical certification form must be submitted by {recert_date}.
-
-Please have your healthcare provider complete an updated certification that includes:
-- Current status of your medical condition
-- Expected continued duration of leave
-- Any changes to treatment or prognosis
-
-Contact HR if you need a new certification form or have questions.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.RECERTIFICATION_DUE,
-            recipient=recipient,
-            subject=subject,
-            body=body
+        return self._generate(
+            leave_request, NotificationType.RECERTIFICATION_DUE, recert_date=recert_date
         )
 
     def generate_approval_notification(
@@ -140,36 +268,7 @@ FMLA Compliance Team"""
         """
         Generate notification for leave approval.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        subject = "FMLA Leave Request Approved"
-        body = f"""Dear {leave_request.employee.name},
-
-Your FMLA leave request has been approved.
-
-Leave Details:
-- Start Date: {leave_request.leave.start_date}
-- End Date: {leave_request.leave.end_date}
-- Type: {"Intermittent" if leave_request.leave.intermittent else "Continuous"}
-
-Important Reminders:
-- Keep HR informed of any changes to your leave dates
-- Submit recertification if required
-- Contact HR before returning to work
-
-If you have questions about your leave, please contact HR.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.APPROVAL_NOTICE,
-            recipient=recipient,
-            subject=subject,
-            body=body
-        )
+        return self._generate(leave_request, NotificationType.APPROVAL_NOTICE)
 
     def generate_denial_notification(
         self,
@@ -179,35 +278,7 @@ FMLA Compliance Team"""
         """
         Generate notification for leave denial.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        subject = "FMLA Leave Request Denied"
-        body = f"""Dear {leave_request.employee.name},
-
-Your FMLA leave request has been denied.
-
-Reason: {reason}
-
-If you believe this decision was made in error or have additional documentation to support your request, please contact HR within 5 business days.
-
-You have the right to:
-- Request clarification of this decision
-- Provide additional medical documentation
-- File an appeal
-
-Please contact HR for more information about your options.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.DENIAL_NOTICE,
-            recipient=recipient,
-            subject=subject,
-            body=body
-        )
+        return self._generate(leave_request, NotificationType.DENIAL_NOTICE, reason=reason)
 
     def generate_missing_docs_notification(
         self,
@@ -217,31 +288,6 @@ FMLA Compliance Team"""
         """
         Generate notification for missing documentation.
         """
-        recipient = leave_request.employee.email or f"{leave_request.employee.ssn_last4}@example.com"
-
-        missing_items_text = "\n".join([f"- {item}" for item in missing_items])
-
-        subject = "Missing Documentation for FMLA Leave Request"
-        body = f"""Dear {leave_request.employee.name},
-
-Your FMLA leave request is missing required documentation.
-
-Please provide the following as soon as possible:
-
-{missing_items_text}
-
-Your leave request cannot be processed until all required documentation is received.
-
-Contact HR if you need assistance obtaining these documents.
-
-Best regards,
-FMLA Compliance Team"""
-
-        return Notification(
-            id=str(uuid.uuid4()),
-            request_id=leave_request.id,
-            type=NotificationType.MISSING_DOCS,
-            recipient=recipient,
-            subject=subject,
-            body=body
+        return self._generate(
+            leave_request, NotificationType.MISSING_DOCS, missing_items=missing_items
         )
@@ -0,0 +1,419 @@
+"""
+Precompiled notification templates.
+
+Each NotificationType has one NotificationTemplate: the subject and body
+text with ``{placeholders}``, split into literal and field segments once at
+import time. Rendering is then a single join over the segments.
+
+render_batch renders one notification type for many leave requests and
+returns storage-ready dictionaries (the shape ``Notification.model_dump
+(mode='json')`` produces), without building a LeaveRequest or Notification
+model per item. Scheduled sweeps use it; NotificationService.generate_*
+render through the same templates.
+
+Compact notifications (NOTIFICATION_COMPACT_STORAGE) store the template
+id, template version and parameters instead of the rendered body; the
+subject is still stored so list views need no rendering. render_notification
+fills the body back in on read, with an LRU cache for hot notifications.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Iterable
+
+from ..config import settings
+from ..models.notification import NotificationType
+
+
+class NotificationTemplate:
+    """
+    Subject and body text for one notification type.
+
+    Placeholders are plain ``{name}`` fields (no conversions or format
+    specs). Parameter values are rendered with ``str``; lists render as one
+    ``- item`` line per element.
+
+    Stored compact notifications reference a template by (template_id,
+    version), so changing a template's text means registering it under a
+    new version and keeping the old one in _PREVIOUS_VERSIONS.
+    """
+
+    def __init__(
+        self,
+        notification_type: NotificationType,
+        subject: str,
+        body: str,
+        version: int = 1,
+        dedup_param: str | None = None
+    ):
+        """
+        Args:
+            notification_type: Type of notification the template renders
+            subject: Subject line text
+            body: Body text
+            version: Bumped whenever the text changes
+            dedup_param: Parameter holding the deadline the notification is
+                about; notifications with one get a dedup key
+        """
+        self.notification_type = notification_type
+        self.version = version
+        self.dedup_param = dedup_param
+        self.subject = subject
+        self.body = body
+        self._subject_parts = _compile(subject)
+        self._body_parts = _compile(body)
+        self.fields = frozenset(
+            field for _, field in self._subject_parts + self._body_parts if field is not None
+        )
+
+    @property
+    def template_id(self) -> str:
+        """Stable identifier of the template (the notification type value)."""
+        return self.notification_type.value
+
+    def render(self, params: dict[str, Any]) -> tuple[str, str]:
+        """
+        Render the subject and body.
+
+        Args:
+            params: Value for every placeholder
+
+        Returns:
+            (subject, body)
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        return self.render_subject(params), self.render_body(params)
+
+    def render_subject(self, params: dict[str, Any]) -> str:
+        """Render the subject line only."""
+        return _render(self._subject_parts, params)
+
+    def render_body(self, params: dict[str, Any]) -> str:
+        """Render the body only."""
+        return _render(self._body_parts, params)
+
+
+def _compile(text: str) -> list[tuple[str, str | None]]:
+    """Split template text into (literal, field name or None) segments."""
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        if spec or conversion:
+            raise ValueError(f"Unsupported placeholder {{{field}!{conversion}:{spec}}} in template")
+        parts.append((literal, field))
+    return parts
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "\n".join(f"- {item}" for item in value)
+    return str(value)
+
+
+def _render(parts: list[tuple[str, str | None]], params: dict[str, Any]) -> str:
+    out = []
+    for literal, field in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(_format_value(params[field]))
+    return "".join(out)
+
+
+_SIGNATURE = """
+
+Best regards,
+FMLA Compliance Team"""
+
+TEMPLATES: dict[NotificationType, NotificationTemplate] = {
+    template.notification_type: template
+    for template in (
+        NotificationTemplate(
+            NotificationType.CERTIFICATION_DUE,
+            subject="FMLA Certification Due in 3 Days",
+            body="""Dear {employee_name},
+
+This is a reminder that your FMLA medical certification is due by {cert_deadline}.
+
+Please ensure that your healthcare provider completes and submits the medical certification form by this deadline. The certification must include:
+- Your medical condition details
+- Expected duration of leave
+- Healthcare provider's signature and contact information
+
+If you have any questions, please contact HR.""" + _SIGNATURE,
+            dedup_param="cert_deadline",
+        ),
+        NotificationTemplate(
+            NotificationType.CURE_WINDOW,
+            subject="Action Required: 7-Day Cure Window for FMLA Certification",
+            body="""Dear {employee_name},
+
+Your FMLA medical certification has been reviewed and is incomplete or missing required information.
+
+You have 7 calendar days (until {cure_end_date}) to provide the following:
+
+{missing_items}
+
+This is your final opportunity to submit complete documentation. If the required information is not received by {cure_end_date}, your FMLA leave request may be denied.
+
+Please contact HR immediately if you have questions.""" + _SIGNATURE,
+            dedup_param="cure_end_date",
+        ),
+        NotificationTemplate(
+            NotificationType.RECERTIFICATION_DUE,
+            subject="FMLA Recertification Required",
+            body="""Dear {employee_name},
+
+Your FMLA leave that began on {start_date} requires medical recertification.
+
+A new medical certification form must be submitted by {recert_date}.
+
+Please have your healthcare provider complete an updated certification that includes:
+- Current status of your medical condition
+- Expected continued duration of leave
+- Any changes to treatment or prognosis
+
+Contact HR if you need a new certification form or have questions.""" + _SIGNATURE,
+            dedup_param="recert_date",
+        ),
+        NotificationTemplate(
+            NotificationType.APPROVAL_NOTICE,
+            subject="FMLA Leave Request Approved",
+            body="""Dear {employee_name},
+
+Your FMLA leave request has been approved.
+
+Leave Details:
+- Start Date: {start_date}
+- End Date: {end_date}
+- Type: {leave_type}
+
+Important Reminders:
+- Keep HR informed of any changes to your leave dates
+- Submit recertification if required
+- Contact HR before returning to work
+
+If you have questions about your leave, please contact HR.""" + _SIGNATURE,
+        ),
+        NotificationTemplate(
+            NotificationType.DENIAL_NOTICE,
+            subject="FMLA Leave Request Denied",
+            body="""Dear {employee_name},
+
+Your FMLA leave request has been denied.
+
+Reason: {reason}
+
+If you believe this decision was made in error or have additional documentation to support your request, please contact HR within 5 business days.
+
+You have the right to:
+- Request clarification of this decision
+- Provide additional medical documentation
+- File an appeal
+
+Please contact HR for more information about your options.""" + _SIGNATURE,
+        ),
+        NotificationTemplate(
+            NotificationType.MISSING_DOCS,
+            subject="Missing Documentation for FMLA Leave Request",
+            body="""Dear {employee_name},
+
+Your FMLA leave request is missing required documentation.
+
+Please provide the following as soon as possible:
+
+{missing_items}
+
+Your leave request cannot be processed until all required documentation is received.
+
+Contact HR if you need assistance obtaining these documents.""" + _SIGNATURE,
+        ),
+    )
+}
+
+
+# Superseded template versions still referenced by stored notifications
+_PREVIOUS_VERSIONS: tuple[NotificationTemplate, ...] = ()
+
+_BY_VERSION: dict[tuple[str, int], NotificationTemplate] = {
+    (template.template_id, template.version): template
+    for template in (*TEMPLATES.values(), *_PREVIOUS_VERSIONS)
+}
+
+
+def get_template(
+    notification_type: NotificationType | str,
+    version: int | None = None
+) -> NotificationTemplate:
+    """
+    Get the template for a notification type.
+
+    Args:
+        notification_type: Notification type (or template id)
+        version: Template version (defaults to the current one)
+
+    Raises:
+        KeyError: If the type or version has no template
+    """
+    if version is None:
+        return TEMPLATES[NotificationType(notification_type)]
+    return _BY_VERSION[(NotificationType(notification_type).value, version)]
+
+
+def dedup_key(request_id: str, notification_type: NotificationType, deadline: date | str) -> str:
+    """
+    Key identifying one logical notification.
+
+    Args:
+        request_id: Leave request ID
+        notification_type: Type of notification
+        deadline: The deadline the notification is about
+
+    Returns:
+        Key like ``"req-456:certification_due:2025-02-16"``
+    """
+    return f"{request_id}:{NotificationType(notification_type).value}:{deadline}"
+
+
+def request_params(request_data: dict) -> dict[str, Any]:
+    """
+    Template parameters taken from a leave request storage dictionary.
+
+    Returns:
+        employee_name, start_date, end_date and leave_type
+    """
+    leave = request_data["leave"]
+    return {
+        "employee_name": request_data["employee"]["name"],
+        "start_date": leave["start_date"],
+        "end_date": leave["end_date"],
+        "leave_type": "Intermittent" if leave.get("intermittent") else "Continuous",
+    }
+
+
+def recipient_of(request_data: dict) -> str:
+    """Email address notifications for a leave request go to."""
+    employee = request_data["employee"]
+    return employee.get("email") or f"{employee['ssn_last4']}@example.com"
+
+
+def dedup_key_for(request_id: str, notification_type: NotificationType, params: dict[str, Any]) -> str | None:
+    """
+    Dedup key of the notification ``params`` would render, without rendering it.
+
+    Returns:
+        The key, or None if notifications of this type aren't deduplicated
+    """
+    template = get_template(notification_type)
+    if template.dedup_param is None:
+        return None
+    return dedup_key(request_id, notification_type, params[template.dedup_param])
+
+
+def _param_value(value: Any) -> Any:
+    """JSON-ready form of a stored template parameter."""
+    if isinstance(value, (str, list)):
+        return value
+    if isinstance(value, tuple):
+        return list(value)
+    return str(value)
+
+
+def render_batch(
+    requests: Iterable[dict],
+    notification_type: NotificationType,
+    params: Iterable[dict[str, Any]] | dict[str, Any] | None = None,
+    created_at: datetime | None = None,
+    compact: bool = False
+) -> list[dict]:
+    """
+    Render one notification type for many leave requests.
+
+    Args:
+        requests: Leave request storage dictionaries
+        notification_type: Type of notification to render
+        params: Type-specific parameters (e.g. ``cert_deadline``): one dict
+            per request, or a single dict shared by all of them
+        created_at: Creation time of every notification (defaults to now)
+        compact: Leave the body out and record template_id,
+            template_version and params instead
+
+    Returns:
+        Notification storage dictionaries, one per request, in order
+    """
+    template = get_template(notification_type)
+    type_value = template.notification_type.value
+    created = (created_at or datetime.now()).isoformat()
+    if params is None:
+        params = {}
+    per_request = not isinstance(params, dict)
+    extra_iter = iter(params) if per_request else None
+
+    notifications = []
+    for request_data in requests:
+        extra = next(extra_iter) if per_request else params
+        values = request_params(request_data)
+        values.update(extra)
+        request_id = request_data["id"]
+        notification = {
+            "id": str(uuid.uuid4()),
+            "request_id": request_id,
+            "type": type_value,
+            "recipient": recipient_of(request_data),
+            "subject": template.render_subject(values),
+            "body": None,
+            "created_at": created,
+            "read_status": False,
+            "dedup_key": (
+                dedup_key(request_id, notification_type, values[template.dedup_param])
+                if template.dedup_param else None
+            ),
+        }
+        if compact:
+            notification["template_id"] = template.template_id
+            notification["template_version"] = template.version
+            notification["params"] = {
+                field: _param_value(values[field]) for field in sorted(template.fields)
+            }
+        else:
+            notification["body"] = template.render_body(values)
+        notifications.append(notification)
+    return notifications
+
+
+@lru_cache(maxsize=settings.NOTIFICATION_RENDER_CACHE_SIZE)
+def _render_body(template_id: str, version: int, params_json: str) -> str:
+    return get_template(template_id, version).render_body(json.loads(params_json))
+
+
+def render_notification(record: dict) -> dict:
+    """
+    Fill in the body of a compact notification.
+
+    Args:
+        record: Notification storage dictionary
+
+    Returns:
+        The record itself if it has a body, otherwise a copy with the body
+        rendered from its template and params (cached by template and params)
+
+    Raises:
+        KeyError: If the record's template version isn't registered
+    """
+    if record.get("body") is not None or record.get("template_id") is None:
+        return record
+    params_json = json.dumps(record.get("params") or {}, sort_keys=True, separators=(",", ":"))
+    return dict(
+        record,
+        body=_render_body(record["template_id"], record.get("template_version") or 1, params_json)
+    )
+
+
+def render_cache_stats() -> dict:
+    """Hit/miss counters of the body render cache."""
+    info = _render_body.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
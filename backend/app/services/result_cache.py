@@ -0,0 +1,129 @@
+"""
+Bounded LRU cache for per-request results (timelines, compliance status).
+
+Generated timelines and compliance results are pure functions of
+(leave request, as_of), so they can be cached under
+(request_id, version, as_of). The version is a digest of the stored
+record: an edited record never matches an old entry, even one written by
+another process. Entries for a request are also dropped explicitly when it
+is updated or deleted, so they don't linger until evicted.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable
+
+
+def request_version(request_data: dict) -> str:
+    """
+    Version of a stored leave request record.
+
+    Args:
+        request_data: Leave request storage dictionary
+
+    Returns:
+        Short digest that changes whenever any field changes
+    """
+    encoded = json.dumps(request_data, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class VersionedLRUCache:
+    """
+    LRU cache keyed on (request_id, version, as_of).
+
+    Thread-safe; values are computed outside the lock, so two concurrent
+    misses on the same key may both compute (the results are identical).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize: Maximum number of entries kept (least recently used are evicted)
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._keys_by_request: dict[str, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(
+        self,
+        request_id: str,
+        version: str,
+        as_of: date,
+        compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached value, computing and storing it on a miss.
+
+        Args:
+            request_id: Leave request ID
+            version: Record version (see request_version)
+            as_of: Evaluation date
+            compute: Called with no arguments on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        key = (request_id, version, as_of)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._keys_by_request.setdefault(request_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+                self.evictions += 1
+        return value
+
+    def _forget(self, key: tuple):
+        keys = self._keys_by_request.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_request[key[0]]
+
+    def invalidate(self, request_id: str) -> int:
+        """
+        Drop every entry for a leave request.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._keys_by_request.pop(request_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_request.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
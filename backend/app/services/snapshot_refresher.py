@@ -0,0 +1,118 @@
+"""
+Daily refresh of the compliance snapshots behind the alerts endpoint.
+
+get_compliance_alerts only reads the compliance_snapshot table. A snapshot
+whose next_change day has passed is re-evaluated in memory on every alerts
+read until refresh_compliance_snapshots rewrites it, so the refresh has to
+run every day whether or not reminder notifications are enabled.
+
+SnapshotRefresher runs it from the FastAPI startup hook: at startup and
+then once for each new day, checking every
+COMPLIANCE_SNAPSHOT_REFRESH_INTERVAL_SECONDS. The notification sweep
+endpoint refreshes as well.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import date
+
+from ..config import settings
+from ..storage.storage_factory import open_storage
+
+
+class SnapshotRefresher:
+    """
+    Refreshes stale compliance snapshots once per day in an asyncio task.
+
+    ``as_of`` pins the day the refresher runs for, for testing.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float | None = None,
+        as_of: date | None = None,
+        history: int = 50
+    ):
+        """
+        Args:
+            interval_seconds: Seconds between checks (defaults to
+                COMPLIANCE_SNAPSHOT_REFRESH_INTERVAL_SECONDS)
+            as_of: Fixed day to refresh for instead of today
+            history: Number of past runs kept for metrics
+        """
+        self.interval_seconds = (
+            interval_seconds or settings.COMPLIANCE_SNAPSHOT_REFRESH_INTERVAL_SECONDS
+        )
+        self.as_of = as_of
+        self.runs: deque[dict] = deque(maxlen=history)
+        self.last_as_of: date | None = None
+        self.last_error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background task (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run_forever(), name="snapshot-refresh")
+
+    async def stop(self):
+        """Cancel the background task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self, as_of: date | None = None) -> int:
+        """
+        Refresh the snapshots now, with their own storage session.
+
+        Args:
+            as_of: Day to refresh for (defaults to the refresher's as_of, then today)
+
+        Returns:
+            int: Number of snapshots recomputed
+        """
+        as_of = as_of or self.as_of or date.today()
+        start = time.perf_counter()
+        async with open_storage() as storage:
+            refreshed = await storage.refresh_compliance_snapshots(as_of)
+        self.runs.append({
+            "as_of": as_of,
+            "snapshots_refreshed": refreshed,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        })
+        self.last_as_of = as_of
+        self.last_error = None
+        return refreshed
+
+    async def _run_forever(self):
+        while True:
+            as_of = self.as_of or date.today()
+            if as_of != self.last_as_of:
+                try:
+                    await self.run_once(as_of)
+                except Exception as exc:
+                    # Keep the loop alive; the next check retries the day
+                    self.last_error = repr(exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    def metrics(self) -> dict:
+        """Refresher state and the recorded runs, most recent last."""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "last_as_of": self.last_as_of,
+            "last_error": self.last_error,
+            "runs": list(self.runs),
+        }
+
+
+refresher = SnapshotRefresher()
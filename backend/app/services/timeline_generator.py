@@ -7,6 +7,32 @@ from ..models.leave_request import LeaveRequest
 from .deadline_calculator import DeadlineCalculator
 
 
+# Title and description of each critical (compliance) event; shared with
+# AlertsEngine so alerts read the same as the timeline
+CRITICAL_EVENT_TEXT = {
+    EventType.CERTIFICATION_DEADLINE: (
+        "Certification Deadline",
+        "Medical certification must be received by this date. "
+        "Employee has 15 calendar days from notice date."
+    ),
+    EventType.CURE_WINDOW_START: (
+        "Cure Window Begins",
+        "7-day cure window begins for employee to fix incomplete "
+        "or missing documentation."
+    ),
+    EventType.CURE_WINDOW_END: (
+        "Cure Window Ends",
+        "Final deadline to provide missing/incomplete documentation. "
+        "Leave may be denied if not received."
+    ),
+    EventType.RECERTIFICATION_DUE: (
+        "Recertification Due",
+        "Medical recertification required ({condition_label} from leave start). "
+        "Updated certification must be submitted."
+    ),
+}
+
+
 class TimelineGenerator:
     """
     Generate timeline events for FMLA leave requests.
@@ -18,47 +44,57 @@ class TimelineGenerator:
     def __init__(self):
         self.calculator = DeadlineCalculator()
 
-    def generate_timeline(self, leave_request: LeaveRequest) -> list[TimelineEvent]:
+    def generate_timeline(
+        self,
+        leave_request: LeaveRequest,
+        as_of: date | None = None
+    ) -> list[TimelineEvent]:
         """
         Generate complete timeline for a leave request.
 
+        Event statuses are evaluated on ``as_of``, so the result is a pure
+        function of (leave_request, as_of).
+
         Args:
             leave_request: The FMLA leave request
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             Sorted list of timeline events
         """
+        as_of = as_of or date.today()
         events = []
 
         # Add leave start event
-        events.append(self._create_leave_start_event(leave_request))
+        events.append(self._create_leave_start_event(leave_request, as_of))
 
         # Add leave end event
-        events.append(self._create_leave_end_event(leave_request))
+        events.append(self._create_leave_end_event(leave_request, as_of))
 
         # Add certification deadline
-        cert_deadline_event = self._create_certification_deadline_event(leave_request)
+        cert_deadline_event = self._create_certification_deadline_event(leave_request, as_of)
         events.append(cert_deadline_event)
 
         # Add cure window if certification is missing or incomplete
         if self._needs_cure_window(leave_request):
             cure_events = self._create_cure_window_events(
-                cert_deadline_event.event_date
+                cert_deadline_event.event_date,
+                as_of
             )
             events.extend(cure_events)
 
         # Add recertification event
-        events.append(self._create_recertification_event(leave_request))
+        events.append(self._create_recertification_event(leave_request, as_of))
 
         # Sort events by date
         events.sort(key=lambda e: e.event_date)
 
         return events
 
-    def _create_leave_start_event(self, leave_request: LeaveRequest) -> TimelineEvent:
+    def _create_leave_start_event(self, leave_request: LeaveRequest, as_of: date) -> TimelineEvent:
         """Create leave start event."""
         event_date = leave_request.leave.start_date
-        status = self._calculate_event_status(event_date, completed=False)
+        status = self._calculate_event_status(event_date, completed=False, as_of=as_of)
 
         return TimelineEvent(
             event_type=EventType.LEAVE_START,
@@ -69,10 +105,10 @@ class TimelineGenerator:
             is_critical=False
         )
 
-    def _create_leave_end_event(self, leave_request: LeaveRequest) -> TimelineEvent:
+    def _create_leave_end_event(self, leave_request: LeaveRequest, as_of: date) -> TimelineEvent:
         """Create leave end event."""
         event_date = leave_request.leave.end_date
-        status = self._calculate_event_status(event_date, completed=False)
+        status = self._calculate_event_status(event_date, completed=False, as_of=as_of)
 
         return TimelineEvent(
             event_type=EventType.LEAVE_END,
@@ -85,10 +121,11 @@ class TimelineGenerator:
 
     def _create_certification_deadline_event(
         self,
-        leave_request: LeaveRequest
+        leave_request: LeaveRequest,
+        as_of: date
     ) -> TimelineEvent:
         """Create certification deadline event."""
-        notice_date = leave_request.notice_date or date.today()
+        notice_date = leave_request.notice_date or as_of
         event_date = self.calculator.calculate_certification_deadline(
             leave_request.leave.start_date,
             notice_date
@@ -100,60 +137,48 @@ class TimelineGenerator:
             leave_request.medical_provider.date_signed is not None
         )
 
-        status = self._calculate_event_status(event_date, completed)
+        status = self._calculate_event_status(event_date, completed, as_of)
+        title, description = CRITICAL_EVENT_TEXT[EventType.CERTIFICATION_DEADLINE]
 
         return TimelineEvent(
             event_type=EventType.CERTIFICATION_DEADLINE,
             event_date=event_date,
             status=status,
-            title="Certification Deadline",
-            description=(
-                "Medical certification must be received by this date. "
-                "Employee has 15 calendar days from notice date."
-            ),
+            title=title,
+            description=description,
             is_critical=True
         )
 
     def _create_cure_window_events(
         self,
-        cert_deadline: date
+        cert_deadline: date,
+        as_of: date
     ) -> list[TimelineEvent]:
         """Create cure window start and end events."""
         cure_start, cure_end = self.calculator.calculate_cure_window(cert_deadline)
 
         events = []
 
-        # Cure window start
-        events.append(TimelineEvent(
-            event_type=EventType.CURE_WINDOW_START,
-            event_date=cure_start,
-            status=self._calculate_event_status(cure_start, completed=False),
-            title="Cure Window Begins",
-            description=(
-                "7-day cure window begins for employee to fix incomplete "
-                "or missing documentation."
-            ),
-            is_critical=True
-        ))
-
-        # Cure window end
-        events.append(TimelineEvent(
-            event_type=EventType.CURE_WINDOW_END,
-            event_date=cure_end,
-            status=self._calculate_event_status(cure_end, completed=False),
-            title="Cure Window Ends",
-            description=(
-                "Final deadline to provide missing/incomplete documentation. "
-                "Leave may be denied if not received."
-            ),
-            is_critical=True
-        ))
+        for event_type, event_date in (
+            (EventType.CURE_WINDOW_START, cure_start),
+            (EventType.CURE_WINDOW_END, cure_end),
+        ):
+            title, description = CRITICAL_EVENT_TEXT[event_type]
+            events.append(TimelineEvent(
+                event_type=event_type,
+                event_date=event_date,
+                status=self._calculate_event_status(event_date, completed=False, as_of=as_of),
+                title=title,
+                description=description,
+                is_critical=True
+            ))
 
         return events
 
     def _create_recertification_event(
         self,
-        leave_request: LeaveRequest
+        leave_request: LeaveRequest,
+        as_of: date
     ) -> TimelineEvent:
         """Create recertification deadline event."""
         event_date = self.calculator.calculate_recertification_date(
@@ -161,29 +186,29 @@ class TimelineGenerator:
             leave_request.leave.condition_type.value
         )
 
-        status = self._calculate_event_status(event_date, completed=False)
+        status = self._calculate_event_status(event_date, completed=False, as_of=as_of)
 
         condition_label = (
             "6 months" if leave_request.leave.condition_type.value == "chronic"
             else "30 days"
         )
 
+        title, description = CRITICAL_EVENT_TEXT[EventType.RECERTIFICATION_DUE]
+
         return TimelineEvent(
             event_type=EventType.RECERTIFICATION_DUE,
             event_date=event_date,
             status=status,
-            title="Recertification Due",
-            description=(
-                f"Medical recertification required ({condition_label} from leave start). "
-                "Updated certification must be submitted."
-            ),
+            title=title,
+            description=description.format(condition_label=condition_label),
             is_critical=True
         )
 
     def _calculate_event_status(
         self,
         event_date: date,
-        completed: bool
+        completed: bool,
+        as_of: date | None = None
     ) -> EventStatus:
         """
         Calculate the status of an event based on date and completion.
@@ -191,6 +216,7 @@ class TimelineGenerator:
         Args:
             event_date: Date of the event
             completed: Whether the event has been completed
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             EventStatus enum value
@@ -198,7 +224,7 @@ class TimelineGenerator:
         if completed:
             return EventStatus.COMPLETED
 
-        today = date.today()
+        today = as_of or date.today()
 
         if event_date < today:
             return EventStatus.OVERDUE
@@ -225,7 +251,8 @@ class TimelineGenerator:
     def get_at_risk_events(
         self,
         leave_request: LeaveRequest,
-        warning_days: int = 3
+        warning_days: int = 3,
+        as_of: date | None = None
     ) -> list[TimelineEvent]:
         """
         Get events that are at risk (approaching or overdue).
@@ -233,11 +260,13 @@ class TimelineGenerator:
         Args:
             leave_request: The leave request
             warning_days: Number of days before deadline to consider "approaching"
+            as_of: Evaluation date (defaults to today)
 
         Returns:
             List of at-risk events
         """
-        timeline = self.generate_timeline(leave_request)
+        as_of = as_of or date.today()
+        timeline = self.generate_timeline(leave_request, as_of)
         at_risk = []
 
         for event in timeline:
@@ -249,7 +278,8 @@ class TimelineGenerator:
             elif event.status in (EventStatus.UPCOMING, EventStatus.TODAY):
                 if self.calculator.is_approaching_deadline(
                     event.event_date,
-                    warning_days
+                    warning_days,
+                    as_of
                 ):
                     at_risk.append(event)
 
@@ -0,0 +1,134 @@
+"""
+Async storage implementations for the API routes.
+
+Route handlers are ``async def``, so blocking storage calls would stall the
+event loop and serialize every request on a worker. Both classes here expose
+the full storage interface (JSONStorage/DBStorage method names and
+arguments) as coroutines:
+
+- AsyncDBStorage runs DBStorage on an AsyncSession. Queries go through the
+  async driver (aiosqlite/asyncpg) via ``AsyncSession.run_sync``, so the
+  event loop is free while the database works.
+- ThreadedStorage wraps any blocking storage (JSON files, sync database
+  sessions) and runs each call in the threadpool.
+
+The ``stream_*`` methods (stream_leave_requests, stream_notifications) are
+coroutines too, but return an async iterator of records instead of a list:
+``async for record in await storage.stream_notifications()``. AsyncDBStorage
+streams from the database cursor with ``AsyncSession.stream``; ThreadedStorage
+pulls from the blocking iterator in the threadpool, STREAM_BATCH_SIZE records
+per step.
+"""
+from datetime import date
+from itertools import islice
+from typing import Any, AsyncIterator, Iterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from ..services import compliance_snapshot
+from ..services.alerts_engine import AlertsEngine
+from .db_storage import STREAM_BATCH_SIZE, DBStorage, leave_requests_select, notifications_select
+
+
+class AsyncDBStorage:
+    """
+    Database storage on SQLAlchemy's async engine.
+
+    Every DBStorage method is available as a coroutine with the same
+    arguments and return value, e.g. ``await storage.get_leave_request_by_id(id)``.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize with an async database session.
+
+        Args:
+            session: SQLAlchemy AsyncSession
+        """
+        self.session = session
+
+    def __getattr__(self, name: str) -> Any:
+        # Resolve on an instance so properties (e.g. store_key) come back as
+        # values; only methods need the trip through run_sync
+        attr = getattr(DBStorage(self.session.sync_session), name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self.session.run_sync(
+                lambda sync_session: getattr(DBStorage(sync_session), name)(*args, **kwargs)
+            )
+
+        call.__name__ = name
+        return call
+
+    async def get_compliance_alerts(self, as_of: date | None = None) -> list[dict]:
+        """
+        DBStorage.get_compliance_alerts with only the queries in run_sync.
+
+        run_sync runs on the event loop thread, so the requests still to
+        evaluate are handed to AlertsEngine.compute_alerts_async afterwards.
+        """
+        alerts, pending, as_of = await self.compliance_alert_sources(as_of)
+        recomputed = await AlertsEngine().compute_alerts_async(pending, as_of)
+        return compliance_snapshot.merge_alerts(alerts, recomputed)
+
+    async def _stream(self, stmt) -> AsyncIterator[dict]:
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        return (row.to_dict() async for row in result)
+
+    async def stream_leave_requests(self, **filters) -> AsyncIterator[dict]:
+        """Leave requests matching DBStorage.stream_leave_requests filters, as fetched."""
+        return await self._stream(leave_requests_select(**filters))
+
+    async def stream_notifications(self, **filters) -> AsyncIterator[dict]:
+        """Notifications matching DBStorage.stream_notifications filters, as fetched."""
+        return await self._stream(notifications_select(**filters))
+
+
+async def _iterate_in_threadpool(records: Iterator[dict]) -> AsyncIterator[dict]:
+    """Drain a blocking iterator in the threadpool, a batch per thread hop."""
+    batches = iter(lambda: list(islice(records, STREAM_BATCH_SIZE)), [])
+    async for batch in iterate_in_threadpool(batches):
+        for record in batch:
+            yield record
+
+
+class ThreadedStorage:
+    """
+    Async facade over a blocking storage implementation.
+
+    Each method call is run in the threadpool, e.g.
+    ``await ThreadedStorage(JSONStorage()).get_all_notifications()``.
+    """
+
+    def __init__(self, storage: Any):
+        """
+        Initialize with a blocking storage.
+
+        Args:
+            storage: JSONStorage, NDJSONStorage or DBStorage instance
+        """
+        self.storage = storage
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.storage, name)
+        if not callable(attr):
+            return attr
+
+        if name.startswith("stream_"):
+            async def call(*args, **kwargs):
+                return _iterate_in_threadpool(await run_in_threadpool(attr, *args, **kwargs))
+        else:
+            async def call(*args, **kwargs):
+                return await run_in_threadpool(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
+# Type of the storage handed to route handlers by get_async_storage
+AsyncStorage = AsyncDBStorage | ThreadedStorage
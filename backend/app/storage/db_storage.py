@@ -8,13 +8,152 @@ return dictionaries to match the existing API contract.
 Written by Claude Code on 2026-01-30
 User prompt: Database Integration - Add SQLAlchemy with PostgreSQL/MySQL
 """
-from typing import Optional
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import Date, DateTime, and_, delete, func, insert, or_, select, update
 
-from ..db.models import LeaveRequestDB, NotificationDB
-from ..models.leave_request import LeaveStatus
+from ..db.models import ComplianceSnapshotDB, LeaveRequestDB, NotificationDB, NotificationOutboxDB
+from ..models.leave_request import LeaveRequest, LeaveStatus
 from ..models.notification import NotificationType
+from ..services import compliance_snapshot
+from ..services.alerts_engine import AlertsEngine
+from ..services.compliance_checker import AT_RISK_WINDOW_DAYS
+from ..utils.deadline_fields import deadline_fields
+from ..services.deadline_index import DueEvent
+from ..models.timeline_event import EventType
+from . import hooks, outbox
+from .dedup import skip_duplicates
+from .pagination import InvalidCursorError, decode_cursor
+
+
+# Columns list queries may sort on, keyed by the order_by name
+LEAVE_REQUEST_SORT_COLUMNS = {"created_at": LeaveRequestDB.created_at}
+NOTIFICATION_SORT_COLUMNS = {"created_at": NotificationDB.created_at}
+
+# Rows fetched per round trip when streaming query results (yield_per)
+STREAM_BATCH_SIZE = 500
+
+
+def _apply_order(query, order_by: str | None, columns: dict, id_column, cursor: str | None = None):
+    """
+    Apply an ``order_by`` spec ("created_at" or "-created_at") to a query.
+
+    The primary key is added as a tie-breaker so the order is deterministic.
+    With a ``cursor``, only rows strictly after the cursor's (created_at, id)
+    key are kept; this keyset condition is served by the composite
+    (created_at, id) indexes.
+    """
+    if order_by is None:
+        if cursor is not None:
+            raise ValueError("cursor requires order_by")
+        return query
+
+    descending = order_by.startswith("-")
+    column = columns.get(order_by.lstrip("-"))
+    if column is None:
+        raise ValueError(f"Unsupported order_by: {order_by}")
+
+    if cursor is not None:
+        raw_value, last_id = decode_cursor(cursor)
+        try:
+            last_value = column.type.python_type.fromisoformat(raw_value)
+        except ValueError as exc:
+            raise InvalidCursorError(f"Invalid cursor: {cursor}") from exc
+        if descending:
+            query = query.filter(or_(
+                column < last_value,
+                and_(column == last_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                column > last_value,
+                and_(column == last_value, id_column > last_id)
+            ))
+
+    if descending:
+        return query.order_by(column.desc(), id_column.desc())
+    return query.order_by(column.asc(), id_column.asc())
+
+
+def _column_values(model, data: dict) -> dict:
+    """
+    Keep only the keys of ``data`` that are columns of ``model``.
+
+    ISO date/datetime strings (as produced by ``model_dump(mode='json')``)
+    are converted for Date/DateTime columns, which only accept Python
+    date/datetime objects.
+    """
+    columns = model.__table__.columns
+    values = {}
+    for key, value in data.items():
+        if key not in columns:
+            continue
+        if isinstance(value, str) and isinstance(columns[key].type, (Date, DateTime)):
+            value = columns[key].type.python_type.fromisoformat(value)
+        values[key] = value
+    return values
+
+
+def leave_requests_select(
+    status: LeaveStatus | None = None,
+    at_risk_as_of: date | None = None,
+    deadline_before: date | None = None,
+    order_by: str | None = None,
+    cursor: str | None = None
+):
+    """SELECT for DBStorage.query_leave_requests (also streamed by AsyncDBStorage)."""
+    stmt = select(LeaveRequestDB)
+    if status is not None:
+        stmt = stmt.where(LeaveRequestDB.status == LeaveStatus(status))
+    if at_risk_as_of is not None:
+        # deadline <= horizon AND (overdue OR incomplete): a range scan on
+        # the certification_deadline index. Without a notice date the
+        # deadline is min(as_of + 15, leave start); as_of + 15 is past the
+        # horizon, so the same test runs on the leave start instead.
+        horizon = at_risk_as_of + timedelta(days=AT_RISK_WINDOW_DAYS)
+        incomplete = LeaveRequestDB.certification_complete.is_(False)
+
+        def at_risk(deadline):
+            return and_(deadline <= horizon, or_(deadline < at_risk_as_of, incomplete))
+
+        stmt = stmt.where(or_(
+            at_risk(LeaveRequestDB.certification_deadline),
+            and_(
+                LeaveRequestDB.certification_deadline.is_(None),
+                at_risk(LeaveRequestDB.leave_start_date)
+            )
+        ))
+    if deadline_before is not None:
+        stmt = stmt.where(LeaveRequestDB.certification_deadline < deadline_before)
+    return _apply_order(stmt, order_by, LEAVE_REQUEST_SORT_COLUMNS, LeaveRequestDB.id, cursor)
+
+
+def notifications_select(
+    request_id: str | None = None,
+    notification_type: NotificationType | None = None,
+    unread_only: bool = False,
+    order_by: str | None = None,
+    cursor: str | None = None
+):
+    """SELECT for DBStorage.query_notifications (also streamed by AsyncDBStorage)."""
+    stmt = select(NotificationDB)
+    if request_id is not None:
+        stmt = stmt.where(NotificationDB.request_id == request_id)
+    if notification_type is not None:
+        stmt = stmt.where(NotificationDB.type == NotificationType(notification_type))
+    if unread_only:
+        stmt = stmt.where(NotificationDB.read_status.is_(False))
+    return _apply_order(stmt, order_by, NOTIFICATION_SORT_COLUMNS, NotificationDB.id, cursor)
+
+
+def _outbox_row(notification_id: str) -> dict:
+    """Column values of a new outbox row."""
+    return _column_values(NotificationOutboxDB, dict(
+        outbox.new_outbox_entry(notification_id), notification_id=notification_id
+    ))
 
 
 class DBStorage:
@@ -34,6 +173,60 @@ class DBStorage:
         """
         self.db = db
 
+    def _update_by_id(self, model, row_id: str, updates: dict, commit: bool = True) -> dict | None:
+        """
+        Update one row by primary key and return it, in a single statement.
+
+        Uses ``UPDATE ... RETURNING`` where the dialect supports it (SQLite
+        3.35+, PostgreSQL). Otherwise the UPDATE is followed by a SELECT in
+        the same transaction.
+
+        Args:
+            model: ORM model class (LeaveRequestDB or NotificationDB)
+            row_id: Primary key of the row
+            updates: Dictionary of fields to update (unknown keys are ignored)
+            commit: Commit the transaction (False lets the caller add statements)
+
+        Returns:
+            dict | None: Updated row dictionary or None if not found
+        """
+        stmt = update(model).where(model.id == row_id).values(**_column_values(model, updates))
+
+        if self.db.get_bind().dialect.update_returning:
+            row = self.db.execute(stmt.returning(model)).scalar_one_or_none()
+        else:
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            row = None
+            if result.rowcount:
+                row = self.db.execute(
+                    select(model).where(model.id == row_id),
+                    execution_options={"populate_existing": True}
+                ).scalar_one()
+
+        # Serialize before commit expires the instance
+        data = row.to_dict() if row is not None else None
+        if commit:
+            self.db.commit()
+        return data
+
+    def _delete_by_id(self, model, row_id: str) -> bool:
+        """
+        Delete one row by primary key without loading it.
+
+        Args:
+            model: ORM model class (LeaveRequestDB or NotificationDB)
+            row_id: Primary key of the row
+
+        Returns:
+            bool: True if deleted, False if not found
+        """
+        result = self.db.execute(
+            delete(model).where(model.id == row_id),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
     # === Leave Request Operations ===
 
     def get_all_leave_requests(self) -> list[dict]:
@@ -46,6 +239,61 @@ class DBStorage:
         requests = self.db.query(LeaveRequestDB).all()
         return [req.to_dict() for req in requests]
 
+    def query_leave_requests(
+        self,
+        status: LeaveStatus | None = None,
+        at_risk_as_of: date | None = None,
+        deadline_before: date | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> list[dict]:
+        """
+        Get leave requests matching filters, filtered and sorted in SQL.
+
+        Args:
+            status: Only return requests with this status (uses the status index)
+            at_risk_as_of: Only return requests at risk on this date (see
+                ComplianceChecker.is_at_risk), including requests without
+                a notice date
+            deadline_before: Only return requests whose certification deadline
+                is before this date
+            order_by: "created_at" or "-created_at" (descending); None keeps table order
+            limit: Maximum number of rows to return
+            cursor: Keyset cursor; only rows after it (in order_by order) are returned
+
+        Returns:
+            list[dict]: List of matching leave request dictionaries
+        """
+        stmt = leave_requests_select(status, at_risk_as_of, deadline_before, order_by, cursor)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [req.to_dict() for req in self.db.scalars(stmt)]
+
+    def stream_leave_requests(
+        self,
+        status: LeaveStatus | None = None,
+        at_risk_as_of: date | None = None,
+        deadline_before: date | None = None,
+        order_by: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Like query_leave_requests, but yields rows as they are fetched.
+
+        Rows come from the cursor STREAM_BATCH_SIZE at a time (yield_per),
+        so memory stays flat however many rows match. Invalid arguments
+        raise before the first row is fetched.
+
+        Yields:
+            dict: Matching leave request dictionaries
+        """
+        stmt = leave_requests_select(status, at_risk_as_of, deadline_before, order_by)
+        return self._stream(stmt)
+
+    def _stream(self, stmt) -> Iterator[dict]:
+        for row in self.db.scalars(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)):
+            yield row.to_dict()
+
     def get_leave_request_by_id(self, request_id: str) -> dict | None:
         """
         Get a specific leave request by ID.
@@ -61,6 +309,73 @@ class DBStorage:
         ).first()
         return request.to_dict() if request else None
 
+    def get_leave_requests_by_ids(self, request_ids: list[str]) -> list[dict]:
+        """
+        Get leave requests by ID with one IN query.
+
+        Args:
+            request_ids: IDs to fetch
+
+        Returns:
+            list[dict]: Leave requests in the given order; unknown IDs are skipped
+        """
+        if not request_ids:
+            return []
+        rows = self.db.query(LeaveRequestDB).filter(LeaveRequestDB.id.in_(request_ids)).all()
+        by_id = {row.id: row.to_dict() for row in rows}
+        return [by_id[i] for i in request_ids if i in by_id]
+
+    @property
+    def store_key(self) -> str:
+        """Identifies this database in change hooks."""
+        return str(self.db.get_bind().url)
+
+    def due_between(
+        self,
+        start: date | None,
+        end: date,
+        event_types: list[str] | None = None
+    ) -> list[DueEvent]:
+        """
+        Deadline events from ``start`` through ``end`` (inclusive).
+
+        Database counterpart of DeadlineIndex.due_between: each event type is
+        a range scan on its indexed deadline column.
+
+        Args:
+            start: First day (None means no lower bound)
+            end: Last day
+            event_types: Only these event types (None means all)
+
+        Returns:
+            list[DueEvent]: Sorted by date, then request id and event type
+        """
+        # event type -> (column, days the event falls after the column's date)
+        sources = {
+            EventType.CERTIFICATION_DEADLINE.value: (LeaveRequestDB.certification_deadline, 0),
+            EventType.CURE_WINDOW_START.value: (LeaveRequestDB.certification_deadline, 1),
+            EventType.CURE_WINDOW_END.value: (LeaveRequestDB.cure_window_end, 0),
+            EventType.RECERTIFICATION_DUE.value: (LeaveRequestDB.recertification_date, 0),
+            EventType.LEAVE_END.value: (LeaveRequestDB.leave_end_date, 0),
+        }
+        if event_types is not None:
+            wanted = {getattr(t, "value", t) for t in event_types}
+            sources = {t: s for t, s in sources.items() if t in wanted}
+
+        events = []
+        for event_type, (column, shift) in sources.items():
+            query = self.db.query(LeaveRequestDB.id, column).filter(
+                column <= end - timedelta(days=shift)
+            )
+            if start is not None:
+                query = query.filter(column >= start - timedelta(days=shift))
+            events.extend(
+                DueEvent(day + timedelta(days=shift), request_id, event_type)
+                for request_id, day in query
+            )
+        events.sort()
+        return events
+
     def create_leave_request(self, request_data: dict) -> dict:
         """
         Create a new leave request.
@@ -71,11 +386,15 @@ class DBStorage:
         Returns:
             dict: Created leave request dictionary
         """
+        # Deadline columns are filled in by the before_insert hook
         db_request = LeaveRequestDB(**request_data)
         self.db.add(db_request)
+        self.db.flush()
+        data = db_request.to_dict()
+        self._write_snapshot(data)
         self.db.commit()
-        self.db.refresh(db_request)
-        return db_request.to_dict()
+        hooks.notify_leave_request_changed(hooks.CREATED, data["id"], data, self.store_key)
+        return data
 
     def update_leave_request(self, request_id: str, updates: dict) -> dict | None:
         """
@@ -88,27 +407,30 @@ class DBStorage:
         Returns:
             dict | None: Updated leave request dictionary or None if not found
         """
-        request = self.db.query(LeaveRequestDB).filter(
-            LeaveRequestDB.id == request_id
-        ).first()
-
-        if not request:
-            return None
-
-        # Apply updates to ORM object
-        for key, value in updates.items():
-            if hasattr(request, key):
-                setattr(request, key, value)
+        updated = self._update_by_id(LeaveRequestDB, request_id, updates, commit=False)
 
+        # The bulk UPDATE skips ORM hooks, so resync the deadline columns
+        # (in the same transaction) when one of their inputs changed
+        if updated is not None and LeaveRequestDB.DEADLINE_INPUTS & updates.keys():
+            self.db.execute(
+                update(LeaveRequestDB)
+                .where(LeaveRequestDB.id == request_id)
+                .values(**deadline_fields(updated))
+                .execution_options(synchronize_session=False)
+            )
+        if updated is not None:
+            self._write_snapshot(updated)
         self.db.commit()
-        self.db.refresh(request)
-        return request.to_dict()
+        if updated is not None:
+            hooks.notify_leave_request_changed(hooks.UPDATED, request_id, updated, self.store_key)
+        return updated
 
     def delete_leave_request(self, request_id: str) -> bool:
         """
         Delete a leave request.
 
-        Due to cascade delete, this will also delete all associated notifications.
+        Associated notifications are removed by the ON DELETE CASCADE
+        foreign key (SQLite connections enable it via PRAGMA foreign_keys).
 
         Args:
             request_id: Unique identifier for the leave request
@@ -116,16 +438,123 @@ class DBStorage:
         Returns:
             bool: True if deleted, False if not found
         """
-        request = self.db.query(LeaveRequestDB).filter(
-            LeaveRequestDB.id == request_id
-        ).first()
+        deleted = self._delete_by_id(LeaveRequestDB, request_id)
+        if deleted:
+            hooks.notify_leave_request_changed(hooks.DELETED, request_id, store=self.store_key)
+        return deleted
 
-        if not request:
-            return False
+    # === Compliance Snapshot ===
 
-        self.db.delete(request)
-        self.db.commit()
-        return True
+    def _write_snapshot(self, request_data: dict, as_of: date | None = None):
+        """Recompute and upsert one request's compliance snapshot (no commit)."""
+        as_of = as_of or date.today()
+        row = compliance_snapshot.build_snapshot(LeaveRequest(**request_data), as_of)
+        self.db.merge(ComplianceSnapshotDB(**row))
+
+    def _stale_snapshot_requests(self, as_of: date) -> list[LeaveRequestDB]:
+        """
+        Requests without a snapshot valid on ``as_of``.
+
+        That is, no snapshot yet, or one that reached its next_change date
+        (a risk band or event status can flip) or was computed for a later day.
+        """
+        return self.db.execute(
+            select(LeaveRequestDB)
+            .outerjoin(ComplianceSnapshotDB, ComplianceSnapshotDB.request_id == LeaveRequestDB.id)
+            .where(or_(
+                ComplianceSnapshotDB.request_id.is_(None),
+                ComplianceSnapshotDB.next_change <= as_of,
+                ComplianceSnapshotDB.as_of > as_of
+            ))
+        ).scalars().all()
+
+    def refresh_compliance_snapshots(self, as_of: date | None = None) -> int:
+        """
+        Incrementally refresh the compliance snapshot.
+
+        Only stale snapshots are recomputed; on most days that is a small
+        fraction of all requests. Run at startup and once a day by
+        SnapshotRefresher and by the notification sweep endpoint, so alert
+        reads stay read-only.
+
+        Args:
+            as_of: Day to refresh for (defaults to today)
+
+        Returns:
+            int: Number of snapshots recomputed
+        """
+        as_of = as_of or date.today()
+        stale = self._stale_snapshot_requests(as_of)
+
+        for request in stale:
+            self._write_snapshot(request.to_dict(), as_of)
+        if stale:
+            self.db.commit()
+        return len(stale)
+
+    def get_compliance_alerts(self, as_of: date | None = None) -> list[dict]:
+        """
+        Get alerts for all at-risk leave requests, most urgent first.
+
+        For today, reads the compliance snapshot instead of running the
+        compliance checker over every request. Requests whose snapshot is
+        stale (refresh_compliance_snapshots has not run yet today) are
+        evaluated in memory; nothing is written. For any other day alerts
+        are computed for the requests the deadline columns say can be at
+        risk on that day.
+
+        Args:
+            as_of: Day to evaluate alerts for (defaults to today)
+
+        Returns:
+            list[dict]: Alerts with "request", "compliance" and "at_risk_events"
+        """
+        alerts, pending, as_of = self.compliance_alert_sources(as_of)
+        return compliance_snapshot.merge_alerts(alerts, AlertsEngine().compute_alerts(pending, as_of))
+
+    def compliance_alert_sources(self, as_of: date | None = None) -> tuple[list[dict], list[dict], date]:
+        """
+        The database half of get_compliance_alerts.
+
+        Returns:
+            Tuple of (alerts served from valid snapshots, sorted; leave
+            requests still to evaluate, sorted by id; the day evaluated)
+        """
+        today = date.today()
+        if as_of is not None and as_of != today:
+            return [], self.query_leave_requests(at_risk_as_of=as_of), as_of
+
+        rows = self.db.execute(
+            select(ComplianceSnapshotDB, LeaveRequestDB)
+            .join(LeaveRequestDB, LeaveRequestDB.id == ComplianceSnapshotDB.request_id)
+            .where(
+                ComplianceSnapshotDB.at_risk.is_(True),
+                or_(ComplianceSnapshotDB.next_change.is_(None), ComplianceSnapshotDB.next_change > today),
+                ComplianceSnapshotDB.as_of <= today
+            )
+            .order_by(
+                ComplianceSnapshotDB.risk_rank,
+                ComplianceSnapshotDB.certification_deadline,
+                ComplianceSnapshotDB.request_id
+            )
+        ).all()
+        alerts = [
+            compliance_snapshot.alert_from_snapshot(
+                request.to_dict(),
+                {
+                    "compliance": snapshot.compliance,
+                    "certification_deadline": snapshot.certification_deadline,
+                    "at_risk_events": snapshot.at_risk_events,
+                },
+                today
+            )
+            for snapshot, request in rows
+        ]
+        stale = sorted(
+            (request.to_dict() for request in self._stale_snapshot_requests(today)),
+            key=lambda r: r["id"]
+        )
+        return alerts, stale, today
 
     # === Notification Operations ===
 
@@ -154,6 +583,51 @@ class DBStorage:
         ).all()
         return [notif.to_dict() for notif in notifications]
 
+    def query_notifications(
+        self,
+        request_id: str | None = None,
+        notification_type: NotificationType | None = None,
+        unread_only: bool = False,
+        order_by: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> list[dict]:
+        """
+        Get notifications matching filters, filtered and sorted in SQL.
+
+        Args:
+            request_id: Only return notifications for this leave request
+            notification_type: Only return notifications of this type
+            unread_only: Only return unread notifications
+            order_by: "created_at" or "-created_at" (descending); None keeps table order
+            limit: Maximum number of rows to return
+            cursor: Keyset cursor; only rows after it (in order_by order) are returned
+
+        Returns:
+            list[dict]: List of matching notification dictionaries
+        """
+        stmt = notifications_select(request_id, notification_type, unread_only, order_by, cursor)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [notif.to_dict() for notif in self.db.scalars(stmt)]
+
+    def stream_notifications(
+        self,
+        request_id: str | None = None,
+        notification_type: NotificationType | None = None,
+        unread_only: bool = False,
+        order_by: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Like query_notifications, but yields rows as they are fetched
+        (see stream_leave_requests).
+
+        Yields:
+            dict: Matching notification dictionaries
+        """
+        stmt = notifications_select(request_id, notification_type, unread_only, order_by)
+        return self._stream(stmt)
+
     def get_notification_by_id(self, notification_id: str) -> dict | None:
         """
         Get a specific notification by ID.
@@ -169,22 +643,283 @@ class DBStorage:
         ).first()
         return notification.to_dict() if notification else None
 
+    def get_notifications_by_ids(self, notification_ids: list[str]) -> list[dict]:
+        """
+        Get notifications by ID with one IN query.
+
+        Args:
+            notification_ids: IDs to fetch
+
+        Returns:
+            list[dict]: Notifications in the given order; unknown IDs are skipped
+        """
+        if not notification_ids:
+            return []
+        rows = self.db.query(NotificationDB).filter(NotificationDB.id.in_(notification_ids)).all()
+        by_id = {row.id: row.to_dict() for row in rows}
+        return [by_id[i] for i in notification_ids if i in by_id]
+
+    def get_notification_by_dedup_key(self, dedup_key: str) -> dict | None:
+        """
+        Get the notification stored under a dedup key.
+
+        Args:
+            dedup_key: Key of the logical notification (request, type, deadline)
+
+        Returns:
+            dict | None: Notification dictionary if found, None otherwise
+        """
+        db_notification = self.db.query(NotificationDB).filter(
+            NotificationDB.dedup_key == dedup_key
+        ).first()
+        return db_notification.to_dict() if db_notification else None
+
+    def get_existing_dedup_keys(self, dedup_keys: list[str]) -> set[str]:
+        """
+        Find which dedup keys already have a notification, with one IN query.
+
+        Args:
+            dedup_keys: Keys to check
+
+        Returns:
+            set[str]: The keys that are already stored
+        """
+        if not dedup_keys:
+            return set()
+        return set(self.db.scalars(
+            select(NotificationDB.dedup_key).where(NotificationDB.dedup_key.in_(set(dedup_keys)))
+        ))
+
     def create_notification(self, notification_data: dict) -> dict:
         """
         Create a new notification.
 
+        A notification whose dedup_key is already stored is not created
+        again; the stored one is returned instead.
+
         Args:
             notification_data: Dictionary containing notification data
 
         Returns:
-            dict: Created notification dictionary
+            dict: Created (or already stored) notification dictionary
         """
-        db_notification = NotificationDB(**notification_data)
+        dedup_key = notification_data.get("dedup_key")
+        if dedup_key is not None:
+            existing = self.get_notification_by_dedup_key(dedup_key)
+            if existing is not None:
+                return existing
+
+        db_notification = NotificationDB(**_column_values(NotificationDB, notification_data))
         self.db.add(db_notification)
-        self.db.commit()
+        try:
+            if outbox.outbox_enabled():
+                self.db.flush()
+                self.db.execute(insert(NotificationOutboxDB), [_outbox_row(db_notification.id)])
+            self.db.commit()
+        except IntegrityError:
+            # Stored concurrently since the lookup above (unique dedup_key)
+            self.db.rollback()
+            existing = self.get_notification_by_dedup_key(dedup_key) if dedup_key else None
+            if existing is None:
+                raise
+            return existing
         self.db.refresh(db_notification)
         return db_notification.to_dict()
 
+    def create_notifications(self, notifications: list[dict]) -> int:
+        """
+        Create many notifications with a single multi-row INSERT.
+
+        Notifications whose dedup_key is already stored (or repeated in the
+        list) are skipped. With delivery enabled, their outbox rows are
+        inserted in the same transaction.
+
+        Args:
+            notifications: Notification dictionaries
+
+        Returns:
+            int: Number of notifications created
+        """
+        keys = [n["dedup_key"] for n in notifications if n.get("dedup_key") is not None]
+        for attempt in range(2):
+            rows = [
+                _column_values(NotificationDB, n)
+                for n in skip_duplicates(notifications, self.get_existing_dedup_keys(keys))
+            ]
+            if not rows:
+                return 0
+            try:
+                self.db.execute(insert(NotificationDB), rows)
+                if outbox.outbox_enabled():
+                    self.db.execute(
+                        insert(NotificationOutboxDB), [_outbox_row(row["id"]) for row in rows]
+                    )
+                self.db.commit()
+                return len(rows)
+            except IntegrityError:
+                # Another writer stored some of the keys meanwhile: re-check once
+                self.db.rollback()
+                if attempt or not keys:
+                    raise
+
+    # Outbox Operations
+
+    def claim_outbox(
+        self,
+        limit: int,
+        lease_seconds: float,
+        now: datetime | None = None
+    ) -> list[dict]:
+        """
+        Claim outbox entries that are due for delivery.
+
+        Claimed entries move to "sending" until ``now + lease_seconds``; if
+        the worker doesn't report back by then they can be claimed again.
+        A claim token makes concurrent claimers pick disjoint entries.
+        Every claim counts as an attempt, so an entry whose worker never
+        reports back still runs out of attempts.
+
+        Args:
+            limit: Maximum number of entries to claim
+            lease_seconds: How long the claim is held
+            now: Current time (defaults to now)
+
+        Returns:
+            list[dict]: Outbox entries, oldest first, each with its
+            notification under "notification"
+        """
+        now = now or datetime.now()
+        due = (
+            select(NotificationOutboxDB.notification_id)
+            .where(
+                NotificationOutboxDB.status.in_(outbox.CLAIMABLE),
+                NotificationOutboxDB.available_at <= now
+            )
+            .order_by(NotificationOutboxDB.available_at)
+            .limit(limit)
+        )
+        ids = list(self.db.scalars(due))
+        if not ids:
+            return []
+
+        token = uuid.uuid4().hex
+        self.db.execute(
+            update(NotificationOutboxDB)
+            .where(
+                NotificationOutboxDB.notification_id.in_(ids),
+                NotificationOutboxDB.status.in_(outbox.CLAIMABLE),
+                NotificationOutboxDB.available_at <= now
+            )
+            .values(
+                status=outbox.SENDING,
+                attempts=NotificationOutboxDB.attempts + 1,
+                claim_token=token,
+                available_at=now + timedelta(seconds=lease_seconds)
+            )
+        )
+        self.db.commit()
+
+        rows = self.db.execute(
+            select(NotificationOutboxDB, NotificationDB)
+            .join(NotificationDB, NotificationDB.id == NotificationOutboxDB.notification_id)
+            .where(NotificationOutboxDB.claim_token == token)
+            .order_by(NotificationOutboxDB.created_at, NotificationOutboxDB.notification_id)
+        ).all()
+        # Entries whose notification was deleted meanwhile have nothing to send
+        orphans = set(ids) - {entry.notification_id for entry, _ in rows}
+        if orphans:
+            self.db.execute(
+                delete(NotificationOutboxDB).where(
+                    NotificationOutboxDB.claim_token == token,
+                    NotificationOutboxDB.notification_id.in_(orphans)
+                )
+            )
+            self.db.commit()
+        return [dict(entry.to_dict(), notification=notification.to_dict()) for entry, notification in rows]
+
+    def complete_outbox(self, notification_ids: list[str], claim_token: str | None = None) -> int:
+        """
+        Remove delivered entries from the outbox.
+
+        Args:
+            notification_ids: Entries that were delivered
+            claim_token: Only remove entries still held by this claim (a
+                worker whose lease expired must not remove a newer claim)
+
+        Returns:
+            int: Number of entries removed
+        """
+        if not notification_ids:
+            return 0
+        stmt = delete(NotificationOutboxDB).where(NotificationOutboxDB.notification_id.in_(notification_ids))
+        if claim_token is not None:
+            stmt = stmt.where(NotificationOutboxDB.claim_token == claim_token)
+        result = self.db.execute(stmt)
+        self.db.commit()
+        return result.rowcount
+
+    def retry_outbox(
+        self,
+        notification_id: str,
+        error: str,
+        available_at: datetime | None,
+        claim_token: str | None = None
+    ) -> bool:
+        """
+        Record a failed delivery attempt (counted when the entry was claimed).
+
+        Args:
+            notification_id: Entry that failed
+            error: Error description
+            available_at: When to try again; None gives up (status "failed")
+            claim_token: Only update the entry if it is still held by this claim
+
+        Returns:
+            bool: True if the entry exists (and is held by ``claim_token``)
+        """
+        values = {"last_error": error, "claim_token": None}
+        if available_at is None:
+            values["status"] = outbox.FAILED
+        else:
+            values.update(status=outbox.PENDING, available_at=available_at)
+        stmt = update(NotificationOutboxDB).where(NotificationOutboxDB.notification_id == notification_id)
+        if claim_token is not None:
+            stmt = stmt.where(NotificationOutboxDB.claim_token == claim_token)
+        result = self.db.execute(stmt.values(**values))
+        self.db.commit()
+        return result.rowcount > 0
+
+    def outbox_stats(self, now: datetime | None = None) -> dict:
+        """
+        Outbox depth by status.
+
+        Returns:
+            dict: pending, sending and failed counts, ready (pending and
+            due now) and oldest_pending_at (enqueue time of the oldest
+            entry not yet delivered or failed, ISO timestamp or None)
+        """
+        now = now or datetime.now()
+        counts = dict(self.db.execute(
+            select(NotificationOutboxDB.status, func.count()).group_by(NotificationOutboxDB.status)
+        ).all())
+        ready = self.db.scalar(
+            select(func.count()).select_from(NotificationOutboxDB).where(
+                NotificationOutboxDB.status == outbox.PENDING,
+                NotificationOutboxDB.available_at <= now
+            )
+        )
+        oldest = self.db.scalar(
+            select(func.min(NotificationOutboxDB.created_at))
+            .where(NotificationOutboxDB.status.in_(outbox.CLAIMABLE))
+        )
+        return {
+            "pending": counts.get(outbox.PENDING, 0),
+            "sending": counts.get(outbox.SENDING, 0),
+            "failed": counts.get(outbox.FAILED, 0),
+            "ready": ready,
+            "oldest_pending_at": oldest.isoformat() if oldest else None,
+        }
+
     def update_notification(self, notification_id: str, updates: dict) -> dict | None:
         """
         Update an existing notification.
@@ -196,21 +931,7 @@ class DBStorage:
         Returns:
             dict | None: Updated notification dictionary or None if not found
         """
-        notification = self.db.query(NotificationDB).filter(
-            NotificationDB.id == notification_id
-        ).first()
-
-        if not notification:
-            return None
-
-        # Apply updates to ORM object
-        for key, value in updates.items():
-            if hasattr(notification, key):
-                setattr(notification, key, value)
-
-        self.db.commit()
-        self.db.refresh(notification)
-        return notification.to_dict()
+        return self._update_by_id(NotificationDB, notification_id, updates)
 
     def delete_notification(self, notification_id: str) -> bool:
         """
@@ -222,16 +943,7 @@ class DBStorage:
         Returns:
             bool: True if deleted, False if not found
         """
-        notification = self.db.query(NotificationDB).filter(
-            NotificationDB.id == notification_id
-        ).first()
-
-        if not notification:
-            return False
-
-        self.db.delete(notification)
-        self.db.commit()
-        return True
+        return self._delete_by_id(NotificationDB, notification_id)
 
     def mark_notification_as_read(self, notification_id: str) -> dict | None:
         """
@@ -256,3 +968,102 @@ class DBStorage:
             dict | None: Updated notification dictionary or None if not found
         """
         return self.update_notification(notification_id, {"read_status": False})
+
+    # === Bulk Notification Operations ===
+
+    def _select_notifications(
+        self,
+        stmt,
+        notification_ids: list[str] | None,
+        request_id: str | None,
+        notification_type: NotificationType | None
+    ):
+        """Add the bulk selection criteria to an UPDATE/DELETE statement."""
+        if notification_ids is not None:
+            stmt = stmt.where(NotificationDB.id.in_(notification_ids))
+        if request_id is not None:
+            stmt = stmt.where(NotificationDB.request_id == request_id)
+        if notification_type is not None:
+            stmt = stmt.where(NotificationDB.type == NotificationType(notification_type))
+        return stmt.execution_options(synchronize_session=False)
+
+    def set_notifications_read_status(
+        self,
+        read_status: bool,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: NotificationType | None = None
+    ) -> int:
+        """
+        Set read status on many notifications in one UPDATE and one commit.
+
+        All given criteria must match; with none, every notification is
+        selected. Rows already in the target state are left alone.
+
+        Args:
+            read_status: New read status
+            notification_ids: Only these notifications
+            request_id: Only notifications for this leave request
+            notification_type: Only notifications of this type
+
+        Returns:
+            int: Number of notifications changed
+        """
+        stmt = self._select_notifications(
+            update(NotificationDB).where(NotificationDB.read_status.is_(not read_status)),
+            notification_ids, request_id, notification_type
+        )
+        result = self.db.execute(stmt.values(read_status=read_status))
+        self.db.commit()
+        return result.rowcount
+
+    def mark_notifications_as_read(self, **selection) -> int:
+        """
+        Mark every selected notification as read.
+
+        Args:
+            **selection: Criteria accepted by set_notifications_read_status
+
+        Returns:
+            int: Number of notifications changed
+        """
+        return self.set_notifications_read_status(True, **selection)
+
+    def mark_notifications_as_unread(self, **selection) -> int:
+        """
+        Mark every selected notification as unread.
+
+        Args:
+            **selection: Criteria accepted by set_notifications_read_status
+
+        Returns:
+            int: Number of notifications changed
+        """
+        return self.set_notifications_read_status(False, **selection)
+
+    def delete_notifications(
+        self,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: NotificationType | None = None,
+        read_only: bool = False
+    ) -> int:
+        """
+        Delete many notifications in one DELETE and one commit.
+
+        Args:
+            notification_ids: Only these notifications
+            request_id: Only notifications for this leave request
+            notification_type: Only notifications of this type
+            read_only: Only notifications that have been read
+
+        Returns:
+            int: Number of notifications deleted
+        """
+        stmt = delete(NotificationDB)
+        if read_only:
+            stmt = stmt.where(NotificationDB.read_status.is_(True))
+        stmt = self._select_notifications(stmt, notification_ids, request_id, notification_type)
+        result = self.db.execute(stmt)
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,33 @@
+"""
+Notification deduplication helpers shared by all storage backends.
+
+Deadline reminders carry a ``dedup_key`` naming the logical notification
+(request, type, deadline). Each backend keeps the stored keys indexed (a
+unique column in the database, a hash map over the file records) and
+refuses to store a second notification with a key it already has.
+"""
+from typing import Container
+
+
+def skip_duplicates(notifications: list[dict], existing_keys: Container[str]) -> list[dict]:
+    """
+    Drop notifications whose dedup key is already stored or repeated.
+
+    Args:
+        notifications: Notification dictionaries to be created
+        existing_keys: Dedup keys already in storage
+
+    Returns:
+        The notifications to store: those without a key, plus the first one
+        for each key not in ``existing_keys``, in the given order
+    """
+    seen = set()
+    fresh = []
+    for notification in notifications:
+        key = notification.get("dedup_key")
+        if key is not None:
+            if key in existing_keys or key in seen:
+                continue
+            seen.add(key)
+        fresh.append(notification)
+    return fresh
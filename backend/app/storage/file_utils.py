@@ -0,0 +1,173 @@
+"""
+File helpers for crash-safe, multi-process-safe file storage.
+
+Provides:
+- Atomic writes (temp file + fsync + rename + directory fsync), so readers
+  never observe a partially written file and the rename survives a crash
+- Advisory locks on a sidecar ``.lock`` file, so several uvicorn workers can
+  share the same data files without losing each other's updates
+"""
+import os
+import secrets
+import stat
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Locks held by the current thread: lock path -> [file object, depth, exclusive]
+_held = threading.local()
+
+
+def lock_path(filepath: Path) -> Path:
+    """Path of the sidecar lock file for a data file."""
+    return filepath.with_name(filepath.name + ".lock")
+
+
+@contextmanager
+def file_lock(filepath: Path, exclusive: bool = True) -> Iterator[None]:
+    """
+    Hold an advisory lock for a data file.
+
+    Exclusive locks guard read-modify-write cycles; shared locks let several
+    readers load a consistent view at once. The lock is re-entrant within a
+    thread (a nested request for a shared lock inside an exclusive one is a
+    no-op). Upgrading a shared lock to exclusive is not supported.
+
+    Args:
+        filepath: The data file to lock (the lock itself lives next to it)
+        exclusive: Take an exclusive (write) lock instead of a shared one
+    """
+    path = lock_path(filepath)
+    held = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+
+    if path in held:
+        if exclusive and not held[path][2]:
+            raise RuntimeError(f"Cannot upgrade shared lock on {path} to exclusive")
+        held[path][1] += 1
+        try:
+            yield
+        finally:
+            held[path][1] -= 1
+        return
+
+    lock_file = open(path, "a+")
+    try:
+        _acquire(lock_file, exclusive)
+        held[path] = [lock_file, 1, exclusive]
+        try:
+            yield
+        finally:
+            del held[path]
+            _release(lock_file)
+    finally:
+        lock_file.close()
+
+
+def _acquire(lock_file: IO, exclusive: bool):
+    """Block until the OS-level lock is granted."""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    else:
+        # msvcrt has no shared locks; every lock is exclusive on Windows
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _release(lock_file: IO):
+    """Release the OS-level lock."""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _file_mode(filepath: Path) -> int | None:
+    """Permission bits of an existing file, or None if it doesn't exist."""
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        return None
+
+
+def _create_temp(filepath: Path) -> tuple[int, str]:
+    """
+    Create a new temp file next to ``filepath``.
+
+    Created with mode 0666 so the process umask applies, like any new file
+    (mkstemp would force 0600). The umask is never read, since changing it
+    to do so would race with other threads creating files.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        name = str(filepath.with_name(f".{filepath.name}.{secrets.token_hex(8)}.tmp"))
+        try:
+            return os.open(name, flags, 0o666), name
+        except FileExistsError:
+            continue
+
+
+def fsync_directory(directory: Path):
+    """Make a rename in ``directory`` durable (no-op where directories can't be opened)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(filepath: Path, mode: str = "w") -> Iterator[IO]:
+    """
+    Write a file atomically.
+
+    Data goes to a temp file in the same directory, is fsynced, and is then
+    renamed over the target; the directory is fsynced after the rename so
+    the rename itself is durable. Readers see either the old or the new
+    file, never a truncated one. If the body raises, the target is left
+    untouched.
+
+    The new file keeps the permission bits of the one it replaces (a new
+    file gets the umask default), not mkstemp's 0600.
+
+    Args:
+        filepath: File to replace
+        mode: "w" for text or "wb" for bytes
+
+    Yields:
+        File object to write the new contents to
+    """
+    fd, tmp_name = _create_temp(filepath)
+    try:
+        file_mode = _file_mode(filepath)
+        if file_mode is not None:
+            os.chmod(tmp_name, file_mode)
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_directory(filepath.parent)
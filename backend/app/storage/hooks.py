@@ -0,0 +1,56 @@
+"""
+Change hooks for leave requests.
+
+Every storage backend calls notify_leave_request_changed after a leave
+request is created, updated or deleted, so in-process derived state
+(result caches, indexes) can stay in step with the data without each
+route having to remember to update it.
+"""
+from typing import Callable
+
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# listener(event, request_id, record, store); record is None for DELETED and
+# store identifies the backing store (database URL or data file path)
+LeaveRequestListener = Callable[[str, str, dict | None, str | None], None]
+
+_listeners: list[LeaveRequestListener] = []
+
+
+def add_leave_request_listener(listener: LeaveRequestListener) -> LeaveRequestListener:
+    """
+    Register a listener for leave request changes.
+
+    Returns the listener, so this can be used as a decorator.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def remove_leave_request_listener(listener: LeaveRequestListener):
+    """Unregister a listener (no-op if it isn't registered)."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def notify_leave_request_changed(
+    event: str,
+    request_id: str,
+    record: dict | None = None,
+    store: str | None = None
+):
+    """
+    Tell every listener that a leave request changed.
+
+    Args:
+        event: CREATED, UPDATED or DELETED
+        request_id: ID of the leave request
+        record: The stored record after the change (None for DELETED)
+        store: Identifier of the backing store the change was made in
+    """
+    for listener in list(_listeners):
+        listener(event, request_id, record, store)
@@ -1,10 +1,212 @@
 # Written by Claude Code on 2026-01-29
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
+import heapq
 import json
 import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
+
+from ..config import settings
+from ..models.timeline_event import EventType
+from ..services.compliance_checker import AT_RISK_WINDOW_DAYS, ComplianceChecker
+from ..services.alerts_engine import AlertsEngine
+from ..utils.deadline_fields import deadline_fields
+from ..services.deadline_index import DeadlineIndex, DueEvent, get_deadline_index
+from . import hooks, outbox
+from .dedup import skip_duplicates
+from .file_utils import atomic_write, file_lock, fsync_directory
+from .pagination import decode_cursor
+
+
+# Parsed file contents shared by every JSONStorage instance in this process.
+# get_storage() builds a new JSONStorage per request, so the cache has to live
+# at module level to survive between requests. Keyed by resolved file path.
+_file_cache: dict[Path, "_IndexedRecords"] = {}
+_cache_lock = threading.RLock()
+
+# Snapshot files with a background compaction currently running
+_compacting: set[Path] = set()
+
+
+def _copy_record(value: Any) -> Any:
+    """
+    Deep copy of a JSON-shaped record.
+
+    Dicts and lists are copied at every level; other values are immutable
+    scalars and shared. Much cheaper than copy.deepcopy on these records.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_record(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_record(item) for item in value]
+    return value
+
+
+class _IndexedRecords:
+    """
+    Parsed records of one JSON data file, indexed for O(1) lookups.
+
+    Records are indexed by ``id``, by ``request_id`` and by ``dedup_key``
+    (only notifications carry the latter two). ``signature`` identifies the file state the records
+    were parsed from, so changes made by another process are picked up.
+    """
+
+    def __init__(self, records: list[dict], signature: tuple | None):
+        self.records = records
+        self.signature = signature
+        self.by_id: dict[str, dict] = {}
+        self.by_request_id: dict[str, list[dict]] = {}
+        self.by_dedup_key: dict[str, dict] = {}
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild the indexes from the record list."""
+        self.by_id = {}
+        self.by_request_id = {}
+        self.by_dedup_key = {}
+        for record in self.records:
+            self._index(record)
+
+    def append(self, record: dict):
+        """Add a record to the list and the indexes."""
+        self.records.append(record)
+        self._index(record)
+
+    def replay(self, entries: list[dict]):
+        """
+        Apply journal entries on top of the snapshot records.
+
+        A ``put`` replaces the record with the same id in place (or appends
+        it), a ``delete`` removes it. Both are idempotent, so replaying an
+        entry that is already folded into the snapshot is harmless.
+        """
+        if not entries:
+            return
+
+        by_id: dict[str, dict] = {}
+        for record in self.records:
+            by_id.setdefault(record.get("id"), record)
+
+        for entry in entries:
+            if entry.get("op") == "put":
+                record = entry["record"]
+                by_id[record.get("id")] = record
+            elif entry.get("op") == "delete":
+                by_id.pop(entry.get("id"), None)
+
+        self.records = list(by_id.values())
+        self.reindex()
+
+    def _index(self, record: dict):
+        # First record wins on duplicate ids, matching a linear scan
+        self.by_id.setdefault(record.get("id"), record)
+        request_id = record.get("request_id")
+        if request_id is not None:
+            self.by_request_id.setdefault(request_id, []).append(record)
+        dedup_key = record.get("dedup_key")
+        if dedup_key is not None:
+            self.by_dedup_key.setdefault(dedup_key, record)
+
+
+def _select_notifications(
+    records: Iterator[dict],
+    notification_ids: list[str] | None = None,
+    request_id: str | None = None,
+    notification_type: str | None = None,
+    read_status: bool | None = None
+) -> list[dict]:
+    """
+    Pick the notifications a bulk operation applies to.
+
+    Every given criterion must match; None means "any". Callers may pass a
+    pre-narrowed candidate list (e.g. one request's notifications).
+    """
+    ids = set(notification_ids) if notification_ids is not None else None
+    notification_type = getattr(notification_type, "value", notification_type)
+    return [
+        n for n in records
+        if (ids is None or n.get("id") in ids)
+        and (request_id is None or n.get("request_id") == request_id)
+        and (notification_type is None or n.get("type") == notification_type)
+        and (read_status is None or n.get("read_status", False) == read_status)
+    ]
+
+
+def _matches_deadline_filters(
+    record: dict,
+    at_risk_as_of: date | None,
+    deadline_before: date | None
+) -> bool:
+    """In-memory counterpart of DBStorage's deadline-column filters."""
+    fields = deadline_fields(record)
+    deadline = fields["certification_deadline"]
+    if deadline is None:
+        # No notice date: excluded from range filters; the at-risk test
+        # reduces to the leave start, as in DBStorage
+        if deadline_before is not None or fields["leave_start_date"] is None:
+            return False
+        deadline = fields["leave_start_date"]
+    elif deadline_before is not None and not deadline < deadline_before:
+        return False
+    if at_risk_as_of is not None:
+        return ComplianceChecker.is_at_risk(deadline, fields["certification_complete"], at_risk_as_of)
+    return True
+
+
+def _filter_and_sort(
+    records: Iterator[dict],
+    filters: dict,
+    order_by: str | None,
+    limit: int | None,
+    cursor: str | None = None
+) -> Iterable[dict]:
+    """
+    In-memory counterpart of DBStorage's SQL filtering and ordering.
+
+    ``filters`` maps field names to required values; ``order_by`` is
+    "created_at" or "-created_at" with ``id`` as tie-breaker. With a
+    ``cursor`` only records after it are kept. A limited query keeps a
+    heap of ``limit`` records instead of sorting everything.
+
+    Without ``order_by`` the result is a lazy iterator over ``records``;
+    ordered results are lists. Invalid arguments raise immediately either way.
+    """
+    matching = (
+        r for r in records
+        if all(r.get(field) == value for field, value in filters.items())
+    )
+
+    if order_by is None:
+        if cursor is not None:
+            raise ValueError("cursor requires order_by")
+        return islice(matching, limit)
+
+    field = order_by.lstrip("-")
+    if field != "created_at":
+        raise ValueError(f"Unsupported order_by: {order_by}")
+    descending = order_by.startswith("-")
+
+    def sort_key(record: dict) -> tuple[str, str]:
+        return (str(record.get(field)), str(record.get("id")))
+
+    if cursor is not None:
+        last_key = decode_cursor(cursor)
+        if descending:
+            matching = (r for r in matching if sort_key(r) < last_key)
+        else:
+            matching = (r for r in matching if sort_key(r) > last_key)
+
+    if limit is not None:
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(limit, matching, key=sort_key)
+    return sorted(matching, key=sort_key, reverse=descending)
 
 
 class JSONStorage:
@@ -12,32 +214,65 @@ class JSONStorage:
     Simple file-based JSON storage for prototype.
 
     Stores leave requests and notifications in JSON files.
+
+    Parsed files are kept in memory and indexed by ``id`` and ``request_id``.
+    A file is only re-parsed when its inode, mtime or size changes, so
+    repeated reads and id lookups skip JSON parsing entirely. Records are
+    deep-copied on the way in and out, so callers may modify them (nested
+    dicts included) freely.
+
+    In journaled mode, writes append one small record to a ``.journal`` file
+    next to the data file instead of rewriting it. The journal is replayed
+    on load and folded into the snapshot by a background thread once it
+    grows past ``compact_threshold`` bytes.
+
+    Files are safe to share between processes (e.g. several uvicorn
+    workers): snapshots are replaced with an atomic rename, and every
+    read-modify-write cycle holds an advisory lock on the file.
     """
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        journal: bool | None = None,
+        compact_threshold: int | None = None
+    ):
         """
         Initialize storage with data directory.
 
         Args:
             data_dir: Directory to store JSON files (relative to backend root)
+            journal: Append writes to a journal (defaults to JSON_STORAGE_JOURNAL)
+            compact_threshold: Journal size in bytes that triggers compaction
+                (defaults to JSON_JOURNAL_COMPACT_BYTES)
         """
         # Get the backend directory (parent of app)
         backend_dir = Path(__file__).parent.parent.parent
-        self.data_dir = backend_dir / data_dir
+        self.data_dir = (backend_dir / data_dir).resolve()
         self.data_dir.mkdir(exist_ok=True)
 
         self.leave_requests_file = self.data_dir / "leave_requests.json"
         self.notifications_file = self.data_dir / "notifications.json"
+        self.outbox_file = self.data_dir / "notification_outbox.json"
+
+        self.journal = settings.JSON_STORAGE_JOURNAL if journal is None else journal
+        self.compact_threshold = (
+            settings.JSON_JOURNAL_COMPACT_BYTES if compact_threshold is None
+            else compact_threshold
+        )
 
-        # Initialize files if they don't exist
+        # Initialize files if they don't exist (the outbox is created by
+        # its first write, so it only appears with delivery enabled)
         self._init_file(self.leave_requests_file, [])
         self._init_file(self.notifications_file, [])
 
     def _init_file(self, filepath: Path, default_data: Any):
         """Initialize a JSON file with default data if it doesn't exist."""
-        if not filepath.exists():
-            with open(filepath, 'w') as f:
-                json.dump(default_data, f, indent=2, default=str)
+        if filepath.exists():
+            return
+        with file_lock(filepath):
+            if not filepath.exists():
+                self._write_json(filepath, default_data)
 
     def _read_json(self, filepath: Path) -> Any:
         """Read JSON data from file."""
@@ -49,98 +284,559 @@ class JSONStorage:
             return []
 
     def _write_json(self, filepath: Path, data: Any):
-        """Write JSON data to file."""
-        with open(filepath, 'w') as f:
+        """Write JSON data to file atomically (temp file + rename)."""
+        with atomic_write(filepath) as f:
             json.dump(data, f, indent=2, default=str)
 
+    def _journal_path(self, filepath: Path) -> Path:
+        """Path of the journal file kept next to a data file."""
+        return filepath.with_suffix(".journal")
+
+    def _read_journal(self, journal_path: Path) -> list[dict]:
+        """
+        Read journal entries, one JSON object per line.
+
+        A torn last line (from a crash mid-append) is ignored.
+        """
+        entries = []
+        try:
+            with open(journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _complete_length(self, f) -> int:
+        """Length of an open journal up to and including its last newline."""
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return start + newline + 1
+            position = start
+        return 0
+
+    def _append_journal(self, filepath: Path, entry: _IndexedRecords, changes: list[dict]):
+        """
+        Append changes to a file's journal and compact it if it got large.
+
+        A torn line left by a crashed writer is truncated first so the new
+        lines don't get glued onto it.
+        """
+        journal_path = self._journal_path(filepath)
+        try:
+            with open(journal_path, 'a+b') as f:
+                f.truncate(self._complete_length(f))
+                f.write("".join(json.dumps(change, default=str) + "\n" for change in changes).encode())
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            _file_cache.pop(filepath, None)
+            raise
+        entry.signature = self._signature(filepath)
+
+        if entry.signature[1] and entry.signature[1][2] >= self.compact_threshold:
+            self._schedule_compaction(filepath)
+
+    def _file_signature(self, filepath: Path) -> tuple | None:
+        """Return (inode, mtime_ns, size) for a file, or None if it is missing."""
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _signature(self, filepath: Path) -> tuple:
+        """Combined signature of a data file and its journal."""
+        return (
+            self._file_signature(filepath),
+            self._file_signature(self._journal_path(filepath)),
+        )
+
+    def _load(self, filepath: Path) -> _IndexedRecords:
+        """
+        Get the indexed records for a file, re-parsing only if it changed.
+
+        Any journal next to the file is replayed on top of the snapshot,
+        even when journaling is switched off, so no write is ever lost.
+        Parsing happens under a shared file lock so the snapshot and journal
+        are read as a consistent pair. Must be called with ``_cache_lock`` held.
+        """
+        cached = _file_cache.get(filepath)
+        if cached is not None and cached.signature == self._signature(filepath):
+            return cached
+
+        with file_lock(filepath, exclusive=False):
+            signature = self._signature(filepath)
+            entry = _IndexedRecords(self._read_json(filepath), signature)
+            entry.replay(self._read_journal(self._journal_path(filepath)))
+        _file_cache[filepath] = entry
+        return entry
+
+    @contextmanager
+    def _locked(self, filepath: Path) -> Iterator[_IndexedRecords]:
+        """
+        Run a read-modify-write cycle on a file.
+
+        Holds the process-wide cache lock and an exclusive advisory file
+        lock, and yields records that are current as of taking the lock.
+        """
+        with _cache_lock, file_lock(filepath):
+            yield self._load(filepath)
+
+    def _save(self, filepath: Path, entry: _IndexedRecords):
+        """
+        Write cached records back to their file and record the new signature.
+
+        The snapshot then contains everything, so any journal is removed.
+        If the write fails the cache entry is dropped, so the next read
+        re-parses whatever actually reached the disk.
+        """
+        try:
+            self._write_json(filepath, entry.records)
+            self._journal_path(filepath).unlink(missing_ok=True)
+        except BaseException:
+            _file_cache.pop(filepath, None)
+            raise
+        entry.signature = self._signature(filepath)
+
+    def _put(
+        self,
+        filepath: Path,
+        entry: _IndexedRecords,
+        *records: dict,
+        renamed_from: str | None = None
+    ):
+        """
+        Persist created or updated records with one journal append or file write.
+
+        ``renamed_from`` is the previous id of a record whose id was changed;
+        its removal is journaled in the same append, ahead of the new version.
+        """
+        if self.journal:
+            changes = [{"op": "delete", "id": renamed_from}] if renamed_from is not None else []
+            self._append_journal(
+                filepath, entry, changes + [{"op": "put", "record": record} for record in records]
+            )
+        else:
+            self._save(filepath, entry)
+
+    def _delete(self, filepath: Path, entry: _IndexedRecords, *record_ids: str):
+        """Persist the removal of records with one journal append or file write."""
+        if self.journal:
+            self._append_journal(
+                filepath, entry, [{"op": "delete", "id": record_id} for record_id in record_ids]
+            )
+        else:
+            self._save(filepath, entry)
+
+    # Journal compaction
+
+    def _schedule_compaction(self, filepath: Path):
+        """Start a background compaction for a file unless one is running."""
+        if filepath in _compacting:
+            return
+        _compacting.add(filepath)
+        threading.Thread(
+            target=self._compact_file,
+            args=(filepath,),
+            name=f"compact-{filepath.name}",
+            daemon=True
+        ).start()
+
+    def _compact_file(self, filepath: Path):
+        """
+        Fold a file's journal into a new snapshot.
+
+        The snapshot is serialized outside the cache lock from a copy of the
+        records. Journal entries appended meanwhile are carried over into a
+        fresh journal when the new snapshot is swapped in.
+        """
+        journal_path = self._journal_path(filepath)
+        snapshot_tmp = None
+        try:
+            with _cache_lock:
+                entry = self._load(filepath)
+                records = [dict(record) for record in entry.records]
+                snapshot_sig, journal_sig = entry.signature
+
+            if journal_sig is None:
+                return
+            folded_bytes = journal_sig[2]
+
+            fd, snapshot_tmp = tempfile.mkstemp(
+                dir=filepath.parent,
+                prefix=f".{filepath.name}.",
+                suffix=".compact"
+            )
+            with os.fdopen(fd, 'w') as f:
+                json.dump(records, f, indent=2, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._locked(filepath) as entry:
+                current_snapshot, current_journal = entry.signature
+                if (
+                    current_snapshot != snapshot_sig
+                    or current_journal is None
+                    or current_journal[0] != journal_sig[0]
+                    or current_journal[2] < folded_bytes
+                ):
+                    # Files were rewritten meanwhile; the fold is stale
+                    return
+
+                with open(journal_path, 'rb') as f:
+                    f.seek(folded_bytes)
+                    tail = f.read()
+
+                os.replace(snapshot_tmp, filepath)
+                snapshot_tmp = None
+                # The rename must be durable before the journal goes away
+                fsync_directory(filepath.parent)
+                if tail:
+                    with atomic_write(journal_path, 'wb') as f:
+                        f.write(tail)
+                else:
+                    journal_path.unlink(missing_ok=True)
+                entry.signature = self._signature(filepath)
+        finally:
+            if snapshot_tmp is not None:
+                Path(snapshot_tmp).unlink(missing_ok=True)
+            _compacting.discard(filepath)
+
+    def compact(self):
+        """Synchronously fold both journals into their snapshots."""
+        self._compact_file(self.leave_requests_file)
+        self._compact_file(self.notifications_file)
+
     # Leave Request Operations
 
     def get_all_leave_requests(self) -> list[dict]:
         """Get all leave requests."""
-        return self._read_json(self.leave_requests_file)
+        with _cache_lock:
+            entry = self._load(self.leave_requests_file)
+            return [_copy_record(req) for req in entry.records]
+
+    def iter_leave_requests(self) -> Iterator[dict]:
+        """Iterate over all leave requests without building a list of copies."""
+        with _cache_lock:
+            records = list(self._load(self.leave_requests_file).records)
+        for req in records:
+            yield _copy_record(req)
+
+    def query_leave_requests(
+        self,
+        status: str | None = None,
+        at_risk_as_of: date | None = None,
+        deadline_before: date | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> list[dict]:
+        """Get leave requests matching filters (see DBStorage.query_leave_requests)."""
+        return list(self._query_leave_requests(
+            status, at_risk_as_of, deadline_before, order_by, limit, cursor
+        ))
+
+    def stream_leave_requests(
+        self,
+        status: str | None = None,
+        at_risk_as_of: date | None = None,
+        deadline_before: date | None = None,
+        order_by: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Like query_leave_requests, but yields records one at a time (see
+        DBStorage.stream_leave_requests). Unordered results are produced
+        lazily from iter_leave_requests.
+        """
+        return iter(self._query_leave_requests(status, at_risk_as_of, deadline_before, order_by))
+
+    def _query_leave_requests(
+        self,
+        status: str | None,
+        at_risk_as_of: date | None,
+        deadline_before: date | None,
+        order_by: str | None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> Iterable[dict]:
+        filters = {}
+        if status is not None:
+            filters["status"] = getattr(status, "value", status)
+
+        records = self.iter_leave_requests()
+        if at_risk_as_of is not None or deadline_before is not None:
+            records = (
+                r for r in records
+                if _matches_deadline_filters(r, at_risk_as_of, deadline_before)
+            )
+        return _filter_and_sort(records, filters, order_by, limit, cursor)
+
+    def refresh_compliance_snapshots(self, as_of: date | None = None) -> int:
+        """JSON storage keeps no compliance snapshot; nothing to refresh."""
+        return 0
+
+    def get_compliance_alerts(self, as_of: date | None = None) -> list[dict]:
+        """
+        Get alerts for all at-risk leave requests on ``as_of`` (see DBStorage).
+
+        JSON storage has no snapshot table; alerts are computed on each call
+        for the requests the deadline index says can be at risk (deadline
+        within AT_RISK_WINDOW_DAYS of ``as_of`` or already past, or no
+        notice date).
+        """
+        as_of = as_of or date.today()
+        index = self.deadline_index()
+        horizon = as_of + timedelta(days=AT_RISK_WINDOW_DAYS)
+        candidates = {
+            event.request_id
+            for event in index.due_between(None, horizon, [EventType.CERTIFICATION_DEADLINE])
+        }
+        candidates |= index.floating_ids
+        return AlertsEngine().compute_alerts(
+            self.get_leave_requests_by_ids(sorted(candidates)), as_of
+        )
+
+    # Deadline index
+
+    @property
+    def store_key(self) -> str:
+        """Identifies this store in change hooks."""
+        return str(self.leave_requests_file)
+
+    def _leave_requests_generation(self) -> object:
+        """Token that changes when the leave requests are reloaded from disk."""
+        with _cache_lock:
+            return self._load(self.leave_requests_file)
+
+    def deadline_index(self) -> DeadlineIndex:
+        """
+        Deadline index over this store's leave requests.
+
+        Built on first use and kept current by the change hooks; rebuilt
+        when another process changes the file.
+        """
+        return get_deadline_index(
+            self.store_key, self._leave_requests_generation(), self.iter_leave_requests
+        )
+
+    def due_between(
+        self,
+        start: date | None,
+        end: date,
+        event_types: list[str] | None = None
+    ) -> list[DueEvent]:
+        """
+        Deadline events from ``start`` through ``end`` (see DeadlineIndex.due_between).
+        """
+        return self.deadline_index().due_between(start, end, event_types)
 
     def get_leave_request_by_id(self, request_id: str) -> dict | None:
         """Get a specific leave request by ID."""
-        requests = self.get_all_leave_requests()
-        for req in requests:
-            if req.get("id") == request_id:
-                return req
-        return None
+        with _cache_lock:
+            req = self._load(self.leave_requests_file).by_id.get(request_id)
+            return _copy_record(req) if req is not None else None
+
+    def get_leave_requests_by_ids(self, request_ids: list[str]) -> list[dict]:
+        """Get leave requests by ID, in the given order; unknown IDs are skipped."""
+        with _cache_lock:
+            by_id = self._load(self.leave_requests_file).by_id
+            return [_copy_record(by_id[i]) for i in request_ids if i in by_id]
 
     def create_leave_request(self, request_data: dict) -> dict:
         """Create a new leave request."""
-        requests = self.get_all_leave_requests()
-        requests.append(request_data)
-        self._write_json(self.leave_requests_file, requests)
-        return request_data
+        with self._locked(self.leave_requests_file) as entry:
+            record = _copy_record(request_data)
+            entry.append(record)
+            self._put(self.leave_requests_file, entry, record)
+            created = _copy_record(record)
+        hooks.notify_leave_request_changed(
+            hooks.CREATED, created["id"], _copy_record(created), self.store_key
+        )
+        return created
 
     def update_leave_request(self, request_id: str, updates: dict) -> dict | None:
         """Update an existing leave request."""
-        requests = self.get_all_leave_requests()
-        for i, req in enumerate(requests):
-            if req.get("id") == request_id:
-                requests[i].update(updates)
-                self._write_json(self.leave_requests_file, requests)
-                return requests[i]
-        return None
+        with self._locked(self.leave_requests_file) as entry:
+            req = entry.by_id.get(request_id)
+            if req is None:
+                return None
+
+            req.update(_copy_record(updates))
+            renamed_from = request_id if req.get("id") != request_id else None
+            if "id" in updates:
+                entry.reindex()
+            self._put(self.leave_requests_file, entry, req, renamed_from=renamed_from)
+            updated = _copy_record(req)
+        hooks.notify_leave_request_changed(hooks.UPDATED, request_id, updated, self.store_key)
+        return updated
 
     def delete_leave_request(self, request_id: str) -> bool:
         """Delete a leave request."""
-        requests = self.get_all_leave_requests()
-        original_len = len(requests)
-        requests = [req for req in requests if req.get("id") != request_id]
+        with self._locked(self.leave_requests_file) as entry:
+            if request_id not in entry.by_id:
+                return False
 
-        if len(requests) < original_len:
-            self._write_json(self.leave_requests_file, requests)
-            return True
-        return False
+            entry.records = [req for req in entry.records if req.get("id") != request_id]
+            entry.reindex()
+            self._delete(self.leave_requests_file, entry, request_id)
+        hooks.notify_leave_request_changed(hooks.DELETED, request_id, store=self.store_key)
+        return True
 
     # Notification Operations
 
     def get_all_notifications(self) -> list[dict]:
         """Get all notifications."""
-        return self._read_json(self.notifications_file)
+        with _cache_lock:
+            entry = self._load(self.notifications_file)
+            return [_copy_record(n) for n in entry.records]
+
+    def iter_notifications(self) -> Iterator[dict]:
+        """Iterate over all notifications without building a list of copies."""
+        with _cache_lock:
+            records = list(self._load(self.notifications_file).records)
+        for notif in records:
+            yield _copy_record(notif)
 
     def get_notifications_by_request_id(self, request_id: str) -> list[dict]:
         """Get all notifications for a specific leave request."""
-        notifications = self.get_all_notifications()
-        return [n for n in notifications if n.get("request_id") == request_id]
+        with _cache_lock:
+            entry = self._load(self.notifications_file)
+            return [_copy_record(n) for n in entry.by_request_id.get(request_id, [])]
+
+    def query_notifications(
+        self,
+        request_id: str | None = None,
+        notification_type: str | None = None,
+        unread_only: bool = False,
+        order_by: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> list[dict]:
+        """Get notifications matching filters (see DBStorage.query_notifications)."""
+        return list(self._query_notifications(
+            request_id, notification_type, unread_only, order_by, limit, cursor
+        ))
+
+    def stream_notifications(
+        self,
+        request_id: str | None = None,
+        notification_type: str | None = None,
+        unread_only: bool = False,
+        order_by: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Like query_notifications, but yields records one at a time (see
+        DBStorage.stream_notifications).
+        """
+        return iter(self._query_notifications(request_id, notification_type, unread_only, order_by))
+
+    def _query_notifications(
+        self,
+        request_id: str | None,
+        notification_type: str | None,
+        unread_only: bool,
+        order_by: str | None,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> Iterable[dict]:
+        filters = {}
+        if notification_type is not None:
+            filters["type"] = getattr(notification_type, "value", notification_type)
+        if unread_only:
+            filters["read_status"] = False
+
+        if request_id is not None:
+            records = iter(self.get_notifications_by_request_id(request_id))
+        else:
+            records = self.iter_notifications()
+        return _filter_and_sort(records, filters, order_by, limit, cursor)
 
     def get_notification_by_id(self, notification_id: str) -> dict | None:
         """Get a specific notification by ID."""
-        notifications = self.get_all_notifications()
-        for notif in notifications:
-            if notif.get("id") == notification_id:
-                return notif
-        return None
+        with _cache_lock:
+            notif = self._load(self.notifications_file).by_id.get(notification_id)
+            return _copy_record(notif) if notif is not None else None
+
+    def get_notification_by_dedup_key(self, dedup_key: str) -> dict | None:
+        """Get the notification stored under a dedup key."""
+        with _cache_lock:
+            notif = self._load(self.notifications_file).by_dedup_key.get(dedup_key)
+            return _copy_record(notif) if notif is not None else None
+
+    def get_existing_dedup_keys(self, dedup_keys: list[str]) -> set[str]:
+        """Find which dedup keys already have a notification."""
+        with _cache_lock:
+            stored = self._load(self.notifications_file).by_dedup_key
+            return {key for key in dedup_keys if key in stored}
+
+    def get_notifications_by_ids(self, notification_ids: list[str]) -> list[dict]:
+        """Get notifications by ID, in the given order; unknown IDs are skipped."""
+        with _cache_lock:
+            by_id = self._load(self.notifications_file).by_id
+            return [_copy_record(by_id[i]) for i in notification_ids if i in by_id]
 
     def create_notification(self, notification_data: dict) -> dict:
-        """Create a new notification."""
-        notifications = self.get_all_notifications()
-        notifications.append(notification_data)
-        self._write_json(self.notifications_file, notifications)
-        return notification_data
+        """Create a new notification, or return the one stored under its dedup key."""
+        with self._locked(self.notifications_file) as entry:
+            existing = entry.by_dedup_key.get(notification_data.get("dedup_key"))
+            if existing is not None:
+                return _copy_record(existing)
+            record = _copy_record(notification_data)
+            self._enqueue_outbox([record["id"]])
+            entry.append(record)
+            self._put(self.notifications_file, entry, record)
+            return _copy_record(record)
+
+    def create_notifications(self, notifications: list[dict]) -> int:
+        """
+        Create many notifications with one file write or journal append.
+
+        Notifications whose dedup key is already stored are skipped.
+        """
+        with self._locked(self.notifications_file) as entry:
+            records = [_copy_record(n) for n in skip_duplicates(notifications, entry.by_dedup_key)]
+            if not records:
+                return 0
+            self._enqueue_outbox([record["id"] for record in records])
+            for record in records:
+                entry.append(record)
+            self._put(self.notifications_file, entry, *records)
+        return len(records)
 
     def update_notification(self, notification_id: str, updates: dict) -> dict | None:
         """Update an existing notification."""
-        notifications = self.get_all_notifications()
-        for i, notif in enumerate(notifications):
-            if notif.get("id") == notification_id:
-                notifications[i].update(updates)
-                self._write_json(self.notifications_file, notifications)
-                return notifications[i]
-        return None
+        with self._locked(self.notifications_file) as entry:
+            notif = entry.by_id.get(notification_id)
+            if notif is None:
+                return None
+
+            notif.update(_copy_record(updates))
+            renamed_from = notification_id if notif.get("id") != notification_id else None
+            if "id" in updates or "request_id" in updates or "dedup_key" in updates:
+                entry.reindex()
+            self._put(self.notifications_file, entry, notif, renamed_from=renamed_from)
+            return _copy_record(notif)
 
     def delete_notification(self, notification_id: str) -> bool:
         """Delete a notification."""
-        notifications = self.get_all_notifications()
-        original_len = len(notifications)
-        notifications = [n for n in notifications if n.get("id") != notification_id]
+        with self._locked(self.notifications_file) as entry:
+            if notification_id not in entry.by_id:
+                return False
 
-        if len(notifications) < original_len:
-            self._write_json(self.notifications_file, notifications)
+            entry.records = [n for n in entry.records if n.get("id") != notification_id]
+            entry.reindex()
+            self._delete(self.notifications_file, entry, notification_id)
             return True
-        return False
 
     def mark_notification_as_read(self, notification_id: str) -> dict | None:
         """Mark a notification as read."""
@@ -149,3 +845,194 @@ class JSONStorage:
     def mark_notification_as_unread(self, notification_id: str) -> dict | None:
         """Mark a notification as unread."""
         return self.update_notification(notification_id, {"read_status": False})
+
+    def _bulk_candidates(
+        self,
+        entry: _IndexedRecords,
+        notification_ids: list[str] | None,
+        request_id: str | None
+    ) -> list[dict]:
+        """Narrow a bulk selection using the id and request_id indexes."""
+        if notification_ids is not None:
+            return [entry.by_id[i] for i in dict.fromkeys(notification_ids) if i in entry.by_id]
+        if request_id is not None:
+            return entry.by_request_id.get(request_id, [])
+        return entry.records
+
+    def set_notifications_read_status(
+        self,
+        read_status: bool,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: str | None = None
+    ) -> int:
+        """Set read status on many notifications in one write (see DBStorage)."""
+        with self._locked(self.notifications_file) as entry:
+            changed = _select_notifications(
+                self._bulk_candidates(entry, notification_ids, request_id),
+                notification_ids, request_id, notification_type,
+                read_status=not read_status
+            )
+            for notif in changed:
+                notif["read_status"] = read_status
+            if changed:
+                self._put(self.notifications_file, entry, *changed)
+            return len(changed)
+
+    def mark_notifications_as_read(self, **selection) -> int:
+        """Mark every selected notification as read."""
+        return self.set_notifications_read_status(True, **selection)
+
+    def mark_notifications_as_unread(self, **selection) -> int:
+        """Mark every selected notification as unread."""
+        return self.set_notifications_read_status(False, **selection)
+
+    def delete_notifications(
+        self,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: str | None = None,
+        read_only: bool = False
+    ) -> int:
+        """Delete many notifications in one write (see DBStorage)."""
+        with self._locked(self.notifications_file) as entry:
+            doomed = _select_notifications(
+                self._bulk_candidates(entry, notification_ids, request_id),
+                notification_ids, request_id, notification_type,
+                read_status=True if read_only else None
+            )
+            if not doomed:
+                return 0
+
+            doomed_ids = {n.get("id") for n in doomed}
+            entry.records = [n for n in entry.records if n.get("id") not in doomed_ids]
+            entry.reindex()
+            self._delete(self.notifications_file, entry, *doomed_ids)
+            return len(doomed_ids)
+
+    # Outbox Operations
+    #
+    # The outbox is its own JSON file (journaled like the others). Creating
+    # a notification queues its outbox entry first and then stores the
+    # notification, both under the notifications lock: a crash in between
+    # leaves an entry without a notification, never a notification that is
+    # not delivered. Locks are always taken notifications first, then
+    # outbox, so writers and claimers can't deadlock. An entry whose
+    # notification is gone is dropped when claimed.
+
+    def _enqueue_outbox(self, notification_ids: list[str]):
+        """
+        Queue notifications for delivery (if enabled).
+
+        Called with the notifications lock held, before the notifications
+        themselves are stored.
+        """
+        if not notification_ids or not outbox.outbox_enabled():
+            return
+        with self._locked(self.outbox_file) as entry:
+            queued = [outbox.new_outbox_entry(i) for i in notification_ids if i not in entry.by_id]
+            for record in queued:
+                entry.append(record)
+            if queued:
+                self._put(self.outbox_file, entry, *queued)
+
+    def claim_outbox(
+        self,
+        limit: int,
+        lease_seconds: float,
+        now: datetime | None = None
+    ) -> list[dict]:
+        """Claim outbox entries that are due for delivery (see DBStorage)."""
+        now = now or datetime.now()
+        lease_until = (now + timedelta(seconds=lease_seconds)).isoformat()
+        token = uuid.uuid4().hex
+        with self._locked(self.outbox_file) as entry:
+            due = heapq.nsmallest(
+                limit,
+                (
+                    e for e in entry.records
+                    if e["status"] in outbox.CLAIMABLE
+                    and datetime.fromisoformat(e["available_at"]) <= now
+                ),
+                key=lambda e: datetime.fromisoformat(e["available_at"])
+            )
+            for record in due:
+                record.update(
+                    status=outbox.SENDING,
+                    attempts=record["attempts"] + 1,
+                    claim_token=token,
+                    available_at=lease_until
+                )
+            if due:
+                self._put(self.outbox_file, entry, *due)
+            claimed = [dict(record) for record in due]
+
+        with self._notifications_settled():
+            notifications = {n["id"]: n for n in self.get_notifications_by_ids([e["id"] for e in claimed])}
+        orphans = [e["id"] for e in claimed if e["id"] not in notifications]
+        if orphans:
+            self.complete_outbox(orphans, claim_token=token)
+        claimed = [dict(e, notification=notifications[e["id"]]) for e in claimed if e["id"] in notifications]
+        return sorted(claimed, key=lambda e: (datetime.fromisoformat(e["created_at"]), e["id"]))
+
+    @contextmanager
+    def _notifications_settled(self) -> Iterator[None]:
+        """
+        Wait for notification writes in progress, and hold off new ones.
+
+        A claimed entry may belong to a notification that is still being
+        stored; it must not be mistaken for an orphan.
+        """
+        with _cache_lock, file_lock(self.notifications_file, exclusive=False):
+            yield
+
+    def complete_outbox(self, notification_ids: list[str], claim_token: str | None = None) -> int:
+        """Remove delivered entries from the outbox (see DBStorage)."""
+        with self._locked(self.outbox_file) as entry:
+            done = {
+                i for i in notification_ids
+                if i in entry.by_id and claim_token in (None, entry.by_id[i]["claim_token"])
+            }
+            if not done:
+                return 0
+            entry.records = [e for e in entry.records if e["id"] not in done]
+            entry.reindex()
+            self._delete(self.outbox_file, entry, *done)
+            return len(done)
+
+    def retry_outbox(
+        self,
+        notification_id: str,
+        error: str,
+        available_at: datetime | None,
+        claim_token: str | None = None
+    ) -> bool:
+        """Record a failed delivery attempt (see DBStorage)."""
+        with self._locked(self.outbox_file) as entry:
+            record = entry.by_id.get(notification_id)
+            if record is None or claim_token not in (None, record["claim_token"]):
+                return False
+            record.update(last_error=error, claim_token=None)
+            if available_at is None:
+                record["status"] = outbox.FAILED
+            else:
+                record.update(status=outbox.PENDING, available_at=available_at.isoformat())
+            self._put(self.outbox_file, entry, record)
+            return True
+
+    def outbox_stats(self, now: datetime | None = None) -> dict:
+        """Outbox depth by status (see DBStorage)."""
+        now = now or datetime.now()
+        with _cache_lock:
+            records = list(self._load(self.outbox_file).records)
+        stats = {outbox.PENDING: 0, outbox.SENDING: 0, outbox.FAILED: 0}
+        ready = 0
+        oldest = None
+        for record in records:
+            stats[record["status"]] += 1
+            if record["status"] == outbox.PENDING and datetime.fromisoformat(record["available_at"]) <= now:
+                ready += 1
+            if record["status"] in outbox.CLAIMABLE:
+                created = datetime.fromisoformat(record["created_at"])
+                oldest = created if oldest is None else min(oldest, created)
+        return dict(stats, ready=ready, oldest_pending_at=oldest.isoformat() if oldest else None)
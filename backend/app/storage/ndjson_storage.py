@@ -0,0 +1,555 @@
+"""
+NDJSON file storage with a memory-mapped byte-offset index.
+
+Stores one JSON record per line. A sidecar ``.idx`` file maps each record id
+to the byte offset of its latest line, so single-record lookups mmap the data
+file and decode just that line, and full listings stream records lazily.
+
+Writes only ever append:
+- create appends the record
+- update appends the new version (the index moves to the new line)
+- delete appends a tombstone ``{"id": ..., "_deleted": true}``
+
+Superseded lines and tombstones are dropped by compaction once they
+outnumber the live records.
+"""
+import json
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from . import hooks
+from .dedup import skip_duplicates
+from .file_utils import atomic_write, file_lock
+from .json_storage import JSONStorage, _select_notifications
+
+
+# Indexes shared by every NDJSONStorage instance in this process, keyed by
+# resolved data file path (get_storage() builds a new storage per request)
+_indexes: dict[Path, "_LineIndex"] = {}
+_index_lock = threading.RLock()
+
+INDEX_VERSION = 2
+
+# Rewrite the sidecar once this many bytes of the data file are unindexed
+SIDECAR_FLUSH_BYTES = 256 * 1024
+
+
+class _LineIndex:
+    """
+    Byte-offset index over one NDJSON data file.
+
+    ``offsets`` keeps records in creation order (an update moves the offset
+    but not the position). ``size`` is how many bytes of the data file the
+    index covers; anything past it is scanned and applied on the next access.
+    """
+
+    def __init__(self, inode: int | None = None):
+        self.inode = inode
+        self.size = 0
+        self.offsets: dict[str, int] = {}
+        self.request_of: dict[str, str] = {}
+        self.by_request_id: dict[str, dict[str, None]] = {}
+        self.dedup_key_of: dict[str, str] = {}
+        self.by_dedup_key: dict[str, str] = {}
+        self.dead = 0
+        self.persisted_size = 0
+        self.mm: mmap.mmap | None = None
+        self.mm_size = 0
+        # Bumped whenever lines written by someone else are picked up
+        self.tail_scans = 0
+
+    @classmethod
+    def from_sidecar(cls, data: dict) -> "_LineIndex":
+        """Rebuild an index from its persisted ``.idx`` form."""
+        index = cls(data["inode"])
+        index.size = index.persisted_size = data["size"]
+        index.dead = data["dead"]
+        index.offsets = data["offsets"]
+        for record_id in index.offsets:
+            request_id = data["request_of"].get(record_id)
+            if request_id is not None:
+                index._link(record_id, request_id)
+        for record_id, dedup_key in data["dedup_key_of"].items():
+            index._link_dedup_key(record_id, dedup_key)
+        return index
+
+    def to_sidecar(self) -> dict:
+        """Persisted ``.idx`` form of the index."""
+        return {
+            "version": INDEX_VERSION,
+            "inode": self.inode,
+            "size": self.size,
+            "dead": self.dead,
+            "offsets": self.offsets,
+            "request_of": self.request_of,
+            "dedup_key_of": self.dedup_key_of,
+        }
+
+    def apply(self, record: dict, offset: int):
+        """Account for one line of the data file found at ``offset``."""
+        record_id = record.get("id")
+
+        if record.get("_deleted"):
+            if record_id in self.offsets:
+                del self.offsets[record_id]
+                self._unlink(record_id)
+                self._unlink_dedup_key(record_id)
+                self.dead += 2  # the superseded line and the tombstone
+            else:
+                self.dead += 1
+            return
+
+        if record_id in self.offsets:
+            self.dead += 1
+        self.offsets[record_id] = offset
+
+        request_id = record.get("request_id")
+        if self.request_of.get(record_id) != request_id:
+            self._unlink(record_id)
+            if request_id is not None:
+                self._link(record_id, request_id)
+
+        dedup_key = record.get("dedup_key")
+        if self.dedup_key_of.get(record_id) != dedup_key:
+            self._unlink_dedup_key(record_id)
+            if dedup_key is not None:
+                self._link_dedup_key(record_id, dedup_key)
+
+    def _link(self, record_id: str, request_id: str):
+        self.request_of[record_id] = request_id
+        self.by_request_id.setdefault(request_id, {})[record_id] = None
+
+    def _unlink(self, record_id: str):
+        request_id = self.request_of.pop(record_id, None)
+        if request_id is not None:
+            siblings = self.by_request_id.get(request_id, {})
+            siblings.pop(record_id, None)
+            if not siblings:
+                self.by_request_id.pop(request_id, None)
+
+    def _link_dedup_key(self, record_id: str, dedup_key: str):
+        self.dedup_key_of[record_id] = dedup_key
+        self.by_dedup_key.setdefault(dedup_key, record_id)
+
+    def _unlink_dedup_key(self, record_id: str):
+        dedup_key = self.dedup_key_of.pop(record_id, None)
+        if dedup_key is not None and self.by_dedup_key.get(dedup_key) == record_id:
+            del self.by_dedup_key[dedup_key]
+
+
+class NDJSONStorage(JSONStorage):
+    """
+    JSONStorage variant backed by NDJSON files and a byte-offset index.
+
+    Id lookups decode a single line from a memory-mapped file instead of
+    parsing the whole dataset, and ``iter_*`` stream records one by one.
+    Selected with ``JSON_STORAGE_FORMAT=ndjson``. On first use, existing
+    ``.json`` data is converted to NDJSON.
+    """
+
+    def __init__(self, data_dir: str = "data", compact_min_dead: int = 1000):
+        """
+        Initialize storage with data directory.
+
+        Args:
+            data_dir: Directory to store data files (relative to backend root)
+            compact_min_dead: Minimum number of dead lines before compaction
+        """
+        super().__init__(data_dir, journal=False)
+        self.compact_min_dead = compact_min_dead
+
+        self.leave_requests_ndjson = self.data_dir / "leave_requests.ndjson"
+        self.notifications_ndjson = self.data_dir / "notifications.ndjson"
+
+        self._init_ndjson(self.leave_requests_ndjson, self.leave_requests_file)
+        self._init_ndjson(self.notifications_ndjson, self.notifications_file)
+
+    def _init_ndjson(self, filepath: Path, seed_file: Path):
+        """Create an NDJSON file, seeding it from the legacy JSON file."""
+        if filepath.exists():
+            return
+        with file_lock(filepath):
+            if filepath.exists():
+                return
+            with atomic_write(filepath) as f:
+                for record in self._read_json(seed_file):
+                    f.write(self._encode(record))
+
+    # Index maintenance
+
+    def _encode(self, record: dict) -> str:
+        """Serialize a record as a single NDJSON line."""
+        return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+    def _index_path(self, filepath: Path) -> Path:
+        """Path of the sidecar index for a data file."""
+        return filepath.with_name(filepath.name + ".idx")
+
+    def _read_sidecar(self, filepath: Path, inode: int) -> _LineIndex:
+        """Load the persisted index, or start an empty one if it is unusable."""
+        try:
+            with open(self._index_path(filepath), 'r') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("inode") == inode:
+                return _LineIndex.from_sidecar(data)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        return _LineIndex(inode)
+
+    def _write_sidecar(self, filepath: Path, index: _LineIndex):
+        """Persist the index so cold starts only scan the unindexed tail."""
+        with atomic_write(self._index_path(filepath)) as f:
+            json.dump(index.to_sidecar(), f, separators=(",", ":"))
+        index.persisted_size = index.size
+
+    def _scan_tail(self, filepath: Path, index: _LineIndex):
+        """
+        Apply lines appended past ``index.size``.
+
+        A final line without a newline is a write still in progress (or torn
+        by a crash) and is left for later.
+        """
+        index.tail_scans += 1
+        with open(filepath, 'rb') as f:
+            f.seek(index.size)
+            offset = index.size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if isinstance(record, dict):
+                    index.apply(record, offset)
+                else:
+                    index.dead += 1
+                offset += len(line)
+            index.size = offset
+
+    def _index(self, filepath: Path) -> _LineIndex:
+        """
+        Get the current index for a data file.
+
+        Appends made by other processes are picked up by scanning only the
+        new tail; a replaced file (compaction) reloads the sidecar.
+        """
+        stat = os.stat(filepath)
+        with _index_lock:
+            index = _indexes.get(filepath)
+            if index is None or index.inode != stat.st_ino or stat.st_size < index.size:
+                index = self._read_sidecar(filepath, stat.st_ino)
+                if stat.st_size < index.size:
+                    index = _LineIndex(stat.st_ino)
+                _indexes[filepath] = index
+
+            if stat.st_size > index.size:
+                self._scan_tail(filepath, index)
+                if index.size - index.persisted_size > SIDECAR_FLUSH_BYTES:
+                    self._write_sidecar(filepath, index)
+            return index
+
+    def _map(self, filepath: Path, index: _LineIndex) -> mmap.mmap | None:
+        """Memory-map the part of the data file covered by the index."""
+        if index.size == 0:
+            return None
+        if index.mm is None or index.mm_size < index.size:
+            with open(filepath, 'rb') as f:
+                index.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index.mm_size = len(index.mm)
+        return index.mm
+
+    def _decode_at(self, mm: mmap.mmap, offset: int) -> dict:
+        """Decode the single line starting at ``offset``."""
+        end = mm.find(b"\n", offset)
+        return json.loads(mm[offset:end])
+
+    def _get(self, filepath: Path, record_id: str) -> dict | None:
+        """Look up one record by id."""
+        with _index_lock:
+            index = self._index(filepath)
+            offset = index.offsets.get(record_id)
+            if offset is None:
+                return None
+            return self._decode_at(self._map(filepath, index), offset)
+
+    def _iter(self, filepath: Path, record_ids: list[str] | None = None) -> Iterator[dict]:
+        """
+        Stream records lazily, in creation order.
+
+        The index and mapping are captured up front, so the iteration sees
+        a consistent snapshot even if writes happen meanwhile.
+        """
+        with _index_lock:
+            index = self._index(filepath)
+            if record_ids is None:
+                offsets = list(index.offsets.values())
+            else:
+                offsets = [index.offsets[i] for i in record_ids if i in index.offsets]
+            mm = self._map(filepath, index)
+        for offset in offsets:
+            yield self._decode_at(mm, offset)
+
+    def _append(self, filepath: Path, records: list[dict]):
+        """
+        Append lines to a data file. Caller must hold the file lock.
+
+        A torn line left by a crashed writer is truncated first so the new
+        lines don't get glued onto it.
+        """
+        index = self._index(filepath)
+        with open(filepath, 'r+b') as f:
+            f.truncate(index.size)
+            f.seek(index.size)
+            for record in records:
+                line = self._encode(record).encode()
+                f.write(line)
+                index.apply(record, index.size)
+                index.size += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        live = len(index.offsets)
+        if index.dead > max(live, self.compact_min_dead):
+            self._compact_ndjson(filepath, index)
+        elif index.size - index.persisted_size > SIDECAR_FLUSH_BYTES:
+            self._write_sidecar(filepath, index)
+
+    def _compact_ndjson(self, filepath: Path, index: _LineIndex):
+        """Rewrite a data file with live records only. Caller must hold the file lock."""
+        mm = self._map(filepath, index)
+        with atomic_write(filepath, 'wb') as f:
+            for offset in index.offsets.values():
+                end = mm.find(b"\n", offset)
+                f.write(mm[offset:end + 1])
+
+        with _index_lock:
+            _indexes.pop(filepath, None)
+            fresh = _LineIndex(os.stat(filepath).st_ino)
+            self._scan_tail(filepath, fresh)
+            _indexes[filepath] = fresh
+        self._write_sidecar(filepath, fresh)
+
+    def _update(self, filepath: Path, record_id: str, updates: dict) -> dict | None:
+        """
+        Append a new version of a record with ``updates`` applied.
+
+        If the id changed, a tombstone for the old id goes in the same append.
+        """
+        with _index_lock, file_lock(filepath):
+            record = self._get(filepath, record_id)
+            if record is None:
+                return None
+            record.update(updates)
+            lines = [record]
+            if record.get("id") != record_id:
+                lines.insert(0, {"id": record_id, "_deleted": True})
+            self._append(filepath, lines)
+            return record
+
+    def _remove(self, filepath: Path, record_id: str) -> bool:
+        """Append a tombstone for a record."""
+        with _index_lock, file_lock(filepath):
+            if record_id not in self._index(filepath).offsets:
+                return False
+            self._append(filepath, [{"id": record_id, "_deleted": True}])
+            return True
+
+    def compact(self):
+        """Synchronously drop dead lines from both data files."""
+        for filepath in (self.leave_requests_ndjson, self.notifications_ndjson):
+            with _index_lock, file_lock(filepath):
+                self._compact_ndjson(filepath, self._index(filepath))
+
+    # Leave Request Operations
+
+    def iter_leave_requests(self) -> Iterator[dict]:
+        """Stream all leave requests, decoding one line at a time."""
+        return self._iter(self.leave_requests_ndjson)
+
+    def get_all_leave_requests(self) -> list[dict]:
+        """Get all leave requests."""
+        return list(self.iter_leave_requests())
+
+    def get_leave_request_by_id(self, request_id: str) -> dict | None:
+        """Get a specific leave request by ID."""
+        return self._get(self.leave_requests_ndjson, request_id)
+
+    def get_leave_requests_by_ids(self, request_ids: list[str]) -> list[dict]:
+        """Get leave requests by ID, in the given order; unknown IDs are skipped."""
+        return list(self._iter(self.leave_requests_ndjson, request_ids))
+
+    @property
+    def store_key(self) -> str:
+        """Identifies this store in change hooks."""
+        return str(self.leave_requests_ndjson)
+
+    def _leave_requests_generation(self) -> object:
+        """
+        Token that changes when lines written by another process are picked
+        up, or the file is compacted.
+        """
+        with _index_lock:
+            index = self._index(self.leave_requests_ndjson)
+            return (index, index.tail_scans)
+
+    def create_leave_request(self, request_data: dict) -> dict:
+        """Create a new leave request."""
+        with _index_lock, file_lock(self.leave_requests_ndjson):
+            self._append(self.leave_requests_ndjson, [request_data])
+        hooks.notify_leave_request_changed(
+            hooks.CREATED, request_data["id"], dict(request_data), self.store_key
+        )
+        return request_data
+
+    def update_leave_request(self, request_id: str, updates: dict) -> dict | None:
+        """Update an existing leave request."""
+        updated = self._update(self.leave_requests_ndjson, request_id, updates)
+        if updated is not None:
+            hooks.notify_leave_request_changed(hooks.UPDATED, request_id, dict(updated), self.store_key)
+        return updated
+
+    def delete_leave_request(self, request_id: str) -> bool:
+        """Delete a leave request."""
+        deleted = self._remove(self.leave_requests_ndjson, request_id)
+        if deleted:
+            hooks.notify_leave_request_changed(hooks.DELETED, request_id, store=self.store_key)
+        return deleted
+
+    # Notification Operations
+
+    def iter_notifications(self) -> Iterator[dict]:
+        """Stream all notifications, decoding one line at a time."""
+        return self._iter(self.notifications_ndjson)
+
+    def get_all_notifications(self) -> list[dict]:
+        """Get all notifications."""
+        return list(self.iter_notifications())
+
+    def get_notifications_by_request_id(self, request_id: str) -> list[dict]:
+        """Get all notifications for a specific leave request."""
+        with _index_lock:
+            index = self._index(self.notifications_ndjson)
+            record_ids = list(index.by_request_id.get(request_id, {}))
+        return list(self._iter(self.notifications_ndjson, record_ids))
+
+    def get_notification_by_id(self, notification_id: str) -> dict | None:
+        """Get a specific notification by ID."""
+        return self._get(self.notifications_ndjson, notification_id)
+
+    def get_notifications_by_ids(self, notification_ids: list[str]) -> list[dict]:
+        """Get notifications by ID, in the given order; unknown IDs are skipped."""
+        return list(self._iter(self.notifications_ndjson, notification_ids))
+
+    @contextmanager
+    def _notifications_settled(self) -> Iterator[None]:
+        """Wait for notification writes in progress (see JSONStorage)."""
+        with _index_lock, file_lock(self.notifications_ndjson, exclusive=False):
+            yield
+
+    def get_notification_by_dedup_key(self, dedup_key: str) -> dict | None:
+        """Get the notification stored under a dedup key."""
+        with _index_lock:
+            record_id = self._index(self.notifications_ndjson).by_dedup_key.get(dedup_key)
+            if record_id is None:
+                return None
+            return self._get(self.notifications_ndjson, record_id)
+
+    def get_existing_dedup_keys(self, dedup_keys: list[str]) -> set[str]:
+        """Find which dedup keys already have a notification."""
+        with _index_lock:
+            stored = self._index(self.notifications_ndjson).by_dedup_key
+            return {key for key in dedup_keys if key in stored}
+
+    def create_notification(self, notification_data: dict) -> dict:
+        """Create a new notification, or return the one stored under its dedup key."""
+        with _index_lock, file_lock(self.notifications_ndjson):
+            existing = self.get_notification_by_dedup_key(notification_data.get("dedup_key"))
+            if existing is not None:
+                return existing
+            self._enqueue_outbox([notification_data["id"]])
+            self._append(self.notifications_ndjson, [notification_data])
+        return notification_data
+
+    def create_notifications(self, notifications: list[dict]) -> int:
+        """
+        Create many notifications with one append.
+
+        Notifications whose dedup key is already stored are skipped.
+        """
+        with _index_lock, file_lock(self.notifications_ndjson):
+            index = self._index(self.notifications_ndjson)
+            records = skip_duplicates(notifications, index.by_dedup_key)
+            if not records:
+                return 0
+            self._enqueue_outbox([record["id"] for record in records])
+            self._append(self.notifications_ndjson, records)
+        return len(records)
+
+    def update_notification(self, notification_id: str, updates: dict) -> dict | None:
+        """Update an existing notification."""
+        return self._update(self.notifications_ndjson, notification_id, updates)
+
+    def delete_notification(self, notification_id: str) -> bool:
+        """Delete a notification."""
+        return self._remove(self.notifications_ndjson, notification_id)
+
+    def _bulk_candidates(
+        self,
+        notification_ids: list[str] | None,
+        request_id: str | None
+    ) -> Iterator[dict]:
+        """Narrow a bulk selection using the line index. Caller must hold the locks."""
+        if notification_ids is not None:
+            return self._iter(self.notifications_ndjson, list(dict.fromkeys(notification_ids)))
+        if request_id is not None:
+            index = self._index(self.notifications_ndjson)
+            return self._iter(
+                self.notifications_ndjson, list(index.by_request_id.get(request_id, {}))
+            )
+        return self._iter(self.notifications_ndjson)
+
+    def set_notifications_read_status(
+        self,
+        read_status: bool,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: str | None = None
+    ) -> int:
+        """Set read status on many notifications with a single append."""
+        with _index_lock, file_lock(self.notifications_ndjson):
+            changed = _select_notifications(
+                self._bulk_candidates(notification_ids, request_id),
+                notification_ids, request_id, notification_type,
+                read_status=not read_status
+            )
+            for notif in changed:
+                notif["read_status"] = read_status
+            if changed:
+                self._append(self.notifications_ndjson, changed)
+            return len(changed)
+
+    def delete_notifications(
+        self,
+        notification_ids: list[str] | None = None,
+        request_id: str | None = None,
+        notification_type: str | None = None,
+        read_only: bool = False
+    ) -> int:
+        """Delete many notifications with a single append of tombstones."""
+        with _index_lock, file_lock(self.notifications_ndjson):
+            doomed = _select_notifications(
+                self._bulk_candidates(notification_ids, request_id),
+                notification_ids, request_id, notification_type,
+                read_status=True if read_only else None
+            )
+            if doomed:
+                self._append(
+                    self.notifications_ndjson,
+                    [{"id": n["id"], "_deleted": True} for n in doomed]
+                )
+            return len(doomed)
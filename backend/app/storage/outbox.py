@@ -0,0 +1,58 @@
+"""
+Notification outbox helpers shared by all storage backends.
+
+With NOTIFICATION_DELIVERY_ENABLED, every stored notification also gets an
+outbox entry, written together with it (same transaction in the database,
+same lock on file storage). Delivery workers (services.notification_delivery)
+claim entries, email them and report back; the request that created the
+notification never waits for SMTP.
+
+Entry lifecycle:
+    PENDING  -> claimable once ``available_at`` has passed
+    SENDING  -> claimed by a worker; claimable again if the lease
+                (``available_at``) expires before the worker reports back
+    delivered entries are deleted; FAILED entries are kept for inspection
+
+``attempts`` is incremented by each claim. Workers report back with the
+entry's ``claim_token``, so a report from a claim whose lease expired (and
+was claimed again) is ignored.
+"""
+from datetime import datetime
+
+from ..config import settings
+
+
+PENDING = "pending"
+SENDING = "sending"
+FAILED = "failed"
+
+# Statuses a claim may pick up (SENDING only once its lease has expired)
+CLAIMABLE = (PENDING, SENDING)
+
+
+def outbox_enabled() -> bool:
+    """Whether new notifications are queued for delivery."""
+    return settings.NOTIFICATION_DELIVERY_ENABLED
+
+
+def new_outbox_entry(notification_id: str, now: datetime | None = None) -> dict:
+    """
+    Outbox entry for a newly stored notification.
+
+    Args:
+        notification_id: ID of the notification to deliver
+        now: Enqueue time (defaults to now)
+
+    Returns:
+        Entry dictionary, available for delivery immediately
+    """
+    now = now or datetime.now()
+    return {
+        "id": notification_id,
+        "status": PENDING,
+        "attempts": 0,
+        "available_at": now.isoformat(),
+        "created_at": now.isoformat(),
+        "claim_token": None,
+        "last_error": None,
+    }
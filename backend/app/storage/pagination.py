@@ -0,0 +1,59 @@
+"""
+Opaque keyset (cursor) pagination helpers shared by all storage backends.
+
+Pages are keyed on (created_at, id): a cursor encodes the sort key of the
+last row of a page, and the next page starts strictly after it. Unlike
+OFFSET paging, the cost of fetching a page does not grow with its depth.
+"""
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(record: dict) -> str:
+    """
+    Build the cursor pointing just past a record.
+
+    Args:
+        record: Storage dictionary with ``created_at`` and ``id``
+
+    Returns:
+        URL-safe opaque cursor string
+    """
+    key = [str(record["created_at"]), str(record["id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode a cursor into its (created_at, id) sort key.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), str(record_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from exc
+
+
+def split_page(rows: list[dict], limit: int | None) -> tuple[list[dict], str | None]:
+    """
+    Split rows fetched with ``limit + 1`` into a page and the next cursor.
+
+    Args:
+        rows: Rows returned by a query run with ``limit + 1``
+        limit: Page size (None means unpaginated)
+
+    Returns:
+        Tuple of (page rows, cursor for the next page or None if last page)
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
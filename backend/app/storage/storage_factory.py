@@ -8,13 +8,20 @@ graceful rollback between database and JSON file storage.
 Written by Claude Code on 2026-01-30
 User prompt: Database Integration - Add SQLAlchemy with PostgreSQL/MySQL
 """
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
+from ..db.database import SessionLocal, get_async_session_factory
 from .json_storage import JSONStorage
+from .ndjson_storage import NDJSONStorage
 from .db_storage import DBStorage
+from .async_storage import AsyncDBStorage, AsyncStorage, ThreadedStorage
 
 
-def get_storage(db: Session = None):
+def get_storage(db: Session | AsyncSession = None):
     """
     Get storage implementation based on configuration.
 
@@ -25,10 +32,12 @@ def get_storage(db: Session = None):
     - A/B testing of performance
 
     Args:
-        db: Database session (required if USE_DATABASE=True)
+        db: Database session (required if USE_DATABASE=True). Passing an
+            AsyncSession selects the async implementation.
 
     Returns:
-        Storage implementation (JSONStorage or DBStorage)
+        Storage implementation (JSONStorage, NDJSONStorage, DBStorage or
+        AsyncDBStorage)
 
     Raises:
         ValueError: If USE_DATABASE=True but no database session provided
@@ -51,7 +60,49 @@ def get_storage(db: Session = None):
                 "Database session required when USE_DATABASE=True. "
                 "Ensure db parameter is provided (e.g., db: Session = Depends(get_db))"
             )
+        if isinstance(db, AsyncSession):
+            return AsyncDBStorage(db)
         return DBStorage(db)
     else:
         # JSON storage doesn't need database session
+        if settings.JSON_STORAGE_FORMAT == "ndjson":
+            return NDJSONStorage()
         return JSONStorage()
+
+
+@asynccontextmanager
+async def open_storage() -> AsyncIterator[AsyncStorage]:
+    """
+    Open a storage whose methods are all coroutines.
+
+    - USE_DATABASE and ASYNC_DATABASE: AsyncDBStorage on an AsyncSession
+    - USE_DATABASE only: DBStorage on a sync session, run in the threadpool
+    - JSON storage: run in the threadpool
+
+    Usable outside requests too (e.g. background jobs); the session, if
+    any, is closed on exit.
+    """
+    if settings.USE_DATABASE and settings.ASYNC_DATABASE:
+        async with get_async_session_factory()() as session:
+            yield get_storage(session)
+    elif settings.USE_DATABASE:
+        db = SessionLocal()
+        try:
+            yield ThreadedStorage(get_storage(db))
+        finally:
+            db.close()
+    else:
+        yield ThreadedStorage(get_storage())
+
+
+async def get_async_storage() -> AsyncIterator[AsyncStorage]:
+    """
+    FastAPI dependency providing an async storage for one request.
+
+    Usage in route functions:
+        @router.get("/items/")
+        async def read_items(storage=Depends(get_async_storage)):
+            return await storage.get_all_leave_requests()
+    """
+    async with open_storage() as storage:
+        yield storage
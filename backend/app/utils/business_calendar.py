@@ -0,0 +1,152 @@
+"""
+Precomputed business-day calendar.
+
+A BusinessCalendar holds the sorted ordinals of every business day (not a
+weekend, not a federal holiday and, optionally, not a state holiday) in a
+range of years. Lookups are binary searches, so ``add_business_days`` and
+``business_days_between`` cost O(log n) no matter how long the span.
+
+Calendars are built once per (state, year range) and cached; use
+get_business_calendar() rather than constructing them directly.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+
+import holidays
+
+from ..config import settings
+
+
+class BusinessCalendar:
+    """
+    Sorted business-day ordinals for ``start_year`` through ``end_year``.
+    """
+
+    def __init__(self, start_year: int, end_year: int, state: str | None = None):
+        """
+        Build the calendar.
+
+        Args:
+            start_year: First year covered
+            end_year: Last year covered (inclusive)
+            state: US state code whose holidays also count as non-business days
+        """
+        self.start_year = start_year
+        self.end_year = end_year
+        self.state = state
+
+        years = range(start_year, end_year + 1)
+        closed = holidays.US(years=years, subdiv=state) if state else holidays.US(years=years)
+        closed_ordinals = {d.toordinal() for d in closed}
+
+        first = date(start_year, 1, 1).toordinal()
+        last = date(end_year, 12, 31).toordinal()
+        self._ordinals = [
+            o for o in range(first, last + 1)
+            # date.weekday() == (ordinal + 6) % 7; Saturday = 5, Sunday = 6
+            if (o + 6) % 7 < 5 and o not in closed_ordinals
+        ]
+
+    def covers(self, *dates: date) -> bool:
+        """Whether every date falls inside the calendar's year range."""
+        return all(self.start_year <= d.year <= self.end_year for d in dates)
+
+    def _check(self, *dates: date):
+        if not self.covers(*dates):
+            raise ValueError(
+                f"Date outside business calendar range {self.start_year}-{self.end_year}"
+            )
+
+    def is_business_day(self, target_date: date) -> bool:
+        """
+        Check if a date is a business day.
+
+        Raises:
+            ValueError: If the date is outside the calendar's range
+        """
+        self._check(target_date)
+        ordinal = target_date.toordinal()
+        i = bisect_left(self._ordinals, ordinal)
+        return i < len(self._ordinals) and self._ordinals[i] == ordinal
+
+    def add_business_days(self, start_date: date, days: int) -> date:
+        """
+        Date ``days`` business days after ``start_date``.
+
+        ``start_date`` itself is not counted; non-positive ``days`` returns
+        it unchanged (matching the original day-by-day loop).
+
+        Raises:
+            ValueError: If the result would fall outside the calendar's range
+        """
+        self._check(start_date)
+        if days <= 0:
+            return start_date
+        i = bisect_right(self._ordinals, start_date.toordinal()) + days - 1
+        if i >= len(self._ordinals):
+            raise ValueError(
+                f"Date outside business calendar range {self.start_year}-{self.end_year}"
+            )
+        return date.fromordinal(self._ordinals[i])
+
+    def business_days_between(self, start_date: date, end_date: date) -> int:
+        """
+        Number of business days after ``start_date`` up to and including ``end_date``.
+
+        Inverse of add_business_days: ``business_days_between(d, add_business_days(d, n)) == n``.
+        Negative if ``end_date`` is before ``start_date``.
+
+        Raises:
+            ValueError: If either date is outside the calendar's range
+        """
+        self._check(start_date, end_date)
+        if end_date < start_date:
+            return -self.business_days_between(end_date, start_date)
+        return (
+            bisect_right(self._ordinals, end_date.toordinal())
+            - bisect_right(self._ordinals, start_date.toordinal())
+        )
+
+
+def normalize_state(state: str | None) -> str | None:
+    """
+    Map an Employee.state value to a holidays subdivision code.
+
+    Unknown or free-form values (e.g. "Remote") fall back to federal
+    holidays only.
+    """
+    if not state:
+        return None
+    code = state.strip().upper()
+    return code if code in holidays.US.subdivisions else None
+
+
+@lru_cache(maxsize=None)
+def _build_calendar(state: str | None, start_year: int, end_year: int) -> BusinessCalendar:
+    return BusinessCalendar(start_year, end_year, state)
+
+
+def get_business_calendar(state: str | None = None, *dates: date) -> BusinessCalendar:
+    """
+    Get the cached calendar for a state, covering the given dates.
+
+    The configured year range (BUSINESS_CALENDAR_START_YEAR..END_YEAR) is
+    used unless a date falls outside it, in which case a wider calendar is
+    built (and cached) on demand.
+
+    Args:
+        state: Employee.state value (None or unknown means federal only)
+        *dates: Dates the calendar must cover
+
+    Returns:
+        BusinessCalendar
+    """
+    start_year = min([settings.BUSINESS_CALENDAR_START_YEAR] + [d.year for d in dates])
+    end_year = max([settings.BUSINESS_CALENDAR_END_YEAR] + [d.year for d in dates])
+    return _build_calendar(normalize_state(state), start_year, end_year)
+
+
+def span_end(start_date: date, business_days: int) -> date:
+    """Generous upper bound on the date ``business_days`` business days out."""
+    return start_date + timedelta(days=2 * max(business_days, 0) + 14)
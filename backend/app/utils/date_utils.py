@@ -1,9 +1,10 @@
 # Written by Claude Code on 2026-01-29
 # User prompt: Implement FMLA Deadline & Timeline Tracker Prototype
 
-from datetime import date, timedelta
+from datetime import date
 from dateutil.relativedelta import relativedelta
-import holidays
+
+from .business_calendar import get_business_calendar, span_end
 
 
 def add_months(start_date: date, months: int) -> date:
@@ -17,45 +18,47 @@ def add_months(start_date: date, months: int) -> date:
     return start_date + relativedelta(months=months)
 
 
-def is_business_day(target_date: date) -> bool:
+def is_business_day(target_date: date, state: str | None = None) -> bool:
     """
     Check if a date is a business day (not weekend or federal holiday).
 
     Args:
         target_date: Date to check
+        state: Optional employee state; its holidays are excluded too
 
     Returns:
         True if the date is a business day, False otherwise
     """
-    # Check if weekend
-    if target_date.weekday() in (5, 6):  # Saturday = 5, Sunday = 6
-        return False
-
-    # Check if federal holiday
-    us_holidays = holidays.US(years=target_date.year)
-    if target_date in us_holidays:
-        return False
-
-    return True
+    return get_business_calendar(state, target_date).is_business_day(target_date)
 
 
-def add_business_days(start_date: date, days: int) -> date:
+def add_business_days(start_date: date, days: int, state: str | None = None) -> date:
     """
     Add business days to a date, skipping weekends and federal holidays.
 
     Args:
         start_date: Starting date
         days: Number of business days to add
+        state: Optional employee state; its holidays are skipped too
 
     Returns:
         Date after adding specified business days
     """
-    current_date = start_date
-    days_added = 0
+    calendar = get_business_calendar(state, start_date, span_end(start_date, days))
+    return calendar.add_business_days(start_date, days)
 
-    while days_added < days:
-        current_date += timedelta(days=1)
-        if is_business_day(current_date):
-            days_added += 1
 
-    return current_date
+def business_days_between(start_date: date, end_date: date, state: str | None = None) -> int:
+    """
+    Count business days after start_date up to and including end_date.
+
+    Args:
+        start_date: Starting date (not counted)
+        end_date: Ending date (counted if it is a business day)
+        state: Optional employee state; its holidays are excluded too
+
+    Returns:
+        Number of business days (negative if end_date is before start_date)
+    """
+    calendar = get_business_calendar(state, start_date, end_date)
+    return calendar.business_days_between(start_date, end_date)
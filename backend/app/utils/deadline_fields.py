@@ -0,0 +1,82 @@
+"""
+FMLA calendar rules and the deadline fields stored with a leave request.
+
+Kept outside the services package so the ORM models can fill their
+deadline columns without depending on the service layer. DeadlineCalculator
+implements its deadline methods with the rules here.
+"""
+from datetime import date, timedelta
+
+from .date_utils import add_months
+
+
+def as_date(value) -> date | None:
+    """Accept a date or an ISO date string (as stored in JSON)."""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def certification_deadline(leave_start_date: date, notice_date: date) -> date:
+    """Earlier of 15 calendar days after notice and the leave start."""
+    return min(notice_date + timedelta(days=15), leave_start_date)
+
+
+def cure_window(certification_deadline: date) -> tuple[date, date]:
+    """The 7 calendar days after the certification deadline, as (start, end)."""
+    return (certification_deadline + timedelta(days=1), certification_deadline + timedelta(days=7))
+
+
+def recertification_date(leave_start_date: date, condition_type: str = "serious") -> date:
+    """6 months after the leave start for chronic conditions, 30 days otherwise."""
+    if condition_type == "chronic":
+        return add_months(leave_start_date, 6)
+    return leave_start_date + timedelta(days=30)
+
+
+def deadline_fields(request_data: dict) -> dict:
+    """
+    Compute the deadline fields of a stored leave request.
+
+    These are stored as indexed columns on the database backend so
+    deadline and at-risk filters run in SQL. The certification deadline
+    and cure window depend on the notice date; when it is missing they
+    would depend on "today", so they are left as None.
+
+    Args:
+        request_data: Leave request storage dictionary
+
+    Returns:
+        Dictionary with leave_start_date, leave_end_date,
+        certification_deadline, cure_window_end, recertification_date and
+        certification_complete
+    """
+    leave = request_data.get("leave") or {}
+    start_date = as_date(leave.get("start_date"))
+    notice_date = as_date(request_data.get("notice_date"))
+
+    cert_deadline = cure_end = None
+    if start_date is not None and notice_date is not None:
+        cert_deadline = certification_deadline(start_date, notice_date)
+        _, cure_end = cure_window(cert_deadline)
+
+    recert_date = None
+    if start_date is not None:
+        condition_type = getattr(leave.get("condition_type"), "value", leave.get("condition_type"))
+        recert_date = recertification_date(start_date, condition_type or "serious")
+
+    # Same rule as ComplianceChecker: signed and no outstanding flags
+    medical_provider = request_data.get("medical_provider") or {}
+    cert_complete = bool(
+        medical_provider.get("signature_present")
+        and not request_data.get("compliance_flags")
+    )
+
+    return {
+        "leave_start_date": start_date,
+        "leave_end_date": as_date(leave.get("end_date")),
+        "certification_deadline": cert_deadline,
+        "cure_window_end": cure_end,
+        "recertification_date": recert_date,
+        "certification_complete": cert_complete,
+    }
@@ -0,0 +1,64 @@
+"""
+Add and fill the denormalized deadline columns on an existing database.
+
+Databases created before leave_requests gained leave_start_date,
+certification_deadline, etc. lack those columns (create_all does not alter
+existing tables). This script adds any missing columns and indexes, then
+recomputes the values for every leave request.
+
+Safe to run more than once.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import inspect, text
+from app.db.database import SessionLocal, engine, init_db
+from app.db.models import LeaveRequestDB
+
+
+def add_missing_columns():
+    """ALTER TABLE leave_requests to add deadline columns it doesn't have yet."""
+    table = LeaveRequestDB.__table__
+    existing = {col["name"] for col in inspect(engine).get_columns(table.name)}
+
+    with engine.begin() as conn:
+        for name in LeaveRequestDB.DEADLINE_COLUMNS:
+            if name in existing:
+                continue
+            column = table.columns[name]
+            column_type = column.type.compile(dialect=engine.dialect)
+            default = " NOT NULL DEFAULT FALSE" if name == "certification_complete" else ""
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}{default}"))
+            print(f"  Added column {name}")
+
+    # Indexes on the new columns
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def backfill():
+    """Recompute the deadline columns for every leave request."""
+    db = SessionLocal()
+    try:
+        requests = db.query(LeaveRequestDB).all()
+        for request in requests:
+            request.sync_deadline_columns()
+        db.commit()
+        print(f"[OK] Recomputed deadline columns for {len(requests)} leave requests")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Step 1: Creating missing tables...")
+    init_db()
+    print("Step 2: Adding missing deadline columns...")
+    add_missing_columns()
+    print("Step 3: Backfilling deadline columns...")
+    backfill()
@@ -0,0 +1,106 @@
+"""
+Benchmark AlertsEngine against the checker + timeline pipeline.
+
+Generates synthetic leave requests (storage dicts, as the JSON backend
+holds them) and times compute_alerts at increasing sizes. Per-request cost
+should stay flat as the size grows; the legacy pipeline is only run up to
+--legacy-max since it is much slower. With --workers the engine also runs
+as a process-pool sweep for comparison.
+
+Usage:
+    python scripts/benchmark_alerts_engine.py
+    python scripts/benchmark_alerts_engine.py --sizes 1000 10000 100000 --legacy-max 10000
+    python scripts/benchmark_alerts_engine.py --sizes 100000 400000 --legacy-max 0 --workers 4
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.leave_request import LeaveRequest
+from app.services.alerts_engine import AlertsEngine, start_sweep_pool, stop_sweep_pool
+from app.services import compliance_snapshot
+
+
+def make_requests(count: int, as_of: date, seed: int = 0) -> list[dict]:
+    """Leave requests with deadlines spread around ``as_of``."""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        start = as_of + timedelta(days=rng.randint(-60, 90))
+        notice = start - timedelta(days=rng.randint(0, 45))
+        signed = rng.random() < 0.5
+        requests.append({
+            "id": f"req-{i}",
+            "employee": {"name": f"Employee {i}", "ssn_last4": "1234", "phone": "5555555555"},
+            "leave": {
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=30)).isoformat(),
+                "intermittent": False,
+                "condition_type": rng.choice(["serious", "chronic"]),
+            },
+            "medical_provider": {
+                "name": "Dr. Smith",
+                "signature_present": signed,
+                "date_signed": notice.isoformat() if signed else None,
+            },
+            "compliance_flags": ["missing_physician_phone"] if rng.random() < 0.1 else [],
+            "fmla_eligible": True,
+            "status": rng.choice(["pending", "approved", "awaiting_docs"]),
+            "notice_date": notice.isoformat() if rng.random() < 0.95 else None,
+            "created_at": notice.isoformat(),
+        })
+    return requests
+
+
+def legacy_alerts(requests: list[dict], as_of: date) -> list[dict]:
+    """The pre-engine path: validate everything, then check and regenerate timelines."""
+    return compliance_snapshot.compute_alerts([LeaveRequest(**r) for r in requests], as_of)
+
+
+def time_call(func, *args) -> tuple[float, int]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000,
+                        help="Largest size to also run the legacy pipeline on")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Also time a process-pool sweep with this many workers")
+    args = parser.parse_args()
+
+    as_of = date(2025, 3, 1)
+    engine = AlertsEngine(workers=1)
+    parallel = AlertsEngine(workers=args.workers, parallel_min_requests=0)
+
+    if args.workers > 1:
+        # One pool for every size, as in the app
+        start_sweep_pool(args.workers)
+
+    print(f"{'requests':>10} {'alerts':>8} {'engine s':>10} {'us/req':>8} {'legacy s':>10} {'us/req':>8} {'speedup':>8}")
+    for size in args.sizes:
+        requests = make_requests(size, as_of)
+        engine_s, alerts = time_call(engine.compute_alerts, requests, as_of)
+        row = f"{size:>10} {alerts:>8} {engine_s:>10.3f} {engine_s / size * 1e6:>8.1f}"
+        if size <= args.legacy_max:
+            legacy_s, _ = time_call(legacy_alerts, requests, as_of)
+            row += f" {legacy_s:>10.3f} {legacy_s / size * 1e6:>8.1f} {legacy_s / engine_s:>7.1f}x"
+        print(row)
+        if args.workers > 1:
+            parallel_s, _ = time_call(parallel.compute_alerts, requests, as_of)
+            print(f"{'':>10} {args.workers:>2} workers: {parallel_s:.3f} s, "
+                  f"{parallel_s / size * 1e6:.1f} us/req, {engine_s / parallel_s:.1f}x vs engine")
+    stop_sweep_pool()
+
+
+if __name__ == "__main__":
+    main()
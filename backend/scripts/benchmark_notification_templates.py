@@ -0,0 +1,96 @@
+"""
+Benchmark batch template rendering against per-item notification models.
+
+The per-item path is what routes and the sweep used to do for each
+notification: validate a LeaveRequest, build a Notification through
+NotificationService.generate_*, then dump it back to a dictionary for
+storage. render_batch goes from storage dictionaries to storage
+dictionaries directly.
+
+Usage:
+    python scripts/benchmark_notification_templates.py
+    python scripts/benchmark_notification_templates.py --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.leave_request import LeaveRequest
+from app.models.notification import NotificationType
+from app.services.notification_service import NotificationService
+from app.services.notification_templates import render_batch
+
+
+def make_requests(count: int, as_of: date) -> list[dict]:
+    """Leave request storage dictionaries with varied names and dates."""
+    requests = []
+    for i in range(count):
+        start = as_of + timedelta(days=i % 90)
+        requests.append({
+            "id": f"req-{i}",
+            "employee": {
+                "name": f"Employee {i}", "ssn_last4": "1234",
+                "phone": "5555555555", "email": f"employee{i}@example.com",
+            },
+            "leave": {
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=30)).isoformat(),
+                "intermittent": False,
+                "condition_type": "chronic",
+            },
+            "medical_provider": {"name": "Dr. Smith", "signature_present": False},
+            "compliance_flags": ["missing_physician_phone"],
+            "fmla_eligible": True,
+            "status": "pending",
+            "notice_date": (start - timedelta(days=10)).isoformat(),
+            "created_at": "2025-01-01T00:00:00",
+        })
+    return requests
+
+
+def per_item(requests: list[dict], deadlines: list[str]) -> list[dict]:
+    service = NotificationService()
+    return [
+        service.generate_certification_due_notification(LeaveRequest(**r), d).model_dump(mode='json')
+        for r, d in zip(requests, deadlines)
+    ]
+
+
+def batch(requests: list[dict], deadlines: list[str]) -> list[dict]:
+    return render_batch(
+        requests, NotificationType.CERTIFICATION_DUE, [{"cert_deadline": d} for d in deadlines]
+    )
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    as_of = date.today()
+    print(f"{'size':>8} {'per-item/s':>12} {'batch/s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        requests = make_requests(size, as_of)
+        deadlines = [str(as_of + timedelta(days=i % 30)) for i in range(size)]
+        slow = best_of(args.repeat, per_item, requests, deadlines)
+        fast = best_of(args.repeat, batch, requests, deadlines)
+        print(f"{size:>8} {size / slow:>12,.0f} {size / fast:>12,.0f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Bring an existing notifications table up to the current model.
+
+create_all does not alter existing tables, so databases created before
+these notification changes need this script:
+
+- ``dedup_key`` and its unique index: without the column every
+  notification query fails with "no such column". Keys are backfilled for
+  existing deadline reminders.
+- ``template_id``, ``template_version`` and ``params`` (compact storage)
+- ``body`` made nullable: compact notifications store no body. SQLite
+  cannot drop a NOT NULL constraint, so the table is rebuilt there (new
+  table, copy rows, drop the old one, rename); other databases ALTER the
+  column.
+
+Keys are backfilled for certification, cure window and recertification
+notifications from their leave request's current deadlines. When several
+existing notifications map to the same key, the oldest keeps it and the
+others stay NULL (they predate deduplication).
+
+Safe to run more than once.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import MetaData, inspect, select, text, update
+from sqlalchemy.schema import CreateTable
+from app.db.database import SessionLocal, engine, init_db
+from app.db.models import LeaveRequestDB, NotificationDB
+from app.models.leave_request import LeaveRequest
+from app.models.notification import NotificationType
+from app.services.notification_service import NotificationService
+from app.services.notification_templates import dedup_key
+
+
+# Columns added to notifications after its first release
+NEW_COLUMNS = ("dedup_key", "template_id", "template_version", "params")
+
+# Notification types that carry a dedup key
+DEDUP_TYPES = (
+    NotificationType.CERTIFICATION_DUE,
+    NotificationType.CURE_WINDOW,
+    NotificationType.RECERTIFICATION_DUE,
+)
+
+
+def add_missing_columns():
+    """ALTER TABLE notifications to add the columns it doesn't have yet."""
+    table = NotificationDB.__table__
+    existing = {col["name"] for col in inspect(engine).get_columns(table.name)}
+
+    with engine.begin() as conn:
+        for name in NEW_COLUMNS:
+            if name in existing:
+                continue
+            column_type = table.columns[name].type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+            print(f"  Added column {name}")
+
+
+def make_body_nullable():
+    """Drop the NOT NULL constraint on notifications.body."""
+    table = NotificationDB.__table__
+    body = next(col for col in inspect(engine).get_columns(table.name) if col["name"] == "body")
+    if body["nullable"]:
+        return
+
+    if engine.dialect.name == "sqlite":
+        rebuild_sqlite_table()
+    elif engine.dialect.name == "mysql":
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table.name} MODIFY body TEXT NULL"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN body DROP NOT NULL"))
+    print("  Made column body nullable")
+
+
+def rebuild_sqlite_table():
+    """
+    Recreate notifications from the current model and copy the rows over.
+
+    Follows SQLite's documented procedure for schema changes ALTER TABLE
+    can't make: foreign keys are off while the old table is dropped, so
+    notification_outbox rows (which reference it) survive. Indexes are
+    created afterwards by create_missing_indexes.
+    """
+    table = NotificationDB.__table__
+    new_name = f"{table.name}__new"
+    metadata = MetaData()
+    for referenced in {fk.column.table for fk in table.foreign_keys}:
+        referenced.to_metadata(metadata)
+    new_table = table.to_metadata(metadata, name=new_name)
+    columns = ", ".join(col.name for col in table.columns)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            conn.exec_driver_sql("BEGIN")
+            try:
+                conn.execute(CreateTable(new_table))
+                conn.exec_driver_sql(
+                    f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {table.name}"
+                )
+                conn.exec_driver_sql(f"DROP TABLE {table.name}")
+                conn.exec_driver_sql(f"ALTER TABLE {new_name} RENAME TO {table.name}")
+                violations = conn.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+                if violations:
+                    raise RuntimeError(f"Foreign key violations after rebuild: {violations}")
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+def backfill_dedup_keys():
+    """Set dedup_key on existing deadline reminders that don't have one."""
+    service = NotificationService()
+    db = SessionLocal()
+    try:
+        taken = set(db.scalars(
+            select(NotificationDB.dedup_key).where(NotificationDB.dedup_key.is_not(None))
+        ))
+        rows = db.execute(
+            select(NotificationDB.id, NotificationDB.type, LeaveRequestDB)
+            .join(LeaveRequestDB, LeaveRequestDB.id == NotificationDB.request_id)
+            .where(NotificationDB.dedup_key.is_(None), NotificationDB.type.in_(DEDUP_TYPES))
+            .order_by(NotificationDB.created_at, NotificationDB.id)
+        ).all()
+
+        filled = 0
+        for notification_id, notification_type, request in rows:
+            try:
+                deadline = service.reminder_deadline(LeaveRequest(**request.to_dict()), notification_type)
+            except (TypeError, ValueError):
+                # No notice date yet: the deadline (and so the key) is unknown
+                continue
+            key = dedup_key(request.id, notification_type, deadline)
+            if key in taken:
+                continue
+            taken.add(key)
+            db.execute(update(NotificationDB).where(NotificationDB.id == notification_id).values(dedup_key=key))
+            filled += 1
+        db.commit()
+        print(f"[OK] Backfilled dedup keys for {filled} of {len(rows)} notifications")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def create_missing_indexes():
+    """Create the notification indexes (including the unique dedup_key index) if missing."""
+    for index in NotificationDB.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    print("Step 1: Creating missing tables...")
+    init_db()
+    print("Step 2: Adding missing notification columns...")
+    add_missing_columns()
+    print("Step 3: Making body nullable...")
+    make_body_nullable()
+    print("Step 4: Backfilling dedup keys...")
+    backfill_dedup_keys()
+    print("Step 5: Creating missing indexes...")
+    create_missing_indexes()
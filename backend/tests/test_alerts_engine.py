@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+from datetime import date, timedelta
+
+from hypothesis import given, settings, strategies as st
+
+from app.api.streaming import json_array_chunks, ndjson_chunks
+from app.models.leave_request import LeaveRequest
+from app.services import alerts_engine
+from app.services.alerts_engine import AlertsEngine, start_sweep_pool, stop_sweep_pool
+from app.services.compliance_snapshot import compute_alerts
+from tests.test_db_storage import make_leave_request
+
+
+AS_OF = date(2025, 3, 1)
+
+offsets = st.integers(min_value=-60, max_value=60)
+leave_requests = st.builds(
+    lambda i, start, notice, condition, status, signed, date_signed, flags: dict(
+        make_leave_request(f"req-{i}", status=status),
+        leave={
+            "start_date": (AS_OF + timedelta(days=start)).isoformat(),
+            "end_date": (AS_OF + timedelta(days=start + 30)).isoformat(),
+            "intermittent": False,
+            "condition_type": condition,
+        },
+        medical_provider={
+            "name": "Dr. John Smith",
+            "signature_present": signed,
+            "date_signed": AS_OF.isoformat() if date_signed else None,
+        },
+        compliance_flags=flags,
+        notice_date=(AS_OF + timedelta(days=notice)).isoformat() if notice is not None else None,
+    ),
+    st.integers(min_value=0, max_value=10_000),
+    offsets,
+    st.one_of(st.none(), offsets),
+    st.sampled_from(["serious", "chronic"]),
+    st.sampled_from(["pending", "approved", "awaiting_docs"]),
+    st.booleans(),
+    st.booleans(),
+    st.sampled_from([[], ["missing_physician_phone"]]),
+)
+
+
+class TestAlertsEngine:
+    """Property tests: AlertsEngine matches the checker + timeline pipeline."""
+
+    @settings(max_examples=200)
+    @given(st.lists(leave_requests, max_size=20), st.integers(min_value=-10, max_value=10))
+    def test_matches_compute_alerts(self, records, day):
+        """Same alerts, same order, same JSON shape."""
+        as_of = AS_OF + timedelta(days=day)
+        expected = compute_alerts([LeaveRequest(**r) for r in records], as_of)
+        assert AlertsEngine().compute_alerts(records, as_of) == expected
+
+    def test_accepts_native_dates(self):
+        """Database dicts (date objects) give the same result as JSON dicts (strings)."""
+        record = make_leave_request("req-1")
+        as_of = date(2025, 2, 14)
+        native = dict(record, leave=dict(
+            record["leave"], start_date=date(2025, 2, 20), end_date=date(2025, 4, 1)
+        ))
+        alerts = AlertsEngine().compute_alerts([native], as_of)
+        assert alerts == AlertsEngine().compute_alerts([record], as_of)
+        assert alerts[0]["compliance"]["risk_level"] == "medium"
+
+    def test_far_deadlines_skip_evaluation(self, monkeypatch):
+        """Requests due beyond the at-risk window are filtered out before evaluation."""
+        evaluated = []
+        evaluate = AlertsEngine.evaluate_compact
+        monkeypatch.setattr(
+            AlertsEngine, "evaluate_compact",
+            lambda self, request, as_of: evaluated.append(request[0]) or evaluate(self, request, as_of)
+        )
+        records = [
+            dict(make_leave_request(f"req-{offset}"), leave=dict(
+                make_leave_request("x")["leave"], start_date=(AS_OF + timedelta(days=offset)).isoformat()
+            ), notice_date=AS_OF.isoformat())
+            for offset in (3, 30, 90)
+        ]
+
+        alerts = AlertsEngine(workers=1).compute_alerts(records, AS_OF)
+
+        # Deadline is the earlier of notice + 15 and the leave start
+        assert evaluated == ["req-3"]
+        assert [a["request"]["id"] for a in alerts] == ["req-3"]
+
+    def test_process_pool_sweep_matches_serial(self):
+        """Chunked worker-process evaluation merges back into the serial order."""
+        records = [
+            dict(
+                make_leave_request(f"req-{i}", status=["pending", "awaiting_docs"][i % 2]),
+                leave={
+                    "start_date": (AS_OF + timedelta(days=i % 23 - 11)).isoformat(),
+                    "end_date": (AS_OF + timedelta(days=60)).isoformat(),
+                    "intermittent": False,
+                    "condition_type": ["serious", "chronic"][i % 3 == 0],
+                },
+                notice_date=(AS_OF + timedelta(days=i % 17 - 20)).isoformat() if i % 7 else None,
+            )
+            for i in range(60)
+        ]
+        serial = AlertsEngine(workers=1).compute_alerts(records, AS_OF)
+        parallel = AlertsEngine(workers=2, chunk_size=7, parallel_min_requests=0)
+        assert len(serial) > 10
+        try:
+            assert parallel.compute_alerts(records, AS_OF) == serial
+            assert parallel.compute_alerts([], AS_OF) == []
+            assert asyncio.run(parallel.compute_alerts_async(records, AS_OF)) == serial
+            assert alerts_engine._sweep_pool is not None
+        finally:
+            stop_sweep_pool()
+
+    def test_sweep_pool_is_long_lived(self):
+        """Sweeps share one pool whose workers are not forked from this process."""
+        try:
+            pool = start_sweep_pool(2)
+            assert start_sweep_pool(2) is pool
+            assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        finally:
+            stop_sweep_pool()
+        assert alerts_engine._sweep_pool is None
+        assert start_sweep_pool(1) is None
+
+    def test_async_sweep_leaves_event_loop_free(self, monkeypatch):
+        """compute_alerts_async evaluates off the event loop thread."""
+        threads = []
+        evaluate = alerts_engine._evaluate_chunk
+        monkeypatch.setattr(
+            alerts_engine, "_evaluate_chunk",
+            lambda *args: threads.append(threading.get_ident()) or evaluate(*args)
+        )
+        records = [make_leave_request("req-1")]
+
+        async def body():
+            return threading.get_ident(), await AlertsEngine(workers=1).compute_alerts_async(records, AS_OF)
+
+        loop_thread, alerts = asyncio.run(body())
+        assert alerts == AlertsEngine(workers=1).compute_alerts(records, AS_OF)
+        assert threads and threads[0] != loop_thread
+
+
+class TestJsonArrayChunks:
+    """Test the streamed JSON array encoding."""
+
+    def test_chunks_join_to_valid_json(self):
+        """Empty, partial and multi-batch inputs all decode back to the items."""
+        for count in (0, 1, 5, 250):
+            items = [{"n": i, "on": date(2025, 1, 1)} for i in range(count)]
+            text = "".join(json_array_chunks(items, batch_size=100))
+            assert json.loads(text) == [{"n": i, "on": "2025-01-01"} for i in range(count)]
+
+
+class TestNdjsonChunks:
+    """Test the newline-delimited JSON encoding."""
+
+    def test_one_object_per_line(self):
+        """Plain and async iterables give one decodable model per line."""
+        models = [LeaveRequest(**make_leave_request(f"req-{i}")) for i in range(5)]
+
+        async def from_async():
+            for model in models:
+                yield model
+
+        async def collect(items):
+            return "".join([chunk async for chunk in ndjson_chunks(items, batch_size=2)])
+
+        for items in (models, from_async()):
+            lines = asyncio.run(collect(items)).splitlines()
+            assert [json.loads(line)["id"] for line in lines] == [f"req-{i}" for i in range(5)]
+        assert asyncio.run(collect([])) == ""
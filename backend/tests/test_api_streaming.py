@@ -0,0 +1,139 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.storage import json_storage
+from app.storage.async_storage import ThreadedStorage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from app.storage.storage_factory import get_async_storage
+from tests.test_db_storage import make_leave_request, make_notification
+
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+class ClosableStorage:
+    """
+    Blocking storage that refuses every use once closed, including reads
+    from streams it already handed out.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.closed = False
+
+    def __getattr__(self, name):
+        attr = getattr(self.storage, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._check()
+            result = attr(*args, **kwargs)
+            return self._guard(result) if name.startswith("stream_") else result
+
+        return call
+
+    def _guard(self, records):
+        self._check()
+        for record in records:
+            self._check()
+            yield record
+
+    def _check(self):
+        if self.closed:
+            raise RuntimeError("storage used after the request dependency closed it")
+
+
+@pytest.fixture(params=["db", "json", "ndjson"])
+def client(request, db_session, tmp_path):
+    """TestClient whose routes use a seeded storage backend."""
+    json_storage._file_cache.clear()
+    storage = {
+        "db": lambda: DBStorage(db_session),
+        "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+        "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+    }[request.param]()
+    for i in range(5):
+        storage.create_leave_request(make_leave_request(f"req-{i}", created_at=date(2025, 1, 1) + timedelta(days=i)))
+    storage.create_notifications([
+        make_notification(f"n-{i}", "req-0", datetime(2025, 1, 1) + timedelta(hours=i), read=i % 2 == 1)
+        for i in range(5)
+    ])
+
+    async def override():
+        # Like get_async_storage, close the storage once the response is done
+        closable = ClosableStorage(storage)
+        try:
+            yield ThreadedStorage(closable)
+        finally:
+            closable.closed = True
+
+    app.dependency_overrides[get_async_storage] = override
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_async_storage, None)
+
+
+def ndjson_lines(response) -> list[dict]:
+    """Parse a response body as NDJSON, checking every line is terminated."""
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestNdjsonRoutes:
+    """Test the list endpoints with Accept: application/x-ndjson."""
+
+    def test_leave_requests_stream(self, client):
+        response = client.get("/api/leave-requests/", headers=NDJSON)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert sorted(r["id"] for r in ndjson_lines(response)) == [f"req-{i}" for i in range(5)]
+
+    def test_notifications_stream_newest_first(self, client):
+        response = client.get("/api/notifications/?unread_only=true&summary=true", headers=NDJSON)
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = ndjson_lines(response)
+        assert [n["id"] for n in lines] == ["n-4", "n-2", "n-0"]
+        assert all("body" not in n for n in lines)
+
+    @pytest.mark.parametrize("path,ids", [
+        ("/api/leave-requests/", ["req-4", "req-3", "req-2", "req-1", "req-0"]),
+        ("/api/notifications/", ["n-4", "n-3", "n-2", "n-1", "n-0"]),
+    ])
+    def test_pages_forward_next_cursor(self, client, path, ids):
+        """Paged NDJSON responses carry X-Next-Cursor like the JSON ones."""
+        seen = []
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+            response = client.get(path, params=params, headers=NDJSON)
+            assert response.headers["content-type"] == "application/x-ndjson"
+            seen += [item["id"] for item in ndjson_lines(response)]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == ids
+        assert cursor is None
+
+    @pytest.mark.parametrize("path", ["/api/leave-requests/", "/api/notifications/"])
+    def test_json_without_ndjson_accept(self, client, path):
+        """Other Accept headers keep the JSON array response."""
+        for headers in ({}, {"Accept": "application/json"}):
+            response = client.get(path, headers=headers)
+            assert response.headers["content-type"] == "application/json"
+            assert len(response.json()) == 5
+
+        paged = client.get(path, params={"limit": 2})
+        assert paged.headers["content-type"] == "application/json"
+        assert len(paged.json()) == 2
+        assert "X-Next-Cursor" in paged.headers
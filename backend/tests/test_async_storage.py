@@ -0,0 +1,145 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base, get_async_database_url
+from app.db.models import ComplianceSnapshotDB
+from app.models.leave_request import LeaveStatus
+from app.storage import json_storage
+from app.storage.async_storage import AsyncDBStorage, ThreadedStorage
+from app.storage.db_storage import DBStorage
+from app.storage import async_storage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_db_storage import DEADLINE_CASES, make_deadline_request, make_leave_request
+
+
+async def with_async_storage(body):
+    """Run ``body(storage)`` against a fresh in-memory aiosqlite database."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            return await body(AsyncDBStorage(session))
+    finally:
+        await engine.dispose()
+
+
+class TestAsyncDBStorage:
+    """Test DBStorage methods awaited through the async engine."""
+
+    def test_crud_through_async_session(self):
+        """Writes and queries round-trip as coroutines."""
+        async def body(storage):
+            await storage.create_leave_request(make_leave_request("req-1"))
+            await storage.create_leave_request(
+                make_leave_request("req-2", "approved", date(2025, 1, 2))
+            )
+            updated = await storage.update_leave_request("req-1", {"status": LeaveStatus.DENIED})
+            approved = await storage.query_leave_requests(status=LeaveStatus.APPROVED)
+            missing = await storage.get_leave_request_by_id("missing")
+            deleted = await storage.delete_leave_request("req-2")
+            remaining = await storage.get_all_leave_requests()
+            return updated, approved, missing, deleted, remaining
+
+        updated, approved, missing, deleted, remaining = asyncio.run(with_async_storage(body))
+
+        assert updated["status"] == "denied"
+        assert [r["id"] for r in approved] == ["req-2"]
+        assert missing is None
+        assert deleted is True
+        assert [r["id"] for r in remaining] == ["req-1"]
+
+    def test_stream_matches_query(self):
+        """Streamed rows equal the query result, in the same order."""
+        async def body(storage):
+            for i in range(5):
+                await storage.create_leave_request(
+                    make_leave_request(f"req-{i}", ["pending", "approved"][i % 2], date(2025, 1, i + 1))
+                )
+            rows = await storage.stream_leave_requests(status=LeaveStatus.PENDING, order_by="-created_at")
+            streamed = [r async for r in rows]
+            queried = await storage.query_leave_requests(status=LeaveStatus.PENDING, order_by="-created_at")
+            return streamed, queried
+
+        streamed, queried = asyncio.run(with_async_storage(body))
+        assert [r["id"] for r in streamed] == ["req-4", "req-2", "req-0"]
+        assert streamed == queried
+
+    def test_alerts_match_sync_storage(self):
+        """Alerts evaluated outside run_sync equal DBStorage's, stale snapshots included."""
+        async def body(storage):
+            for case in DEADLINE_CASES:
+                await storage.create_leave_request(make_deadline_request(*case))
+            await storage.session.execute(delete(ComplianceSnapshotDB).where(
+                ComplianceSnapshotDB.request_id == "due-soon"
+            ))
+            alerts = await storage.get_compliance_alerts()
+            expected = await storage.session.run_sync(
+                lambda sync_session: DBStorage(sync_session).get_compliance_alerts()
+            )
+            return alerts, expected
+
+        alerts, expected = asyncio.run(with_async_storage(body))
+        assert "due-soon" in [a["request"]["id"] for a in alerts]
+        assert alerts == expected
+
+    def test_properties_are_values(self):
+        """Non-method attributes resolve to their value, not a coroutine or property."""
+        async def body(storage):
+            return storage.store_key, storage.session.sync_session
+
+        store_key, sync_session = asyncio.run(with_async_storage(body))
+        assert store_key == "sqlite+aiosqlite://"
+        assert store_key == DBStorage(sync_session).store_key
+
+
+class TestThreadedStorage:
+    """Test the threadpool facade used for blocking backends."""
+
+    def test_methods_become_coroutines(self, tmp_path):
+        """Blocking storage methods are awaitable with unchanged results."""
+        json_storage._file_cache.clear()
+        storage = ThreadedStorage(JSONStorage(data_dir=str(tmp_path)))
+
+        async def body():
+            await storage.create_leave_request({"id": "req-1", "status": "pending"})
+            return await storage.get_leave_request_by_id("req-1")
+
+        assert asyncio.run(body())["status"] == "pending"
+        assert storage.data_dir == tmp_path
+        json_storage._file_cache.clear()
+
+    def test_stream_pulls_batches_in_threadpool(self, tmp_path, monkeypatch):
+        """stream_* methods return async iterators over every matching record."""
+        monkeypatch.setattr(async_storage, "STREAM_BATCH_SIZE", 2)
+        storage = ThreadedStorage(NDJSONStorage(data_dir=str(tmp_path)))
+
+        async def body():
+            for i in range(5):
+                await storage.create_leave_request(
+                    make_leave_request(f"req-{i}", ["pending", "approved"][i % 2], date(2025, 1, i + 1))
+                )
+            rows = await storage.stream_leave_requests(status="pending")
+            return [r["id"] async for r in rows]
+
+        assert asyncio.run(body()) == ["req-0", "req-2", "req-4"]
+
+
+class TestAsyncDatabaseUrl:
+    """Test mapping sync URLs to async drivers."""
+
+    def test_driver_mapping(self):
+        """SQLite maps to aiosqlite and PostgreSQL to asyncpg."""
+        assert get_async_database_url("sqlite:///./data/fmla.db") == "sqlite+aiosqlite:///./data/fmla.db"
+        assert get_async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+        assert get_async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+        assert get_async_database_url("mysql+aiomysql://h/db") == "mysql+aiomysql://h/db"
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import numpy as np
+from hypothesis import given, strategies as st
+
+from app.services.batch_deadline_calculator import BatchDeadlineCalculator, add_months
+from app.services.deadline_calculator import DeadlineCalculator
+from app.utils.date_utils import add_months as scalar_add_months
+
+
+dates = st.dates(min_value=date(1970, 1, 1), max_value=date(2100, 12, 31))
+requests = st.lists(
+    st.tuples(dates, st.one_of(st.none(), dates), st.sampled_from(["serious", "chronic"])),
+    min_size=1,
+    max_size=50,
+)
+
+
+def as_dates(array: np.ndarray) -> list[date]:
+    return array.astype(object).tolist()
+
+
+class TestBatchMatchesScalar:
+    """Property tests: the batch API agrees with DeadlineCalculator element-wise."""
+
+    @given(requests, dates)
+    def test_all_deadlines(self, batch, today):
+        """Every output equals the scalar method for the same request."""
+        starts, notices, conditions = zip(*batch)
+        result = BatchDeadlineCalculator.calculate_all(starts, notices, conditions, as_of=today)
+
+        for i, (start, notice, condition) in enumerate(batch):
+            deadline = DeadlineCalculator.calculate_certification_deadline(start, notice or today)
+            cure_start, cure_end = DeadlineCalculator.calculate_cure_window(deadline)
+            assert as_dates(result["certification_deadline"])[i] == deadline
+            assert as_dates(result["cure_window_start"])[i] == cure_start
+            assert as_dates(result["cure_window_end"])[i] == cure_end
+            assert as_dates(result["recertification_date"])[i] == (
+                DeadlineCalculator.calculate_recertification_date(start, condition)
+            )
+            assert result["days_until_certification_deadline"][i] == (deadline - today).days
+
+    @given(st.lists(dates, min_size=1, max_size=50), st.integers(min_value=-24, max_value=24))
+    def test_add_months_matches_relativedelta(self, start_dates, months):
+        """Month arithmetic clamps to month end exactly like add_months."""
+        result = as_dates(add_months(np.array(start_dates, dtype="datetime64[D]"), months))
+        assert result == [scalar_add_months(d, months) for d in start_dates]
+
+
+class TestBatchEdgeCases:
+    """Test inputs the scalar API never sees."""
+
+    def test_accepts_iso_strings_and_enums(self):
+        """Stored ISO strings and enum values work as inputs."""
+        result = BatchDeadlineCalculator.calculate_recertification_dates(
+            ["2025-01-31", "2025-02-01"], ["chronic", "serious"]
+        )
+        assert as_dates(result) == [date(2025, 7, 31), date(2025, 3, 3)]
+
+    def test_missing_notice_uses_today(self):
+        """None notice dates behave like the scalar default."""
+        today = date(2025, 2, 1)
+        result = BatchDeadlineCalculator.calculate_certification_deadlines(
+            [today + timedelta(days=30)], [None], as_of=today
+        )
+        assert as_dates(result) == [today + timedelta(days=15)]
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+import holidays
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.utils.business_calendar import BusinessCalendar, get_business_calendar, normalize_state
+from app.utils.date_utils import add_business_days, business_days_between, is_business_day
+
+
+def naive_is_business_day(target_date: date, state: str | None = None) -> bool:
+    """The original per-call implementation, as a reference."""
+    if target_date.weekday() in (5, 6):
+        return False
+    return target_date not in holidays.US(years=target_date.year, subdiv=state)
+
+
+def naive_add_business_days(start_date: date, days: int) -> date:
+    current, added = start_date, 0
+    while added < days:
+        current += timedelta(days=1)
+        if naive_is_business_day(current):
+            added += 1
+    return current
+
+
+dates = st.dates(min_value=date(2000, 1, 1), max_value=date(2049, 12, 1))
+
+
+class TestBusinessCalendar:
+    """Test the precomputed calendar against the day-by-day reference."""
+
+    @given(dates)
+    def test_is_business_day(self, day):
+        """Lookups agree with weekday + holidays checks."""
+        assert is_business_day(day) == naive_is_business_day(day)
+
+    @settings(max_examples=50)
+    @given(dates, st.integers(min_value=0, max_value=60))
+    def test_add_business_days(self, start, days):
+        """Bisection gives the same date as looping one day at a time."""
+        assert add_business_days(start, days) == naive_add_business_days(start, days)
+
+    @given(dates, st.integers(min_value=0, max_value=400))
+    def test_between_inverts_add(self, start, days):
+        """Counting business days undoes adding them."""
+        assert business_days_between(start, add_business_days(start, days)) == days
+
+    def test_known_dates(self):
+        """Holidays and weekends are skipped."""
+        # Fri Jul 3 2026 is the observed Independence Day
+        assert add_business_days(date(2026, 7, 2), 1) == date(2026, 7, 6)
+        assert business_days_between(date(2026, 7, 6), date(2026, 7, 2)) == -1
+
+    def test_state_holidays(self):
+        """State calendars add state holidays on top of federal ones."""
+        cesar_chavez_day = date(2025, 3, 31)
+        assert is_business_day(cesar_chavez_day)
+        assert not is_business_day(cesar_chavez_day, state="ca")
+        assert is_business_day(cesar_chavez_day, state="Remote")
+        assert normalize_state(" tx ") == "TX"
+
+    def test_range_extends_on_demand(self):
+        """Dates outside the configured range get a wider cached calendar."""
+        calendar = get_business_calendar(None, date(1995, 6, 1))
+        assert calendar.covers(date(1995, 6, 1))
+        assert get_business_calendar(None, date(1995, 6, 1)) is calendar
+        assert is_business_day(date(1995, 7, 4)) is False
+
+    def test_out_of_range_raises(self):
+        """A calendar refuses to answer outside its years."""
+        calendar = BusinessCalendar(2025, 2025)
+        with pytest.raises(ValueError):
+            calendar.is_business_day(date(2026, 1, 2))
+        with pytest.raises(ValueError):
+            calendar.add_business_days(date(2025, 12, 30), 5)
@@ -0,0 +1,199 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.db.models import ComplianceSnapshotDB
+from app.models.leave_request import LeaveRequest
+from app.main import app
+from app.services import snapshot_refresher
+from app.services.compliance_snapshot import build_snapshot, compute_alerts, next_change_date
+from app.services.snapshot_refresher import SnapshotRefresher
+from app.storage.async_storage import ThreadedStorage
+from app.storage.db_storage import DBStorage
+from app.storage.storage_factory import get_async_storage
+from tests.test_db_storage import DEADLINE_CASES, make_deadline_request
+
+
+def seed_cases(storage):
+    for case in DEADLINE_CASES:
+        storage.create_leave_request(make_deadline_request(*case))
+
+
+class TestNextChangeDate:
+    """Test when a snapshot stops being valid."""
+
+    def test_earliest_threshold_after_as_of(self):
+        """Far-off deadlines stay valid until the low-risk band starts."""
+        request = LeaveRequest(**make_deadline_request("req-1", 0, 60))
+        # Deadline is notice + 15; low risk starts 7 days before it
+        assert next_change_date(request, date.today()) == date.today() + timedelta(days=8)
+
+    def test_no_notice_date_changes_daily(self):
+        """Without a notice date the deadline moves with today."""
+        request = LeaveRequest(**make_deadline_request("req-1", None, 60))
+        assert next_change_date(request, date(2025, 1, 1)) == date(2025, 1, 2)
+
+
+class TestComplianceSnapshot:
+    """Test the compliance_snapshot table behind the alerts endpoint."""
+
+    def test_alerts_match_fresh_computation(self, db_session):
+        """Snapshot-backed alerts equal recomputing every request."""
+        storage = DBStorage(db_session)
+        seed_cases(storage)
+
+        expected = compute_alerts([LeaveRequest(**r) for r in storage.get_all_leave_requests()])
+        alerts = storage.get_compliance_alerts()
+
+        key = lambda alert: alert["request"]["id"]
+        assert sorted(alerts, key=key) == sorted(expected, key=key)
+        assert [a["compliance"]["risk_level"] for a in alerts] == [
+            a["compliance"]["risk_level"] for a in expected
+        ]
+
+    def test_refresh_only_touches_stale_rows(self, db_session):
+        """A same-day refresh is a no-op; later days only redo rows that reached next_change."""
+        storage = DBStorage(db_session)
+        seed_cases(storage)
+        assert storage.refresh_compliance_snapshots() == 0
+
+        next_changes = [s.next_change for s in db_session.query(ComplianceSnapshotDB)]
+        tomorrow = date.today() + timedelta(days=1)
+        due = sum(1 for d in next_changes if d is not None and d <= tomorrow)
+        assert 0 < due < len(next_changes)
+        assert storage.refresh_compliance_snapshots(tomorrow) == due
+
+    def test_alerts_read_leaves_stale_snapshot_alone(self, db_session):
+        """Stale or missing snapshots are evaluated in memory, not rewritten, on read."""
+        storage = DBStorage(db_session)
+        seed_cases(storage)
+        expected = compute_alerts([LeaveRequest(**r) for r in storage.get_all_leave_requests()])
+        db_session.query(ComplianceSnapshotDB).filter_by(request_id="due-soon").delete()
+        db_session.query(ComplianceSnapshotDB).filter(
+            ComplianceSnapshotDB.request_id != "overdue"
+        ).update({"next_change": date.today()})
+        db_session.commit()
+
+        key = lambda alert: alert["request"]["id"]
+        alerts = storage.get_compliance_alerts()
+        assert sorted(alerts, key=key) == sorted(expected, key=key)
+        assert [a["compliance"]["risk_level"] for a in alerts] == [
+            a["compliance"]["risk_level"] for a in expected
+        ]
+        assert db_session.query(ComplianceSnapshotDB).count() == len(DEADLINE_CASES) - 1
+        assert storage.refresh_compliance_snapshots() == len(DEADLINE_CASES) - 1
+        assert storage.get_compliance_alerts() == alerts
+
+    def test_writes_refresh_snapshot(self, db_session):
+        """Updating a request rewrites its snapshot; deleting removes it."""
+        storage = DBStorage(db_session)
+        storage.create_leave_request(make_deadline_request("req-1", -10, 20))
+        assert [a["request"]["id"] for a in storage.get_compliance_alerts()] == ["req-1"]
+
+        storage.update_leave_request("req-1", {
+            "medical_provider": {"name": "Dr. John Smith", "signature_present": True},
+        })
+        assert storage.get_compliance_alerts() == []
+
+        storage.delete_leave_request("req-1")
+        assert db_session.query(ComplianceSnapshotDB).count() == 0
+
+
+class TestAsOf:
+    """Test evaluating compliance on an explicit as_of date."""
+
+    def test_snapshot_constant_until_next_change(self):
+        """Every day before next_change yields the same snapshot, bar days_until."""
+        as_of = date(2025, 3, 1)
+        for case in DEADLINE_CASES:
+            request = LeaveRequest(**make_deadline_request(*case))
+            first = build_snapshot(request, as_of)
+            first["compliance"].pop("days_until_certification_deadline")
+            end = first["next_change"] or as_of + timedelta(days=120)
+
+            day = as_of + timedelta(days=1)
+            while day < end:
+                later = build_snapshot(request, day)
+                later["compliance"].pop("days_until_certification_deadline")
+                for column in ("at_risk", "risk_rank", "compliance", "at_risk_events"):
+                    assert later[column] == first[column], (case[0], day, column)
+                day += timedelta(days=1)
+
+    def test_alerts_for_other_day_leave_snapshot_alone(self, db_session):
+        """Alerts for a past or future day are computed fresh, not from the snapshot."""
+        storage = DBStorage(db_session)
+        seed_cases(storage)
+        requests = [LeaveRequest(**r) for r in storage.get_all_leave_requests()]
+        snapshot_days = {s.as_of for s in db_session.query(ComplianceSnapshotDB)}
+
+        for offset in (-20, 5, 40):
+            as_of = date.today() + timedelta(days=offset)
+            key = lambda alert: alert["request"]["id"]
+            assert sorted(storage.get_compliance_alerts(as_of), key=key) == sorted(
+                compute_alerts(requests, as_of), key=key
+            )
+
+        assert {s.as_of for s in db_session.query(ComplianceSnapshotDB)} == snapshot_days
+
+
+class TestSnapshotRefresher:
+    """Test the daily snapshot refresh, which runs without the reminder scheduler."""
+
+    @pytest.fixture
+    def storage(self, db_session, monkeypatch):
+        storage = DBStorage(db_session)
+        seed_cases(storage)
+
+        @asynccontextmanager
+        async def open_storage():
+            yield ThreadedStorage(storage)
+
+        monkeypatch.setattr(snapshot_refresher, "open_storage", open_storage)
+        return storage
+
+    def test_startup_refreshes_with_scheduler_disabled(self, storage, monkeypatch):
+        """The app starts the refresher even though reminders are off."""
+        tomorrow = date.today() + timedelta(days=1)
+        due = len(storage._stale_snapshot_requests(tomorrow))
+        monkeypatch.setattr(main.settings, "USE_DATABASE", True)
+        monkeypatch.setattr(main.settings, "ASYNC_DATABASE", False)
+        monkeypatch.setattr(main.settings, "NOTIFICATION_SCHEDULER_ENABLED", False)
+        monkeypatch.setattr(main.settings, "NOTIFICATION_DELIVERY_ENABLED", False)
+        monkeypatch.setattr(main, "init_db", lambda: None)
+        monkeypatch.setattr(main, "refresher", SnapshotRefresher(interval_seconds=0.01, as_of=tomorrow))
+
+        async def body():
+            await main.startup_event()
+            while not main.refresher.runs:
+                await asyncio.sleep(0.01)
+            running = main.refresher.running, main.scheduler.running
+            await main.shutdown_event()
+            return running
+
+        assert asyncio.run(asyncio.wait_for(body(), timeout=5)) == (True, False)
+        assert 0 < due == main.refresher.runs[0]["snapshots_refreshed"]
+        assert storage._stale_snapshot_requests(tomorrow) == []
+
+    def test_sweep_endpoint_refreshes(self, storage):
+        """Running the sweep on demand also refreshes the day's snapshots."""
+        tomorrow = date.today() + timedelta(days=1)
+        due = len(storage._stale_snapshot_requests(tomorrow))
+
+        async def override():
+            yield ThreadedStorage(storage)
+
+        app.dependency_overrides[get_async_storage] = override
+        try:
+            response = TestClient(app).post(
+                "/api/notifications/sweep", params={"as_of": tomorrow.isoformat()}
+            )
+        finally:
+            app.dependency_overrides.pop(get_async_storage, None)
+
+        assert response.status_code == 201
+        assert 0 < response.json()["snapshots_refreshed"] == due
+        assert storage._stale_snapshot_requests(tomorrow) == []
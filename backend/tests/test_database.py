@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.config import settings
+from app.db.database import create_db_engine, is_sqlite_memory
+
+
+class TestSQLiteEngine:
+    """Test the tuned SQLite engine profile."""
+
+    def test_file_database_uses_pool_and_pragmas(self, tmp_path):
+        """File-based SQLite gets a QueuePool and the WAL pragmas."""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        try:
+            assert isinstance(engine.pool, QueuePool)
+            assert engine.pool.size() == settings.DB_POOL_SIZE
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                # NORMAL == 1
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+                assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+                assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        finally:
+            engine.dispose()
+
+    def test_memory_database_keeps_static_pool(self):
+        """In-memory SQLite shares one connection so data stays visible."""
+        engine = create_db_engine("sqlite://")
+        try:
+            assert isinstance(engine.pool, StaticPool)
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+            with engine.connect() as conn:
+                assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+        finally:
+            engine.dispose()
+
+    @staticmethod
+    def read_during_exclusive_write(tmp_path, monkeypatch, journal_mode: str):
+        """
+        Count rows from one connection while another holds an exclusive write lock.
+
+        BEGIN EXCLUSIVE takes the lock a rollback-journal commit needs, which
+        readers must wait for; an uncommitted INSERT alone only holds RESERVED,
+        which readers never wait on in any journal mode.
+        """
+        monkeypatch.setattr(settings, "SQLITE_JOURNAL_MODE", journal_mode)
+        monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 100)
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        try:
+            with engine.begin() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == journal_mode.lower()
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+
+            writer = engine.raw_connection()
+            writer.driver_connection.isolation_level = None  # issue BEGIN ourselves
+            try:
+                writer.execute("BEGIN EXCLUSIVE")
+                writer.execute("INSERT INTO t VALUES (2)")
+                with engine.connect() as reader:
+                    return reader.execute(text("SELECT COUNT(*) FROM t")).scalar()
+            finally:
+                writer.execute("ROLLBACK")
+                writer.close()
+        finally:
+            engine.dispose()
+
+    def test_wal_reader_not_blocked_by_exclusive_write(self, tmp_path, monkeypatch):
+        """Under WAL a reader sees the last committed state during an exclusive write."""
+        assert self.read_during_exclusive_write(tmp_path, monkeypatch, "WAL") == 1
+
+    def test_rollback_journal_reader_blocked_by_exclusive_write(self, tmp_path, monkeypatch):
+        """The same read fails under the rollback journal, so WAL is what makes it work."""
+        with pytest.raises(OperationalError, match="database is locked"):
+            self.read_during_exclusive_write(tmp_path, monkeypatch, "DELETE")
+
+    def test_is_sqlite_memory(self):
+        """Memory URLs are told apart from file URLs."""
+        assert is_sqlite_memory("sqlite://")
+        assert is_sqlite_memory("sqlite:///:memory:")
+        assert is_sqlite_memory("sqlite+aiosqlite://")
+        assert not is_sqlite_memory("sqlite:///./data/fmla_tracker.db")
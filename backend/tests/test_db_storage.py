@@ -0,0 +1,353 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db.models import LeaveRequestDB
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.services.compliance_checker import ComplianceChecker
+from app.models.notification import NotificationType
+from app.storage.db_storage import DBStorage
+from app.storage.pagination import InvalidCursorError, split_page
+from app.storage.json_storage import JSONStorage
+from app.storage import json_storage
+
+
+def make_leave_request(request_id: str, status: str = "pending", created_at: date = date(2025, 1, 1)) -> dict:
+    return {
+        "id": request_id,
+        "employee": {"name": "Jane Doe", "ssn_last4": "1234", "phone": "5555555555"},
+        "leave": {
+            "start_date": "2025-02-20",
+            "end_date": "2025-04-01",
+            "intermittent": False,
+            "condition_type": "serious",
+        },
+        "medical_provider": {"name": "Dr. John Smith", "signature_present": False},
+        "compliance_flags": [],
+        "fmla_eligible": True,
+        "status": status,
+        "notice_date": date(2025, 2, 1),
+        "created_at": created_at,
+    }
+
+
+def make_notification(notification_id: str, request_id: str, created_at: datetime,
+                      notification_type: str = "certification_due", read: bool = False) -> dict:
+    return {
+        "id": notification_id,
+        "request_id": request_id,
+        "type": notification_type,
+        "recipient": "jane.doe@example.com",
+        "subject": "Subject",
+        "body": "Body",
+        "created_at": created_at,
+        "read_status": read,
+    }
+
+
+def seed(storage, json_dates: bool = False):
+    """Create the same small dataset in any storage backend."""
+    convert = (lambda value: value.isoformat()) if json_dates else (lambda value: value)
+    for request_id, status, day in [
+        ("req-1", "pending", 1), ("req-2", "approved", 2), ("req-3", "pending", 3)
+    ]:
+        record = make_leave_request(request_id, status, date(2025, 1, day))
+        record["notice_date"] = convert(record["notice_date"])
+        record["created_at"] = convert(record["created_at"])
+        storage.create_leave_request(record)
+
+    for notification_id, request_id, hour, notification_type, read in [
+        ("n-1", "req-1", 9, "certification_due", False),
+        ("n-2", "req-1", 11, "cure_window", True),
+        ("n-3", "req-2", 10, "certification_due", False),
+        ("n-4", "req-1", 12, "certification_due", False),
+    ]:
+        record = make_notification(
+            notification_id, request_id, datetime(2025, 1, 5, hour), notification_type, read
+        )
+        record["created_at"] = convert(record["created_at"])
+        storage.create_notification(record)
+
+
+@pytest.fixture(params=["db", "json"])
+def storage(request, db_session, tmp_path):
+    """Each storage backend, seeded with the same data."""
+    if request.param == "db":
+        backend = DBStorage(db_session)
+        seed(backend)
+    else:
+        json_storage._file_cache.clear()
+        backend = JSONStorage(data_dir=str(tmp_path))
+        seed(backend, json_dates=True)
+    yield backend
+    json_storage._file_cache.clear()
+
+
+class TestQueryMethods:
+    """Test filtered, sorted and limited list queries on every backend."""
+
+    def test_status_filter(self, storage):
+        """Only requests with the given status are returned."""
+        result = storage.query_leave_requests(status=LeaveStatus.PENDING)
+        assert [r["id"] for r in result] == ["req-1", "req-3"]
+
+    def test_leave_request_order_and_limit(self, storage):
+        """Requests sort by created_at descending and respect the limit."""
+        result = storage.query_leave_requests(order_by="-created_at", limit=2)
+        assert [r["id"] for r in result] == ["req-3", "req-2"]
+
+    def test_notification_filters(self, storage):
+        """Type and unread filters combine."""
+        result = storage.query_notifications(
+            notification_type=NotificationType.CERTIFICATION_DUE,
+            unread_only=True,
+            order_by="-created_at"
+        )
+        assert [n["id"] for n in result] == ["n-4", "n-3", "n-1"]
+
+    def test_notifications_for_request_newest_first(self, storage):
+        """Per-request listing is ordered newest first."""
+        result = storage.query_notifications(request_id="req-1", order_by="-created_at")
+        assert [n["id"] for n in result] == ["n-4", "n-2", "n-1"]
+
+    def test_unsupported_order_by(self, storage):
+        """Unknown sort fields are rejected rather than ignored."""
+        with pytest.raises(ValueError):
+            storage.query_notifications(order_by="recipient")
+
+
+class TestKeysetPagination:
+    """Test cursor pagination on every backend."""
+
+    def walk(self, fetch, limit: int) -> list[list[str]]:
+        """Follow cursors until the last page, returning ids per page."""
+        pages, cursor = [], None
+        while True:
+            rows, cursor = split_page(fetch(limit=limit + 1, cursor=cursor), limit)
+            pages.append([row["id"] for row in rows])
+            if cursor is None:
+                return pages
+
+    def test_notification_pages_cover_everything_once(self, storage):
+        """Pages are newest first, disjoint, and end without a cursor."""
+        pages = self.walk(
+            lambda **kw: storage.query_notifications(order_by="-created_at", **kw),
+            limit=3
+        )
+        assert pages == [["n-4", "n-2", "n-3"], ["n-1"]]
+
+    def test_ties_on_created_at_break_on_id(self, storage):
+        """Rows sharing a created_at value are neither skipped nor repeated."""
+        for request_id in ("req-5", "req-4"):
+            record = make_leave_request(request_id, created_at=date(2025, 1, 3))
+            if isinstance(storage, JSONStorage):
+                record["notice_date"] = record["notice_date"].isoformat()
+                record["created_at"] = record["created_at"].isoformat()
+            storage.create_leave_request(record)
+
+        pages = self.walk(
+            lambda **kw: storage.query_leave_requests(order_by="-created_at", **kw),
+            limit=2
+        )
+        assert pages == [["req-5", "req-4"], ["req-3", "req-2"], ["req-1"]]
+
+    def test_cursor_combines_with_filters(self, storage):
+        """Filters still apply on later pages."""
+        first, cursor = split_page(
+            storage.query_notifications(request_id="req-1", order_by="-created_at", limit=2),
+            1
+        )
+        rest = storage.query_notifications(request_id="req-1", order_by="-created_at", cursor=cursor)
+        assert [n["id"] for n in first] == ["n-4"]
+        assert [n["id"] for n in rest] == ["n-2", "n-1"]
+
+    def test_malformed_cursor(self, storage):
+        """A garbage cursor is reported as such."""
+        with pytest.raises(InvalidCursorError):
+            storage.query_notifications(order_by="-created_at", cursor="not-a-cursor")
+
+
+class TestSingleStatementWrites:
+    """Test the UPDATE ... RETURNING and DELETE-by-id write paths."""
+
+    def test_update_returns_row(self, storage):
+        """Updates return the new row, or None for a missing id."""
+        updated = storage.update_leave_request("req-1", {"status": "approved"})
+        assert updated["status"] == "approved"
+        assert storage.get_leave_request_by_id("req-1")["status"] == "approved"
+        assert storage.update_leave_request("missing", {"status": "approved"}) is None
+
+    def test_mark_read_and_unread(self, storage):
+        """Read status flips in one write and round-trips."""
+        assert storage.mark_notification_as_read("n-1")["read_status"] is True
+        assert storage.mark_notification_as_unread("n-1")["read_status"] is False
+        assert storage.mark_notification_as_read("missing") is None
+
+    def test_delete_by_id(self, storage):
+        """Deletes report whether a row existed."""
+        assert storage.delete_notification("n-1") is True
+        assert storage.delete_notification("n-1") is False
+        assert storage.get_notification_by_id("n-1") is None
+
+    def test_leave_request_delete_cascades(self, db_session):
+        """The database removes a deleted request's notifications."""
+        backend = DBStorage(db_session)
+        seed(backend)
+        assert backend.delete_leave_request("req-1") is True
+        assert backend.delete_leave_request("req-1") is False
+        assert backend.get_notifications_by_request_id("req-1") == []
+
+    def test_update_without_returning_support(self, db_session, monkeypatch):
+        """Dialects without UPDATE ... RETURNING fall back to UPDATE + SELECT."""
+        backend = DBStorage(db_session)
+        seed(backend)
+        monkeypatch.setattr(db_session.get_bind().dialect, "update_returning", False)
+        updated = backend.update_leave_request("req-2", {"notice_date": "2025-03-01"})
+        assert updated["notice_date"] == "2025-03-01"
+        assert backend.update_leave_request("missing", {"status": "denied"}) is None
+
+
+class TestBulkNotificationOperations:
+    """Test bulk read-status and delete operations."""
+
+    def test_mark_all_unread_for_request(self, storage):
+        """Only unread notifications of the selected request change."""
+        assert storage.mark_notifications_as_read(request_id="req-1") == 2
+        assert storage.mark_notifications_as_read(request_id="req-1") == 0
+        assert [n["id"] for n in storage.query_notifications(unread_only=True)] == ["n-3"]
+
+    def test_selection_by_ids_and_type(self, storage):
+        """Criteria combine; unknown ids are ignored."""
+        changed = storage.mark_notifications_as_read(
+            notification_ids=["n-1", "n-3", "missing"], notification_type="certification_due"
+        )
+        assert changed == 2
+        assert storage.mark_notifications_as_unread(notification_ids=["n-1", "n-2"]) == 2
+        unread = {n["id"] for n in storage.query_notifications(unread_only=True)}
+        assert unread == {"n-1", "n-2", "n-4"}
+
+    def test_empty_selection_covers_everything(self, storage):
+        """No criteria marks every notification."""
+        assert storage.mark_notifications_as_read() == 3
+        assert storage.query_notifications(unread_only=True) == []
+
+    def test_delete_notifications(self, storage):
+        """Bulk delete honours the selection and read_only."""
+        assert storage.delete_notifications(request_id="req-1", read_only=True) == 1
+        assert storage.get_notification_by_id("n-2") is None
+        assert storage.delete_notifications(notification_ids=["n-1", "n-3"]) == 2
+        assert [n["id"] for n in storage.get_all_notifications()] == ["n-4"]
+        assert storage.delete_notifications(notification_ids=[]) == 0
+
+
+def make_deadline_request(request_id: str, notice_offset: int | None, start_offset: int,
+                          signed: bool = False, flags: list[str] | None = None) -> dict:
+    """Leave request whose deadlines are relative to today."""
+    today = date.today()
+    record = make_leave_request(request_id)
+    record["leave"] = dict(
+        record["leave"],
+        start_date=(today + timedelta(days=start_offset)).isoformat(),
+        end_date=(today + timedelta(days=start_offset + 30)).isoformat(),
+    )
+    record["medical_provider"] = dict(record["medical_provider"], signature_present=signed)
+    record["compliance_flags"] = flags or []
+    record["notice_date"] = today + timedelta(days=notice_offset) if notice_offset is not None else None
+    return record
+
+
+# (request_id, notice offset, start offset, signed, flags) relative to today
+DEADLINE_CASES = [
+    ("overdue", -30, 5, False, None),
+    ("overdue-complete", -30, 5, True, None),
+    ("due-soon", -10, 20, False, None),
+    ("due-soon-complete", -10, 20, True, None),
+    ("due-soon-flagged", -10, 20, True, ["missing_physician_phone"]),
+    ("far-off", 0, 60, False, None),
+    ("no-notice", None, 3, False, None),
+    ("no-notice-complete", None, 3, True, None),
+    ("no-notice-started", None, -2, True, None),
+    ("no-notice-far-off", None, 40, False, None),
+]
+
+
+class TestDeadlineColumns:
+    """Test the denormalized deadline columns and SQL at-risk filter."""
+
+    def seed_cases(self, storage, json_dates: bool):
+        for case in DEADLINE_CASES:
+            record = make_deadline_request(*case)
+            if json_dates and record["notice_date"] is not None:
+                record["notice_date"] = record["notice_date"].isoformat()
+                record["created_at"] = record["created_at"].isoformat()
+            storage.create_leave_request(record)
+
+    @pytest.mark.parametrize("backend", ["db", "json"])
+    def test_at_risk_matches_compliance_checker(self, backend, db_session, tmp_path):
+        """The storage at-risk filter agrees with ComplianceChecker."""
+        if backend == "db":
+            storage = DBStorage(db_session)
+        else:
+            json_storage._file_cache.clear()
+            storage = JSONStorage(data_dir=str(tmp_path))
+        self.seed_cases(storage, json_dates=backend == "json")
+
+        checker = ComplianceChecker()
+        expected = {
+            r["id"] for r in storage.get_all_leave_requests()
+            if checker.check_compliance(LeaveRequest(**r)).at_risk
+        }
+        at_risk = {r["id"] for r in storage.query_leave_requests(at_risk_as_of=date.today())}
+
+        assert at_risk == expected
+        assert {"no-notice", "no-notice-started"} <= at_risk
+
+    @pytest.mark.parametrize("backend", ["db", "json"])
+    def test_at_risk_pages_are_full(self, backend, db_session, tmp_path):
+        """Paging the at-risk filter returns full pages, requests without notice included."""
+        if backend == "db":
+            storage = DBStorage(db_session)
+        else:
+            json_storage._file_cache.clear()
+            storage = JSONStorage(data_dir=str(tmp_path))
+        self.seed_cases(storage, json_dates=backend == "json")
+
+        pages, cursor = [], None
+        while True:
+            rows = storage.query_leave_requests(
+                at_risk_as_of=date.today(), order_by="-created_at", limit=3, cursor=cursor
+            )
+            page, cursor = split_page(rows, 2)
+            pages.append([r["id"] for r in page])
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [2, 2, 2]
+        assert {i for page in pages for i in page} == {
+            "overdue", "overdue-complete", "due-soon", "due-soon-flagged",
+            "no-notice", "no-notice-started"
+        }
+
+    def test_columns_follow_updates(self, db_session):
+        """Updating a deadline input recomputes the stored columns."""
+        storage = DBStorage(db_session)
+        storage.create_leave_request(make_deadline_request("req-1", -10, 20))
+        row = db_session.get(LeaveRequestDB, "req-1")
+        assert row.certification_deadline == date.today() + timedelta(days=5)
+        assert row.certification_complete is False
+
+        storage.update_leave_request("req-1", {
+            "notice_date": (date.today() + timedelta(days=1)).isoformat(),
+            "medical_provider": {"name": "Dr. John Smith", "signature_present": True},
+        })
+        db_session.expire_all()
+        row = db_session.get(LeaveRequestDB, "req-1")
+        assert row.certification_deadline == date.today() + timedelta(days=16)
+        assert row.cure_window_end == date.today() + timedelta(days=23)
+        assert row.certification_complete is True
+
+    def test_deadline_before(self, storage):
+        """deadline_before is a range filter on the certification deadline."""
+        # Seeded requests: notice Feb 1, start Feb 20 -> deadline Feb 16
+        assert len(storage.query_leave_requests(deadline_before=date(2025, 2, 17))) == 3
+        assert storage.query_leave_requests(deadline_before=date(2025, 2, 16)) == []
@@ -223,6 +223,19 @@ class TestDeadlineStatus:
         target = date.today()
         assert DeadlineCalculator.calculate_days_until(target) == 0
 
+    def test_status_methods_use_as_of(self):
+        """An explicit as_of replaces today in every status check."""
+        as_of = date(2025, 3, 10)
+        deadline = date(2025, 3, 12)
+
+        assert DeadlineCalculator.calculate_days_until(deadline, as_of) == 2
+        assert DeadlineCalculator.is_approaching_deadline(deadline, 3, as_of)
+        assert not DeadlineCalculator.is_overdue(deadline, as_of)
+        assert DeadlineCalculator.is_overdue(deadline, as_of + timedelta(days=3))
+        assert DeadlineCalculator.calculate_certification_deadline(
+            date(2025, 6, 1), as_of=as_of
+        ) == date(2025, 3, 25)
+
 
 class TestEdgeCases:
     """Test edge cases and boundary conditions."""
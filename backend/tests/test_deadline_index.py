@@ -0,0 +1,148 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.leave_request import LeaveRequest
+from app.models.notification import NotificationType
+from app.services.compliance_snapshot import compute_alerts
+from app.services.deadline_index import DeadlineIndex, deadline_events
+from app.services.notification_service import NotificationService
+from app.storage import json_storage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_db_storage import DEADLINE_CASES, make_deadline_request
+
+
+def brute_force(records, start, end, event_types=None):
+    """Scan every record's events, as the sweeps did before the index."""
+    return sorted(
+        (day, record["id"], event_type)
+        for record in records
+        for day, event_type in deadline_events(record)
+        if (start is None or start <= day) and day <= end
+        and (event_types is None or event_type in event_types)
+    )
+
+
+@pytest.fixture
+def records():
+    return [make_deadline_request(*case) for case in DEADLINE_CASES]
+
+
+@pytest.fixture(params=["db", "json", "ndjson"])
+def storage(request, db_session, tmp_path):
+    json_storage._file_cache.clear()
+    return {
+        "db": lambda: DBStorage(db_session),
+        "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+        "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+    }[request.param]()
+
+
+class TestDeadlineIndex:
+    """Test the in-memory day-bucketed index."""
+
+    def test_due_between_matches_full_scan(self, records):
+        """Every window returns exactly the events a full scan finds."""
+        index = DeadlineIndex(records)
+        today = date.today()
+        for start_offset, length in [(-40, 10), (-5, 5), (0, 0), (0, 30), (10, 100)]:
+            start = today + timedelta(days=start_offset)
+            end = start + timedelta(days=length)
+            assert index.due_between(start, end) == brute_force(records, start, end)
+        assert index.due_between(None, today, ["certification_deadline"]) == brute_force(
+            records, None, today, {"certification_deadline"}
+        )
+        assert index.crossing_today(today) == brute_force(records, today, today)
+
+    def test_upsert_and_remove(self, records):
+        """Re-indexing moves a request's dates; removal empties its days."""
+        index = DeadlineIndex(records)
+        moved = dict(records[0], notice_date=date.today() + timedelta(days=200))
+        index.upsert(moved)
+        assert index.due_between(None, date.max) == brute_force([moved] + records[1:], None, date.max)
+
+        for record in records:
+            index.remove(record["id"])
+        assert len(index) == 0
+        assert index.due_between(None, date.max) == []
+        assert index._days == []
+
+    def test_floating_requests(self, records):
+        """Requests without a notice date are tracked separately."""
+        index = DeadlineIndex(records)
+        no_notice = {case[0] for case in DEADLINE_CASES if case[1] is None}
+        assert index.floating_ids == no_notice
+        index.remove("no-notice")
+        assert index.floating_ids == no_notice - {"no-notice"}
+
+
+class TestStorageDueBetween:
+    """Test due_between and the index-backed sweeps on every backend."""
+
+    def seed(self, storage, records):
+        for record in records:
+            storage.create_leave_request(dict(record))
+
+    def test_matches_full_scan_through_writes(self, storage, records):
+        """Create, update and delete keep due_between current."""
+        self.seed(storage, records)
+        storage.due_between(None, date.max)  # build the index before the writes
+
+        storage.update_leave_request("far-off", {"notice_date": date.today() - timedelta(days=3)})
+        storage.delete_leave_request("overdue")
+
+        current = storage.get_all_leave_requests()
+        for start, end in [(None, date.max), (date.today(), date.today() + timedelta(days=14))]:
+            assert [tuple(e) for e in storage.due_between(start, end)] == brute_force(current, start, end)
+
+    def test_get_leave_requests_by_ids(self, storage, records):
+        """Requests come back in the requested order, unknown ids skipped."""
+        self.seed(storage, records)
+        fetched = storage.get_leave_requests_by_ids(["far-off", "missing", "overdue"])
+        assert [r["id"] for r in fetched] == ["far-off", "overdue"]
+
+    def test_alerts_match_fresh_computation(self, storage, records):
+        """Index-narrowed alerts equal checking every request."""
+        self.seed(storage, records)
+        requests = [LeaveRequest(**r) for r in storage.get_all_leave_requests()]
+        key = lambda alert: alert["request"]["id"]
+        for offset in (0, 5, -20):
+            as_of = date.today() + timedelta(days=offset)
+            assert sorted(storage.get_compliance_alerts(as_of), key=key) == sorted(
+                compute_alerts(requests, as_of), key=key
+            )
+
+    def test_index_rebuilt_after_external_change(self, tmp_path, records):
+        """A file rewritten behind the cache's back is re-indexed."""
+        json_storage._file_cache.clear()
+        storage = JSONStorage(data_dir=str(tmp_path))
+        self.seed(storage, records)
+        assert storage.due_between(None, date.max)
+
+        # Another process empties the file
+        storage._write_json(storage.leave_requests_file, [])
+        assert storage.due_between(None, date.max) == []
+
+
+class TestNotificationSweep:
+    """Test reminder generation from indexed events."""
+
+    def test_reminders_for_due_events(self, storage):
+        """Only incomplete certifications get certification/cure reminders."""
+        today = date.today()
+        # Deadline (notice + 15) lands 3 days out for both
+        storage.create_leave_request(make_deadline_request("incomplete", -12, 30))
+        storage.create_leave_request(make_deadline_request("complete", -12, 30, signed=True))
+
+        due = []
+        for event_type, first, last in NotificationService.reminder_windows(today):
+            due += storage.due_between(first, last, [event_type])
+        requests = storage.get_leave_requests_by_ids(["incomplete", "complete"])
+        notifications = NotificationService().render_due_notifications(requests, due)
+
+        assert [(n["request_id"], n["type"]) for n in notifications] == [
+            ("incomplete", NotificationType.CERTIFICATION_DUE.value)
+        ]
+        assert str(today + timedelta(days=3)) in notifications[0]["body"]
@@ -0,0 +1,351 @@
+import json
+import multiprocessing
+import os
+import stat
+import threading
+
+import pytest
+
+from app.storage import json_storage
+from app.storage.file_utils import atomic_write
+from app.storage.json_storage import JSONStorage
+
+
+def make_notification(notification_id: str, request_id: str) -> dict:
+    return {
+        "id": notification_id,
+        "request_id": request_id,
+        "type": "certification_due",
+        "recipient": "jane.doe@example.com",
+        "subject": "FMLA Certification Due in 3 Days",
+        "body": "Reminder",
+        "created_at": "2025-02-13T10:00:00",
+        "read_status": False,
+    }
+
+
+def write_many(data_dir: str, worker: int, count: int, journal: bool):
+    """Create and update notifications from a separate process."""
+    json_storage._file_cache.clear()
+    storage = JSONStorage(data_dir=data_dir, journal=journal, compact_threshold=4096)
+    for i in range(count):
+        notification_id = f"n-{worker}-{i}"
+        storage.create_notification(make_notification(notification_id, f"req-{worker}"))
+        storage.mark_notification_as_read(notification_id)
+    for thread in threading.enumerate():
+        if thread.name.startswith("compact-"):
+            thread.join(timeout=10)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    json_storage._file_cache.clear()
+    yield JSONStorage(data_dir=str(tmp_path))
+    json_storage._file_cache.clear()
+
+
+class TestIndexedCache:
+    """Test the in-memory indexed cache behind JSONStorage."""
+
+    def test_lookups_by_id_and_request_id(self, storage):
+        """Id and request_id lookups are served from the indexes."""
+        storage.create_notification(make_notification("n-1", "req-1"))
+        storage.create_notification(make_notification("n-2", "req-1"))
+        storage.create_notification(make_notification("n-3", "req-2"))
+
+        assert storage.get_notification_by_id("n-2")["request_id"] == "req-1"
+        assert storage.get_notification_by_id("missing") is None
+        assert [n["id"] for n in storage.get_notifications_by_request_id("req-1")] == ["n-1", "n-2"]
+        assert storage.get_notifications_by_request_id("req-3") == []
+
+    def test_repeated_reads_do_not_reparse(self, storage, monkeypatch):
+        """Reads of an unchanged file never touch the JSON parser."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+
+        calls = []
+        original = JSONStorage._read_json
+        monkeypatch.setattr(
+            JSONStorage, "_read_json",
+            lambda self, path: calls.append(path) or original(self, path)
+        )
+
+        for _ in range(5):
+            assert storage.get_leave_request_by_id("req-1")["status"] == "pending"
+            storage.get_all_leave_requests()
+
+        assert calls == []
+
+    def test_external_change_invalidates_cache(self, storage):
+        """A file rewritten behind our back is re-parsed."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        assert storage.get_leave_request_by_id("req-1") is not None
+
+        # Simulate another process rewriting the file
+        with open(storage.leave_requests_file, "w") as f:
+            json.dump([{"id": "req-2", "status": "approved", "padding": "x"}], f)
+
+        assert storage.get_leave_request_by_id("req-1") is None
+        assert storage.get_leave_request_by_id("req-2")["status"] == "approved"
+
+    def test_returned_records_are_copies(self, storage):
+        """Mutating a returned record must not corrupt the cache."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+
+        record = storage.get_leave_request_by_id("req-1")
+        record["status"] = "denied"
+
+        assert storage.get_leave_request_by_id("req-1")["status"] == "pending"
+
+    def test_nested_fields_are_copies(self, storage):
+        """Nested dicts are copied too, on the way in and on the way out."""
+        request = {"id": "req-1", "leave": {"start_date": "2025-02-20"}}
+        created = storage.create_leave_request(request)
+        request["leave"]["start_date"] = "2099-01-01"
+        created["leave"]["start_date"] = "2099-01-01"
+        for record in (
+            storage.get_leave_request_by_id("req-1"),
+            storage.get_leave_requests_by_ids(["req-1"])[0],
+            storage.get_all_leave_requests()[0],
+        ):
+            record["leave"]["start_date"] = "2099-01-01"
+
+        notification = dict(make_notification("n-1", "req-1"), params={"days": 3})
+        created_notification = storage.create_notification(notification)
+        notification["params"]["days"] = 0
+        created_notification["params"]["days"] = 0
+        storage.get_notification_by_id("n-1")["params"]["days"] = 0
+
+        assert storage.get_leave_request_by_id("req-1")["leave"] == {"start_date": "2025-02-20"}
+        assert storage.get_notification_by_id("n-1")["params"] == {"days": 3}
+
+    def test_update_and_delete_keep_indexes_current(self, storage):
+        """Writes keep the indexes and the file in sync."""
+        storage.create_notification(make_notification("n-1", "req-1"))
+        storage.create_notification(make_notification("n-2", "req-1"))
+
+        updated = storage.mark_notification_as_read("n-1")
+        assert updated["read_status"] is True
+        assert storage.get_notifications_by_request_id("req-1")[0]["read_status"] is True
+
+        storage.update_notification("n-2", {"request_id": "req-9"})
+        assert [n["id"] for n in storage.get_notifications_by_request_id("req-9")] == ["n-2"]
+
+        assert storage.delete_notification("n-1") is True
+        assert storage.delete_notification("n-1") is False
+        assert storage.get_notification_by_id("n-1") is None
+        assert storage.get_notifications_by_request_id("req-1") == []
+
+        # Changes reach the file, not just the cache
+        with open(storage.notifications_file) as f:
+            assert [n["id"] for n in json.load(f)] == ["n-2"]
+
+
+@pytest.fixture
+def journaled(tmp_path):
+    json_storage._file_cache.clear()
+    yield JSONStorage(data_dir=str(tmp_path), journal=True, compact_threshold=10_000_000)
+    json_storage._file_cache.clear()
+
+
+class TestJournal:
+    """Test the append-only journal mode."""
+
+    def test_writes_append_to_journal_without_rewriting_snapshot(self, journaled):
+        """Mutations land in the journal; the snapshot file is untouched."""
+        snapshot_before = journaled.notifications_file.read_text()
+
+        journaled.create_notification(make_notification("n-1", "req-1"))
+        journaled.create_notification(make_notification("n-2", "req-1"))
+        journaled.mark_notification_as_read("n-1")
+        journaled.delete_notification("n-2")
+
+        assert journaled.notifications_file.read_text() == snapshot_before
+        journal_lines = journaled._journal_path(journaled.notifications_file).read_text().splitlines()
+        assert [json.loads(line)["op"] for line in journal_lines] == ["put", "put", "put", "delete"]
+
+    def test_bulk_operations_append_once(self, journaled, tmp_path):
+        """A bulk change is one journal append covering every record."""
+        for i in range(5):
+            journaled.create_notification(make_notification(f"n-{i}", "req-1"))
+        journal_path = journaled._journal_path(journaled.notifications_file)
+        size_before = journal_path.stat().st_size
+
+        assert journaled.mark_notifications_as_read(request_id="req-1") == 5
+        assert journaled.delete_notifications(notification_ids=["n-0", "n-1"]) == 2
+
+        new_lines = journal_path.read_bytes()[size_before:].decode().splitlines()
+        assert [json.loads(line)["op"] for line in new_lines] == ["put"] * 5 + ["delete"] * 2
+
+        json_storage._file_cache.clear()
+        reader = JSONStorage(data_dir=str(tmp_path))
+        assert [n["read_status"] for n in reader.get_all_notifications()] == [True] * 3
+
+    def test_journal_is_replayed_on_load(self, journaled, tmp_path):
+        """A fresh process sees snapshot plus journal."""
+        journaled.create_notification(make_notification("n-1", "req-1"))
+        journaled.create_notification(make_notification("n-2", "req-1"))
+        journaled.mark_notification_as_read("n-1")
+        journaled.delete_notification("n-2")
+
+        json_storage._file_cache.clear()
+        reader = JSONStorage(data_dir=str(tmp_path))
+
+        notifications = reader.get_all_notifications()
+        assert [n["id"] for n in notifications] == ["n-1"]
+        assert notifications[0]["read_status"] is True
+
+    def test_id_change_replays_without_old_record(self, journaled, tmp_path):
+        """Renaming a record journals the removal of its old id."""
+        journaled.create_leave_request({"id": "req-1", "status": "pending"})
+        journaled.create_notification(make_notification("n-1", "req-1"))
+        journaled.update_leave_request("req-1", {"id": "req-9"})
+        journaled.update_notification("n-1", {"id": "n-9"})
+
+        json_storage._file_cache.clear()
+        reader = JSONStorage(data_dir=str(tmp_path))
+        assert [r["id"] for r in reader.get_all_leave_requests()] == ["req-9"]
+        assert [n["id"] for n in reader.get_all_notifications()] == ["n-9"]
+        assert reader.get_leave_request_by_id("req-1") is None
+
+    def test_torn_journal_line_is_ignored(self, journaled):
+        """A partial line left by a crash does not break loading."""
+        journaled.create_notification(make_notification("n-1", "req-1"))
+        with open(journaled._journal_path(journaled.notifications_file), "a") as f:
+            f.write('{"op": "put", "rec')
+
+        json_storage._file_cache.clear()
+        assert [n["id"] for n in journaled.get_all_notifications()] == ["n-1"]
+
+    def test_write_after_torn_line_survives_reload(self, journaled, tmp_path):
+        """The next append truncates a torn line instead of gluing onto it."""
+        journaled.create_leave_request({"id": "r1", "status": "pending"})
+        with open(journaled._journal_path(journaled.leave_requests_file), "a") as f:
+            f.write('{"op": "put", "rec')
+        journaled.create_leave_request({"id": "r2", "status": "pending"})
+
+        json_storage._file_cache.clear()
+        reader = JSONStorage(data_dir=str(tmp_path))
+        assert sorted(r["id"] for r in reader.get_all_leave_requests()) == ["r1", "r2"]
+
+    def test_compaction_folds_journal_into_snapshot(self, journaled):
+        """Compaction writes a snapshot with everything and drops the journal."""
+        journaled.create_notification(make_notification("n-1", "req-1"))
+        journaled.create_notification(make_notification("n-2", "req-2"))
+        journaled.delete_notification("n-1")
+
+        journaled.compact()
+
+        assert not journaled._journal_path(journaled.notifications_file).exists()
+        with open(journaled.notifications_file) as f:
+            assert [n["id"] for n in json.load(f)] == ["n-2"]
+        assert journaled.get_notification_by_id("n-2") is not None
+
+    def test_background_compaction_past_threshold(self, tmp_path):
+        """Crossing the size threshold compacts in a background thread."""
+        json_storage._file_cache.clear()
+        storage = JSONStorage(data_dir=str(tmp_path), journal=True, compact_threshold=1)
+
+        storage.create_notification(make_notification("n-1", "req-1"))
+        for thread in json_storage.threading.enumerate():
+            if thread.name.startswith("compact-"):
+                thread.join(timeout=5)
+
+        assert not storage._journal_path(storage.notifications_file).exists()
+        with open(storage.notifications_file) as f:
+            assert [n["id"] for n in json.load(f)] == ["n-1"]
+        json_storage._file_cache.clear()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="Stress test forks worker processes"
+)
+class TestConcurrentWriters:
+    """Stress test several processes writing the same files."""
+
+    WORKERS = 4
+    WRITES_PER_WORKER = 25
+
+    @pytest.mark.parametrize("journal", [False, True], ids=["snapshot", "journal"])
+    def test_no_lost_or_torn_writes(self, tmp_path, journal):
+        """Every write from every process survives, and the file stays valid JSON."""
+        json_storage._file_cache.clear()
+        JSONStorage(data_dir=str(tmp_path))
+
+        ctx = multiprocessing.get_context("fork")
+        processes = [
+            ctx.Process(
+                target=write_many,
+                args=(str(tmp_path), worker, self.WRITES_PER_WORKER, journal)
+            )
+            for worker in range(self.WORKERS)
+        ]
+        for process in processes:
+            process.start()
+
+        # Read concurrently while the writers run; a torn file would parse as []
+        reader = JSONStorage(data_dir=str(tmp_path))
+        seen = 0
+        while any(process.is_alive() for process in processes):
+            count = len(reader.get_all_notifications())
+            assert count >= seen
+            seen = count
+
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        json_storage._file_cache.clear()
+        notifications = JSONStorage(data_dir=str(tmp_path)).get_all_notifications()
+        assert len(notifications) == self.WORKERS * self.WRITES_PER_WORKER
+        assert all(n["read_status"] for n in notifications)
+        json_storage._file_cache.clear()
+
+
+class TestAtomicWrite:
+    """Test replacing files through a temp file."""
+
+    def test_mode_survives_write(self, storage, tmp_path):
+        """A rewrite keeps the data file's permissions instead of mkstemp's 0600."""
+        path = tmp_path / "leave_requests.json"
+        os.chmod(path, 0o664)
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o664
+
+    def test_new_file_gets_umask_default(self, tmp_path):
+        umask = os.umask(0o022)
+        try:
+            with atomic_write(tmp_path / "new.json") as f:
+                f.write("[]")
+        finally:
+            os.umask(umask)
+        assert stat.S_IMODE(os.stat(tmp_path / "new.json").st_mode) == 0o644
+
+    def test_umask_is_left_alone(self, tmp_path, monkeypatch):
+        """Other threads creating files must never see a changed umask."""
+        def umask(mask):
+            raise AssertionError("os.umask called")
+
+        monkeypatch.setattr(os, "umask", umask)
+        with atomic_write(tmp_path / "new.json") as f:
+            f.write("[]")
+        assert (tmp_path / "new.json").read_text() == "[]"
+
+    def test_directory_fsynced_after_rename(self, tmp_path, monkeypatch):
+        """The rename is made durable by fsyncing the containing directory."""
+        events = []
+        fsync, replace = os.fsync, os.replace
+
+        def record_fsync(fd):
+            events.append("dir-fsync" if stat.S_ISDIR(os.fstat(fd).st_mode) else "file-fsync")
+            fsync(fd)
+
+        def record_replace(src, dst):
+            events.append("replace")
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "fsync", record_fsync)
+        monkeypatch.setattr(os, "replace", record_replace)
+        with atomic_write(tmp_path / "data.json") as f:
+            f.write("[]")
+        assert events == ["file-fsync", "replace", "dir-fsync"]
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from app.storage import json_storage, ndjson_storage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_json_storage import make_notification
+
+
+@pytest.fixture
+def storage(tmp_path):
+    json_storage._file_cache.clear()
+    ndjson_storage._indexes.clear()
+    yield NDJSONStorage(data_dir=str(tmp_path), compact_min_dead=1000)
+    ndjson_storage._indexes.clear()
+    json_storage._file_cache.clear()
+
+
+def reopen(tmp_path, **kwargs) -> NDJSONStorage:
+    """Simulate a new process: drop in-memory indexes and open again."""
+    ndjson_storage._indexes.clear()
+    return NDJSONStorage(data_dir=str(tmp_path), **kwargs)
+
+
+class TestNDJSONStorage:
+    """Test NDJSON storage and its byte-offset index."""
+
+    def test_seeds_from_legacy_json(self, tmp_path):
+        """Existing .json data is converted on first use."""
+        with open(tmp_path / "leave_requests.json", "w") as f:
+            json.dump([{"id": "req-1", "status": "pending"}], f)
+
+        storage = reopen(tmp_path)
+
+        assert storage.get_leave_request_by_id("req-1")["status"] == "pending"
+        lines = storage.leave_requests_ndjson.read_text().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == ["req-1"]
+
+    def test_crud_round_trip(self, storage):
+        """Creates, updates and deletes are visible through every read path."""
+        storage.create_notification(make_notification("n-1", "req-1"))
+        storage.create_notification(make_notification("n-2", "req-1"))
+        storage.create_notification(make_notification("n-3", "req-2"))
+
+        assert storage.mark_notification_as_read("n-1")["read_status"] is True
+        assert storage.delete_notification("n-2") is True
+        assert storage.delete_notification("n-2") is False
+        assert storage.update_notification("missing", {"read_status": True}) is None
+
+        assert storage.get_notification_by_id("n-1")["read_status"] is True
+        assert storage.get_notification_by_id("n-2") is None
+        assert [n["id"] for n in storage.get_all_notifications()] == ["n-1", "n-3"]
+        assert [n["id"] for n in storage.get_notifications_by_request_id("req-1")] == ["n-1"]
+
+    def test_bulk_operations(self, storage, tmp_path):
+        """Bulk updates and deletes survive a reopen."""
+        for notification_id, request_id in [("n-1", "req-1"), ("n-2", "req-1"), ("n-3", "req-2")]:
+            storage.create_notification(make_notification(notification_id, request_id))
+
+        assert storage.mark_notifications_as_read(request_id="req-1") == 2
+        assert storage.delete_notifications(notification_ids=["n-2", "n-3"], read_only=True) == 1
+
+        reopened = reopen(tmp_path)
+        assert [(n["id"], n["read_status"]) for n in reopened.get_all_notifications()] == [
+            ("n-1", True), ("n-3", False)
+        ]
+
+    def test_updates_keep_creation_order(self, storage):
+        """An update appends a new line but the record keeps its position."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        storage.create_leave_request({"id": "req-2", "status": "pending"})
+        storage.update_leave_request("req-1", {"status": "approved"})
+
+        assert [(r["id"], r["status"]) for r in storage.iter_leave_requests()] == [
+            ("req-1", "approved"),
+            ("req-2", "pending"),
+        ]
+
+    def test_id_change_drops_old_id(self, storage, tmp_path):
+        """Renaming a record tombstones its old id, also after a reopen."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        storage.update_leave_request("req-1", {"id": "req-9"})
+
+        assert storage.get_leave_request_by_id("req-1") is None
+        reopened = reopen(tmp_path)
+        assert [r["id"] for r in reopened.iter_leave_requests()] == ["req-9"]
+
+    def test_cold_start_uses_sidecar_and_scans_tail(self, storage, tmp_path):
+        """A new process loads the sidecar and only scans lines past it."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        storage._write_sidecar(
+            storage.leave_requests_ndjson,
+            storage._index(storage.leave_requests_ndjson)
+        )
+        storage.create_leave_request({"id": "req-2", "status": "pending"})
+
+        reader = reopen(tmp_path)
+        index = reader._index(reader.leave_requests_ndjson)
+
+        assert list(index.offsets) == ["req-1", "req-2"]
+        assert reader.get_leave_request_by_id("req-2")["status"] == "pending"
+
+    def test_sees_appends_from_other_processes(self, storage, tmp_path):
+        """Lines appended by another writer are picked up incrementally."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        assert storage.get_leave_request_by_id("req-1") is not None
+
+        with open(storage.leave_requests_ndjson, "a") as f:
+            f.write(json.dumps({"id": "req-1", "status": "denied"}) + "\n")
+
+        assert storage.get_leave_request_by_id("req-1")["status"] == "denied"
+
+    def test_torn_line_is_ignored_and_truncated(self, storage):
+        """A partial line from a crash is skipped by readers and cut by the next writer."""
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        with open(storage.leave_requests_ndjson, "a") as f:
+            f.write('{"id": "req-2", "sta')
+
+        assert [r["id"] for r in storage.get_all_leave_requests()] == ["req-1"]
+
+        storage.create_leave_request({"id": "req-3", "status": "pending"})
+        assert [r["id"] for r in storage.get_all_leave_requests()] == ["req-1", "req-3"]
+
+    def test_compaction_drops_dead_lines(self, tmp_path):
+        """Once dead lines outnumber live ones the file is rewritten."""
+        storage = reopen(tmp_path, compact_min_dead=2)
+        storage.create_leave_request({"id": "req-1", "status": "pending"})
+        for status in ("approved", "denied", "pending"):
+            storage.update_leave_request("req-1", {"status": status})
+
+        lines = storage.leave_requests_ndjson.read_text().splitlines()
+        assert len(lines) == 1
+        assert storage.get_leave_request_by_id("req-1")["status"] == "pending"
+        assert reopen(tmp_path).get_leave_request_by_id("req-1")["status"] == "pending"
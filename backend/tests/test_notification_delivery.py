@@ -0,0 +1,324 @@
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import notification_delivery
+from app.services.notification_delivery import DeliveryWorkerPool, SMTPTransport, build_message
+from app.storage import json_storage, outbox
+from app.storage.async_storage import ThreadedStorage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_db_storage import make_deadline_request, make_notification
+
+
+CREATED_AT = datetime(2025, 2, 13, 10, 0)
+
+
+@pytest.fixture(autouse=True)
+def delivery_enabled(monkeypatch):
+    monkeypatch.setattr(outbox.settings, "NOTIFICATION_DELIVERY_ENABLED", True)
+
+
+@pytest.fixture(params=["db", "json", "ndjson"])
+def storage(request, db_session, tmp_path):
+    json_storage._file_cache.clear()
+    storage = {
+        "db": lambda: DBStorage(db_session),
+        "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+        "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+    }[request.param]()
+    storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+    return storage
+
+
+@pytest.fixture
+def delivery_storage(storage, monkeypatch):
+    """Route the delivery module's storage sessions to ``storage``."""
+    @asynccontextmanager
+    async def open_storage():
+        yield ThreadedStorage(storage)
+
+    monkeypatch.setattr(notification_delivery, "open_storage", open_storage)
+    return storage
+
+
+def seed(storage, count: int) -> list[str]:
+    notifications = [make_notification(f"n-{i}", "req-1", CREATED_AT) for i in range(count)]
+    storage.create_notifications(notifications)
+    return [n["id"] for n in notifications]
+
+
+class FakeTransport:
+    """Records sent messages; fails the recipients listed in ``reject``."""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.batches = []
+        self.closed = False
+
+    async def send_batch(self, messages, deadline=None):
+        self.batches.append([m["Message-ID"] for m in messages])
+        return ["550 rejected" if m["Message-ID"] in self.reject else None for m in messages]
+
+    async def close(self):
+        self.closed = True
+
+
+class TestOutboxStorage:
+    """Test the outbox on every storage backend."""
+
+    def test_created_notifications_are_queued(self, storage):
+        """Single and bulk creates both enqueue; dedup hits don't."""
+        seed(storage, 3)
+        storage.create_notification(make_notification("single", "req-1", CREATED_AT))
+        assert storage.outbox_stats()["pending"] == 4
+
+        duplicate = dict(make_notification("again", "req-1", CREATED_AT), dedup_key="k")
+        storage.create_notification(duplicate)
+        storage.create_notification(dict(duplicate, id="again-2"))
+        assert storage.outbox_stats()["pending"] == 5
+
+    def test_disabled_queues_nothing(self, storage, monkeypatch):
+        monkeypatch.setattr(outbox.settings, "NOTIFICATION_DELIVERY_ENABLED", False)
+        seed(storage, 2)
+        assert storage.outbox_stats()["pending"] == 0
+
+    def test_notification_not_stored_without_entry(self, storage, monkeypatch):
+        """File storage queues the entry first; a failed enqueue stores nothing."""
+        if isinstance(storage, DBStorage):
+            pytest.skip("the database writes both in one transaction")
+
+        def fail(notification_id, now=None):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(outbox, "new_outbox_entry", fail)
+        with pytest.raises(OSError):
+            storage.create_notification(make_notification("lost", "req-1", CREATED_AT))
+        with pytest.raises(OSError):
+            seed(storage, 2)
+        assert storage.get_notifications_by_ids(["lost", "n-0", "n-1"]) == []
+
+    def test_outbox_file_created_on_first_enqueue(self, tmp_path, monkeypatch):
+        json_storage._file_cache.clear()
+        storage = JSONStorage(data_dir=str(tmp_path))
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        assert not storage.outbox_file.exists()
+
+        monkeypatch.setattr(outbox.settings, "NOTIFICATION_DELIVERY_ENABLED", False)
+        seed(storage, 1)
+        assert storage.outbox_stats()["pending"] == 0
+        assert not storage.outbox_file.exists()
+
+        monkeypatch.setattr(outbox.settings, "NOTIFICATION_DELIVERY_ENABLED", True)
+        storage.create_notification(make_notification("queued", "req-1", CREATED_AT))
+        assert storage.outbox_file.exists()
+        assert storage.outbox_stats()["pending"] == 1
+
+    def test_claims_are_disjoint_and_leased(self, storage):
+        """A claimed entry isn't claimed again until its lease expires."""
+        ids = seed(storage, 5)
+        now = datetime.now()
+        first = storage.claim_outbox(3, lease_seconds=60, now=now)
+        second = storage.claim_outbox(10, lease_seconds=60, now=now)
+
+        assert sorted(e["id"] for e in first + second) == sorted(ids)
+        assert {e["id"] for e in first}.isdisjoint(e["id"] for e in second)
+        assert first[0]["notification"]["request_id"] == "req-1"
+        assert storage.claim_outbox(10, 60, now=now) == []
+        assert len(storage.claim_outbox(10, 60, now=now + timedelta(seconds=61))) == 5
+
+    def test_complete_and_retry(self, storage):
+        ids = seed(storage, 3)
+        now = datetime.now()
+        storage.claim_outbox(10, 60, now=now)
+
+        assert storage.complete_outbox([ids[0]]) == 1
+        assert storage.retry_outbox(ids[1], "421 busy", now + timedelta(seconds=30))
+        assert storage.retry_outbox(ids[2], "550 rejected", None)
+        assert not storage.retry_outbox("missing", "error", None)
+
+        stats = storage.outbox_stats(now=now)
+        assert (stats["pending"], stats["sending"], stats["failed"], stats["ready"]) == (1, 0, 1, 0)
+        [retry] = storage.claim_outbox(10, 60, now=now + timedelta(seconds=31))
+        assert (retry["id"], retry["attempts"], retry["last_error"]) == (ids[1], 2, "421 busy")
+
+    def test_reports_from_an_expired_claim_are_ignored(self, storage):
+        """Only the current claim may complete or retry an entry."""
+        [notification_id] = seed(storage, 1)
+        now = datetime.now()
+        [stale] = storage.claim_outbox(10, 60, now=now)
+        [current] = storage.claim_outbox(10, 60, now=now + timedelta(seconds=61))
+
+        assert current["attempts"] == 2
+        assert storage.complete_outbox([notification_id], claim_token=stale["claim_token"]) == 0
+        assert not storage.retry_outbox(notification_id, "late", None, claim_token=stale["claim_token"])
+        assert storage.outbox_stats()["sending"] == 1
+        assert storage.complete_outbox([notification_id], claim_token=current["claim_token"]) == 1
+
+    def test_deleted_notification_is_dropped(self, storage):
+        """An entry whose notification is gone is removed when claimed."""
+        ids = seed(storage, 2)
+        storage.delete_notification(ids[0])
+        claimed = storage.claim_outbox(10, 60)
+        assert [e["id"] for e in claimed] == [ids[1]]
+        assert storage.outbox_stats()["sending"] == 1
+
+
+class TestDeliveryWorkerPool:
+    """Test batching, retries and metrics with an in-memory transport."""
+
+    def test_message_from_notification(self):
+        message = build_message(make_notification("n-1", "req-1", CREATED_AT), sender="hr@example.org")
+        assert message["Message-ID"] == "<n-1@example.org>"
+        assert message["Subject"] == "Subject"
+        assert message.get_content().startswith("Body")
+
+    def test_batches_per_transport(self, delivery_storage):
+        """run_once sends everything due, batch_size messages at a time."""
+        seed(delivery_storage, 5)
+        pool = DeliveryWorkerPool(workers=1, batch_size=2, transport_factory=FakeTransport)
+        transport = FakeTransport()
+
+        assert asyncio.run(pool.run_once(transport)) == 5
+        assert [len(batch) for batch in transport.batches] == [2, 2, 1]
+        assert delivery_storage.outbox_stats()["pending"] == 0
+        assert pool.sent == 5
+        assert pool.latency_percentiles()["max"] is not None
+
+    def test_failures_back_off_then_fail(self, delivery_storage):
+        """Rejected messages are retried with doubling delays, then given up."""
+        [notification_id] = seed(delivery_storage, 1)
+        pool = DeliveryWorkerPool(batch_size=10, max_attempts=3, backoff_seconds=10, max_backoff_seconds=15)
+        transport = FakeTransport(reject={f"<{notification_id}@example.com>"})
+
+        assert [pool.backoff(n) for n in (1, 2, 3)] == [10, 15, None]
+        asyncio.run(pool.run_once(transport))
+        assert delivery_storage.outbox_stats()["pending"] == 1
+
+        later = datetime.now() + timedelta(seconds=11)
+        [entry] = delivery_storage.claim_outbox(10, 60, now=later)
+        asyncio.run(pool.deliver(transport, [entry]))
+        [last] = delivery_storage.claim_outbox(10, 60, now=later + timedelta(seconds=16))
+        assert (entry["attempts"], last["attempts"]) == (2, 3)
+        asyncio.run(pool.deliver(transport, [last]))
+
+        stats = delivery_storage.outbox_stats()
+        assert (stats["pending"], stats["failed"]) == (0, 1)
+        assert (pool.retried, pool.failed, pool.sent) == (2, 1, 0)
+
+    def test_unbuildable_message_fails_alone(self, delivery_storage):
+        """A notification that can't be rendered is failed; the rest of its batch is sent."""
+        seed(delivery_storage, 2)
+        delivery_storage.create_notification(dict(
+            make_notification("poison", "req-1", CREATED_AT),
+            body=None, template_id="certification_due", template_version=99, params={}
+        ))
+        pool = DeliveryWorkerPool(workers=1, batch_size=10)
+        transport = FakeTransport()
+
+        assert asyncio.run(pool.run_once(transport)) == 3
+        assert sorted(transport.batches[0]) == ["<n-0@example.com>", "<n-1@example.com>"]
+        stats = delivery_storage.outbox_stats()
+        assert (stats["pending"], stats["sending"], stats["failed"]) == (0, 0, 1)
+        assert (pool.sent, pool.failed) == (2, 1)
+        assert "KeyError" in pool.last_error
+
+    def test_entry_reclaimed_past_max_attempts_fails(self, delivery_storage):
+        """An entry whose claims keep expiring unreported is failed, not sent forever."""
+        [notification_id] = seed(delivery_storage, 1)
+        pool = DeliveryWorkerPool(batch_size=10, max_attempts=2)
+        now = datetime.now()
+        for i in range(3):
+            [entry] = delivery_storage.claim_outbox(10, 60, now=now + timedelta(seconds=61 * i))
+        transport = FakeTransport()
+
+        asyncio.run(pool.deliver(transport, [entry]))
+
+        assert entry["attempts"] == 3
+        assert transport.batches == []
+        assert delivery_storage.outbox_stats()["failed"] == 1
+
+    def test_batch_stops_before_lease_expires(self, delivery_storage):
+        """Sends that could outlast the lease are not started; the entries are retried."""
+        seed(delivery_storage, 2)
+        pool = DeliveryWorkerPool(workers=1, batch_size=10, lease_seconds=10)
+        # An SMTP timeout of 5s leaves no room inside a 10s lease
+        transport = SMTPTransport(host="127.0.0.1", port=1, timeout=5)
+
+        assert asyncio.run(pool.run_once(transport)) == 2
+        assert transport.connections_opened == 0
+        stats = delivery_storage.outbox_stats()
+        assert (stats["pending"], stats["sending"]) == (2, 0)
+        assert pool.last_error == "not sent: claim lease expiring"
+
+    def test_background_workers_drain_outbox(self, delivery_storage):
+        seed(delivery_storage, 7)
+        transports = []
+
+        def factory():
+            transports.append(FakeTransport())
+            return transports[-1]
+
+        pool = DeliveryWorkerPool(workers=2, batch_size=2, poll_seconds=0.01, transport_factory=factory)
+
+        async def body():
+            pool.start()
+            for _ in range(200):
+                if pool.sent == 7:
+                    break
+                await asyncio.sleep(0.01)
+            metrics = await pool.metrics()
+            await pool.stop()
+            return metrics
+
+        metrics = asyncio.run(body())
+        assert metrics["sent"] == 7
+        assert metrics["outbox"]["pending"] == metrics["outbox"]["sending"] == 0
+        assert sum(len(t.batches) for t in transports) == 4
+        assert all(t.closed for t in transports)
+        assert not pool.running
+
+
+class TestSMTPDelivery:
+    """Deliver to a local aiosmtpd server over real SMTP connections."""
+
+    @pytest.fixture
+    def smtp_server(self):
+        controller_module = pytest.importorskip("aiosmtpd.controller")
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        received = []
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                received.append(envelope)
+                return "250 OK"
+
+        controller = controller_module.Controller(Handler(), hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            yield port, received
+        finally:
+            controller.stop()
+
+    def test_one_connection_per_worker(self, delivery_storage, smtp_server):
+        port, received = smtp_server
+        seed(delivery_storage, 5)
+        transport = SMTPTransport(host="127.0.0.1", port=port, timeout=5)
+        pool = DeliveryWorkerPool(workers=1, batch_size=2)
+
+        async def body():
+            claimed = await pool.run_once(transport)
+            await transport.close()
+            return claimed
+
+        assert asyncio.run(body()) == 5
+        assert len(received) == 5
+        assert transport.connections_opened == 1
+        assert delivery_storage.outbox_stats()["pending"] == 0
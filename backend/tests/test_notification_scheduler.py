@@ -0,0 +1,310 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.leave_request import LeaveRequest
+from app.models.notification import NotificationType
+from app.services import notification_scheduler
+from app.services.notification_scheduler import NotificationScheduler, run_notification_sweep
+from app.services.deadline_index import DueEvent
+from app.services.notification_service import NotificationService
+from app.services.notification_templates import NotificationTemplate
+from app.storage import json_storage, ndjson_storage
+from app.storage.async_storage import ThreadedStorage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_api_streaming import client  # noqa: F401 (fixture)
+from tests.test_db_storage import make_deadline_request, make_notification
+
+
+@pytest.fixture(params=["db", "json", "ndjson"])
+def storage(request, db_session, tmp_path):
+    json_storage._file_cache.clear()
+    return {
+        "db": lambda: DBStorage(db_session),
+        "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+        "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+    }[request.param]()
+
+
+def seed_due_requests(storage, count: int):
+    """Requests whose certification deadline (notice + 15) is 3 days out."""
+    for i in range(count):
+        storage.create_leave_request(make_deadline_request(f"req-{i:03d}", -12, 30))
+    storage.create_leave_request(make_deadline_request("complete", -12, 30, signed=True))
+    storage.create_leave_request(make_deadline_request("far-off", 0, 60))
+
+
+class TestCreateNotifications:
+    """Test bulk notification inserts."""
+
+    def test_bulk_create(self, storage):
+        """Every notification is stored and readable afterwards."""
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        created_at = datetime(2025, 2, 13, 10, 0)
+        notifications = [make_notification(f"n-{i}", "req-1", created_at) for i in range(5)]
+
+        assert storage.create_notifications(notifications) == 5
+        assert storage.create_notifications([]) == 0
+        assert sorted(n["id"] for n in storage.get_notifications_by_request_id("req-1")) == [
+            f"n-{i}" for i in range(5)
+        ]
+
+
+class TestDedupKeys:
+    """Test that a logical notification is stored at most once."""
+
+    def test_create_notification_is_idempotent(self, storage):
+        """A second notification with the same key returns the first."""
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        created_at = datetime(2025, 2, 13, 10, 0)
+        first = dict(make_notification("n-1", "req-1", created_at), dedup_key="req-1:certification_due:2025-02-16")
+        retry = dict(first, id="n-2")
+
+        storage.create_notification(first)
+        assert storage.create_notification(retry)["id"] == "n-1"
+        assert storage.get_notification_by_dedup_key(first["dedup_key"])["id"] == "n-1"
+        assert storage.get_notification_by_dedup_key("req-1:cure_window:2025-02-23") is None
+        # Notifications without a key are never deduplicated
+        storage.create_notification(make_notification("n-3", "req-1", created_at))
+        storage.create_notification(make_notification("n-4", "req-1", created_at))
+        assert sorted(n["id"] for n in storage.get_all_notifications()) == ["n-1", "n-3", "n-4"]
+
+    def test_endpoint_dedups_only_template_content(self, client):
+        """The create endpoint returns the existing reminder unless content is custom."""
+        url = "/api/notifications/?request_id=req-1&notification_type=certification_due"
+        first = client.post(url)
+        assert first.status_code == 201
+        repeat = client.post(url)
+        assert repeat.status_code == 200
+        assert repeat.json()["id"] == first.json()["id"]
+
+        custom = client.post(url + "&custom_subject=Reminder&custom_body=Please+send+the+form")
+        assert custom.status_code == 201
+        assert custom.json()["id"] != first.json()["id"]
+        assert custom.json()["subject"] == "Reminder"
+        assert custom.json()["body"] == "Please send the form"
+        again = client.post(url + "&custom_subject=Reminder")
+        assert again.status_code == 201
+        assert again.json()["id"] not in {first.json()["id"], custom.json()["id"]}
+
+    def test_bulk_create_skips_stored_and_repeated_keys(self, storage):
+        """Keys already stored or repeated in the batch are inserted once."""
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        created_at = datetime(2025, 2, 13, 10, 0)
+        keyed = lambda i, key: dict(make_notification(f"n-{i}", "req-1", created_at), dedup_key=key)
+
+        assert storage.create_notifications([keyed(1, "a"), keyed(2, "b")]) == 2
+        assert storage.create_notifications([keyed(3, "a"), keyed(4, "c"), keyed(5, "c")]) == 1
+        assert storage.create_notifications([keyed(6, "b")]) == 0
+        assert storage.get_existing_dedup_keys(["a", "c", "d"]) == {"a", "c"}
+        assert sorted(n["id"] for n in storage.get_all_notifications()) == ["n-1", "n-2", "n-4"]
+
+    def test_deleted_notification_frees_its_key(self, storage):
+        """Deleting a notification allows it to be generated again."""
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        notification = dict(make_notification("n-1", "req-1", datetime(2025, 2, 13)), dedup_key="a")
+        storage.create_notification(notification)
+        storage.delete_notification("n-1")
+
+        assert storage.get_existing_dedup_keys(["a"]) == set()
+        assert storage.create_notifications([dict(notification, id="n-2")]) == 1
+
+    def test_ndjson_keys_survive_reload(self, tmp_path):
+        """The key index is rebuilt from the sidecar and the file tail."""
+        storage = NDJSONStorage(data_dir=str(tmp_path))
+        storage.create_leave_request(make_deadline_request("req-1", 0, 30))
+        storage.create_notification(dict(make_notification("n-1", "req-1", datetime(2025, 2, 13)), dedup_key="a"))
+        storage.compact()  # writes the sidecar
+        storage.create_notification(dict(make_notification("n-2", "req-1", datetime(2025, 2, 13)), dedup_key="b"))
+
+        ndjson_storage._indexes.clear()
+        assert NDJSONStorage(data_dir=str(tmp_path)).get_existing_dedup_keys(["a", "b", "c"]) == {"a", "b"}
+
+    def test_generation_skips_existing_before_rendering(self, monkeypatch):
+        """Stored reminders are never rendered again."""
+        service = NotificationService()
+        request = make_deadline_request("req-1", -12, 30)
+        [(event_type, _, day)] = [w for w in service.reminder_windows(date.today()) if w[0] == "certification_deadline"]
+        event = DueEvent(day, "req-1", event_type)
+        key = service.due_event_dedup_key(event)
+        rendered = []
+        render = NotificationTemplate.render_body
+        monkeypatch.setattr(
+            NotificationTemplate, "render_body",
+            lambda template, params: rendered.append(params) or render(template, params)
+        )
+
+        assert service.render_due_notifications([request], [event, event], existing_keys={key}) == []
+        assert rendered == []
+        assert len(service.render_due_notifications([request], [event, event])) == 1
+        assert len(rendered) == 1
+
+    def test_generated_key_matches_due_event_key(self):
+        """Notifications rendered directly and by the sweep share keys."""
+        service = NotificationService()
+        request = LeaveRequest(**make_deadline_request("req-1", -12, 30))
+        deadline = service.reminder_deadline(request, NotificationType.CERTIFICATION_DUE)
+        notification = service.generate_certification_due_notification(request, str(deadline))
+        event = DueEvent(deadline, "req-1", "certification_deadline")
+        assert notification.dedup_key == service.due_event_dedup_key(event)
+
+        cure_end = service.reminder_deadline(request, NotificationType.CURE_WINDOW)
+        notification = service.generate_cure_window_notification(request, str(cure_end), ["x"])
+        event = DueEvent(deadline + timedelta(days=1), "req-1", "cure_window_start")
+        assert notification.dedup_key == service.due_event_dedup_key(event)
+
+
+class TestNotificationSweep:
+    """Test the batched reminder sweep."""
+
+    def test_sweep_batches_and_metrics(self, storage):
+        """Due requests are processed in batches, one insert per batch."""
+        seed_due_requests(storage, 5)
+
+        result = asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today(), batch_size=2))
+
+        assert result.due_events == 6  # includes the complete certification
+        assert result.requests_loaded == 6
+        assert result.notifications_created == 5
+        assert result.batches == 3
+        assert result.duration_ms >= result.find_ms
+        created = storage.get_all_notifications()
+        assert sorted(n["request_id"] for n in created) == [f"req-{i:03d}" for i in range(5)]
+        assert {n["type"] for n in created} == {NotificationType.CERTIFICATION_DUE.value}
+
+    def test_compact_storage(self, storage, monkeypatch):
+        """With compact storage on, the sweep stores params, not bodies."""
+        monkeypatch.setattr(notification_scheduler.settings, "NOTIFICATION_COMPACT_STORAGE", True)
+        seed_due_requests(storage, 2)
+
+        asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+
+        created = storage.get_all_notifications()
+        assert len(created) == 2
+        assert {n["body"] for n in created} == {None}
+        assert {n["template_id"] for n in created} == {"certification_due"}
+
+    def test_rerun_creates_nothing(self, storage):
+        """Sweeping the same day again skips every stored reminder."""
+        seed_due_requests(storage, 3)
+        asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+
+        rerun = asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+
+        assert rerun.duplicates_skipped == 3
+        assert rerun.requests_loaded == 1  # only the complete certification is left
+        assert rerun.notifications_created == 0
+        assert len(storage.get_all_notifications()) == 3
+
+    def test_as_of_selects_the_day(self, storage):
+        """Reminders are swept from their due day until their deadline passes."""
+        seed_due_requests(storage, 2)
+        # far-off's certification deadline is 15 days out: its reminder is due in 12 days;
+        # by then the others' deadlines (3 days out) have passed
+        yesterday = asyncio.run(run_notification_sweep(
+            ThreadedStorage(storage), date.today() - timedelta(days=1)
+        ))
+        later = asyncio.run(run_notification_sweep(
+            ThreadedStorage(storage), date.today() + timedelta(days=12)
+        ))
+
+        assert yesterday.notifications_created == 0
+        assert yesterday.batches == 0
+        assert later.notifications_created == 1
+        assert [n["request_id"] for n in storage.get_all_notifications()] == ["far-off"]
+
+    def test_missed_day_is_caught_up(self, storage):
+        """A reminder whose day was not swept goes out on the next sweep."""
+        # Certification deadline 2 days out: the reminder was due yesterday
+        storage.create_leave_request(make_deadline_request("missed", -13, 30))
+        before = asyncio.run(run_notification_sweep(
+            ThreadedStorage(storage), date.today() - timedelta(days=2)
+        ))
+        # Deadline yesterday: too late for its reminder, but the cure window opens today
+        storage.create_leave_request(make_deadline_request("passed", -16, 30))
+
+        today = asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+
+        assert before.notifications_created == 0
+        assert today.notifications_created == 2
+        assert sorted((n["request_id"], n["type"]) for n in storage.get_all_notifications()) == [
+            ("missed", NotificationType.CERTIFICATION_DUE.value),
+            ("passed", NotificationType.CURE_WINDOW.value),
+        ]
+
+    def test_request_created_inside_its_window(self, storage):
+        """A request added after its reminder day still gets the reminder."""
+        asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+        # Certification deadline tomorrow; cure window opened yesterday
+        storage.create_leave_request(make_deadline_request("late", -14, 30))
+        storage.create_leave_request(make_deadline_request("late-cure", -17, 30))
+
+        rerun = asyncio.run(run_notification_sweep(ThreadedStorage(storage), date.today()))
+
+        assert rerun.notifications_created == 2
+        assert sorted((n["request_id"], n["type"]) for n in storage.get_all_notifications()) == [
+            ("late", NotificationType.CERTIFICATION_DUE.value),
+            ("late-cure", NotificationType.CURE_WINDOW.value),
+        ]
+
+
+class TestNotificationScheduler:
+    """Test the background scheduler."""
+
+    @pytest.fixture
+    def file_storage(self, tmp_path, monkeypatch):
+        json_storage._file_cache.clear()
+        storage = JSONStorage(data_dir=str(tmp_path))
+
+        @asynccontextmanager
+        async def open_storage():
+            yield ThreadedStorage(storage)
+
+        monkeypatch.setattr(notification_scheduler, "open_storage", open_storage)
+        return storage
+
+    def test_runs_once_per_day(self, file_storage):
+        """The loop sweeps a day once and records the run."""
+        seed_due_requests(file_storage, 1)
+        scheduler = NotificationScheduler(interval_seconds=0.01, as_of=date.today())
+
+        async def body():
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            running = scheduler.running
+            await scheduler.stop()
+            return running
+
+        assert asyncio.run(body())
+        assert not scheduler.running
+        assert len(scheduler.runs) == 1
+        assert scheduler.last_as_of == date.today()
+        assert len(file_storage.get_all_notifications()) == 1
+
+    def test_failed_run_is_retried(self, file_storage, monkeypatch):
+        """An error is recorded and the day is swept on the next check."""
+        scheduler = NotificationScheduler(interval_seconds=0.01, as_of=date.today())
+        calls = []
+
+        async def flaky(storage, as_of, batch_size):
+            calls.append(as_of)
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+            return await run_notification_sweep(storage, as_of, batch_size)
+
+        monkeypatch.setattr(notification_scheduler, "run_notification_sweep", flaky)
+
+        async def body():
+            scheduler.start()
+            while not scheduler.runs:
+                await asyncio.sleep(0.01)
+            await scheduler.stop()
+
+        asyncio.run(asyncio.wait_for(body(), timeout=5))
+        assert len(calls) == 2
+        assert scheduler.last_error is None
+        assert scheduler.metrics()["runs"][0].as_of == date.today()
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.leave_request import LeaveRequest
+from app.models.notification import Notification, NotificationType
+from app.services.notification_service import NotificationService
+from app.services.notification_templates import (
+    TEMPLATES, NotificationTemplate, get_template, render_batch, render_cache_stats,
+    render_notification
+)
+from app.storage import json_storage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_db_storage import make_deadline_request
+
+
+CREATED_AT = datetime(2025, 2, 13, 10, 0)
+
+
+@pytest.fixture
+def records():
+    return [make_deadline_request(f"req-{i}", -12, 30) for i in range(3)]
+
+
+class TestNotificationTemplate:
+    """Test template compilation and rendering."""
+
+    def test_every_type_has_a_template(self):
+        """The registry covers every notification type."""
+        assert set(TEMPLATES) == set(NotificationType)
+        assert get_template("cure_window").template_id == "cure_window"
+
+    def test_render_fills_placeholders(self):
+        """Values are substituted; lists become bullet lines."""
+        template = NotificationTemplate(
+            NotificationType.MISSING_DOCS, "Hi {name}", "{name} needs:\n{items}"
+        )
+        assert template.fields == {"name", "items"}
+        assert template.render({"name": "Jane", "items": ["a", "b"]}) == (
+            "Hi Jane", "Jane needs:\n- a\n- b"
+        )
+        with pytest.raises(KeyError):
+            template.render({"name": "Jane"})
+
+    def test_format_specs_are_rejected(self):
+        """Only plain placeholders are supported."""
+        with pytest.raises(ValueError):
+            NotificationTemplate(NotificationType.MISSING_DOCS, "{day:%Y}", "")
+
+
+class TestRenderBatch:
+    """Test rendering storage-ready dictionaries in bulk."""
+
+    def test_matches_single_notification_path(self, records):
+        """Batch output equals what the per-item generators produce."""
+        rendered = render_batch(
+            records, NotificationType.CERTIFICATION_DUE, {"cert_deadline": "2025-02-16"}, CREATED_AT
+        )
+        service = NotificationService()
+        for data, record in zip(rendered, records):
+            expected = service.generate_certification_due_notification(
+                LeaveRequest(**record), "2025-02-16"
+            ).model_dump(mode='json')
+            assert Notification(**data).model_dump(mode='json') == dict(
+                expected, id=data["id"], created_at=CREATED_AT.isoformat()
+            )
+
+    def test_per_request_params(self, records):
+        """A list of params is matched to the requests in order."""
+        rendered = render_batch(
+            records, NotificationType.DENIAL_NOTICE,
+            [{"reason": f"reason {i}"} for i in range(len(records))]
+        )
+        assert [f"Reason: reason {i}" in n["body"] for i, n in enumerate(rendered)] == [True] * 3
+        assert len({n["id"] for n in rendered}) == 3
+        assert {n["dedup_key"] for n in rendered} == {None}
+
+    def test_dedup_keys(self, records):
+        """Deadline reminders are keyed by request, type and deadline."""
+        rendered = render_batch(records[:1], NotificationType.RECERTIFICATION_DUE, {"recert_date": "2025-05-01"})
+        assert rendered[0]["dedup_key"] == "req-0:recertification_due:2025-05-01"
+
+
+class TestCompactNotifications:
+    """Test notifications stored as template id + params."""
+
+    @pytest.fixture(params=["db", "json", "ndjson"])
+    def storage(self, request, db_session, tmp_path):
+        json_storage._file_cache.clear()
+        return {
+            "db": lambda: DBStorage(db_session),
+            "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+            "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+        }[request.param]()
+
+    def test_compact_renders_same_body(self, records):
+        """Rendering on read reproduces the body rendered at creation."""
+        params = {"cure_end_date": "2025-02-23", "missing_items": ["Signed form", "Dates"]}
+        [full] = render_batch(records[:1], NotificationType.CURE_WINDOW, params, CREATED_AT)
+        [compact] = render_batch(records[:1], NotificationType.CURE_WINDOW, params, CREATED_AT, compact=True)
+
+        assert compact["body"] is None
+        assert compact["subject"] == full["subject"]
+        assert (compact["template_id"], compact["template_version"]) == ("cure_window", 1)
+        assert set(compact["params"]) == {"employee_name", "cure_end_date", "missing_items"}
+        assert render_notification(compact)["body"] == full["body"]
+        assert render_notification(full) is full
+
+    def test_hot_renders_are_cached(self, records):
+        """Reading the same compact notification again hits the cache."""
+        [compact] = render_batch(records[:1], NotificationType.APPROVAL_NOTICE, compact=True)
+        render_notification(compact)
+        before = render_cache_stats()
+        render_notification(dict(compact))
+        assert render_cache_stats()["hits"] == before["hits"] + 1
+
+    def test_unknown_template_version(self, records):
+        """A version that was never registered can't be rendered."""
+        [compact] = render_batch(records[:1], NotificationType.APPROVAL_NOTICE, compact=True)
+        with pytest.raises(KeyError):
+            render_notification(dict(compact, template_version=99))
+
+    def test_storage_round_trip(self, storage, records):
+        """Every backend stores compact notifications and they render on read."""
+        storage.create_leave_request(records[0])
+        params = {"cert_deadline": "2025-02-16"}
+        [full] = render_batch(records[:1], NotificationType.CERTIFICATION_DUE, params, CREATED_AT)
+        [compact] = render_batch(records[:1], NotificationType.CERTIFICATION_DUE, params, CREATED_AT, compact=True)
+        storage.create_notifications([compact])
+
+        [stored] = storage.get_notifications_by_request_id("req-0")
+        assert stored["body"] is None
+        assert render_notification(stored)["body"] == full["body"]
@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+
+from app.services.result_cache import VersionedLRUCache, request_version
+from app.storage import hooks, json_storage
+from app.storage.db_storage import DBStorage
+from app.storage.json_storage import JSONStorage
+from app.storage.ndjson_storage import NDJSONStorage
+from tests.test_db_storage import make_leave_request
+
+
+AS_OF = date(2025, 3, 1)
+
+
+class TestVersionedLRUCache:
+    """Test the LRU cache in front of timeline/compliance generation."""
+
+    def test_hits_misses_and_evictions(self):
+        """Repeat lookups hit; the least recently used entry is evicted first."""
+        cache = VersionedLRUCache(maxsize=2)
+        calls = []
+
+        def compute(value):
+            calls.append(value)
+            return value
+
+        assert cache.get_or_compute("req-1", "v1", AS_OF, lambda: compute(1)) == 1
+        assert cache.get_or_compute("req-2", "v1", AS_OF, lambda: compute(2)) == 2
+        assert cache.get_or_compute("req-1", "v1", AS_OF, lambda: compute(99)) == 1
+        # req-2 is now least recently used
+        cache.get_or_compute("req-3", "v1", AS_OF, lambda: compute(3))
+        assert cache.get_or_compute("req-2", "v1", AS_OF, lambda: compute(4)) == 4
+
+        assert calls == [1, 2, 3, 4]
+        assert cache.stats() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2}
+
+    def test_key_includes_version_and_as_of(self):
+        """A new version or another day is a separate entry."""
+        cache = VersionedLRUCache()
+        cache.get_or_compute("req-1", "v1", AS_OF, lambda: "a")
+        assert cache.get_or_compute("req-1", "v2", AS_OF, lambda: "b") == "b"
+        assert cache.get_or_compute("req-1", "v1", date(2025, 3, 2), lambda: "c") == "c"
+        assert cache.stats()["misses"] == 3
+
+    def test_invalidate_drops_only_that_request(self):
+        """Invalidation removes every entry for one request."""
+        cache = VersionedLRUCache()
+        cache.get_or_compute("req-1", "v1", AS_OF, lambda: "a")
+        cache.get_or_compute("req-1", "v1", date(2025, 3, 2), lambda: "b")
+        cache.get_or_compute("req-2", "v1", AS_OF, lambda: "c")
+
+        assert cache.invalidate("req-1") == 2
+        assert cache.invalidate("req-1") == 0
+        assert cache.stats()["size"] == 1
+
+    def test_request_version_tracks_content(self):
+        """Any field change produces a new version."""
+        record = make_leave_request("req-1")
+        assert request_version(record) == request_version(dict(record))
+        assert request_version(record) != request_version(dict(record, status="approved"))
+
+
+class TestChangeHooks:
+    """Test that every backend reports leave request changes."""
+
+    @pytest.fixture
+    def events(self):
+        received = []
+
+        def listener(event, request_id, record, store):
+            received.append((event, request_id, record is not None))
+
+        hooks.add_leave_request_listener(listener)
+        yield received
+        hooks.remove_leave_request_listener(listener)
+
+    @pytest.mark.parametrize("backend", ["db", "json", "ndjson"])
+    def test_create_update_delete_notify(self, backend, events, db_session, tmp_path):
+        """Each write fires one hook; misses fire none."""
+        json_storage._file_cache.clear()
+        storage = {
+            "db": lambda: DBStorage(db_session),
+            "json": lambda: JSONStorage(data_dir=str(tmp_path)),
+            "ndjson": lambda: NDJSONStorage(data_dir=str(tmp_path)),
+        }[backend]()
+
+        storage.create_leave_request(make_leave_request("req-1"))
+        storage.update_leave_request("req-1", {"status": "approved"})
+        storage.update_leave_request("missing", {"status": "approved"})
+        storage.delete_leave_request("req-1")
+        storage.delete_leave_request("req-1")
+
+        assert events == [
+            (hooks.CREATED, "req-1", True),
+            (hooks.UPDATED, "req-1", True),
+            (hooks.DELETED, "req-1", False),
+        ]
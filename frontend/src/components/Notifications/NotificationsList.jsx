@@ -44,6 +44,16 @@ const NotificationsList = ({ requestId }) => {
     }
   };
 
+  const handleMarkAllAsRead = async () => {
+    try {
+      // One request for the whole inbox instead of one per notification
+      await notificationsAPI.updateBulk({ request_id: requestId }, true);
+      setNotifications((prev) => prev.map((n) => ({ ...n, read_status: true })));
+    } catch (err) {
+      console.error('Error marking notifications as read:', err);
+    }
+  };
+
   const filteredNotifications = notifications.filter((n) => {
     if (filter === 'all') return true;
     if (filter === 'unread') return !n.read_status;
@@ -99,6 +109,13 @@ const NotificationsList = ({ requestId }) => {
         >
           Recertification
         </button>
+        <button
+          className="filter-btn"
+          onClick={handleMarkAllAsRead}
+          disabled={!notifications.some((n) => !n.read_status)}
+        >
+          Mark all as read
+        </button>
       </div>
 
       {filteredNotifications.length === 0 ? (
@@ -37,6 +37,13 @@ export const notificationsAPI = {
     params: { read_status: readStatus },
   }),
   delete: (id) => api.delete(`/notifications/${id}`),
+  // selection: { ids, request_id, notification_type }
+  updateBulk: (selection, readStatus) => api.patch('/notifications/bulk', selection, {
+    params: { read_status: readStatus },
+  }),
+  deleteBulk: (selection, readOnly = false) => api.post('/notifications/bulk-delete', selection, {
+    params: { read_only: readOnly },
+  }),
 };
 
 export default api;